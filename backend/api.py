@@ -6,12 +6,31 @@ from datetime import datetime
 from typing import List, Dict, Optional
 
 import uvicorn
+from core.article_writer import article_writer
+from core.backfill import backfill_executor, backfill_runner, supports_backfill
+from core.concurrency import concurrency_controller
+from core.crawl_budget import crawl_budget
 from core.database import db_manager
+from core.freshness import freshness_tracker
+from core.http_client import http_client
 from dotenv import load_dotenv
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
+from core.list_fingerprint import list_fingerprints
 from core.logger_utils import logger
+from core.negative_cache import negative_cache
+from core.parse_executor import parse_executor
+from core.rate_limiter import rate_limiter
+from core.recrawl import recrawl_planner
+from core.response_store import response_store
+from core.retry import retry_manager
+from core.scheduler import scheduler
+from core.seen_filter import seen_filter
+from core.selector_registry import selector_registry
+from core.task_executor import TaskTimeout, task_executor
+from core.task_store import task_store
+from core.validator_cache import validator_cache
 
 load_dotenv()
 
@@ -23,6 +42,7 @@ class TaskCreate(BaseModel):
     categoryCounts: Dict[str, int] = {}
     rate: str
     count: int = 10
+    priority: int = 0
 
 class Task(BaseModel):
     id: int
@@ -35,9 +55,11 @@ class Task(BaseModel):
     rateSeconds: int
     count: int = 10
     countSeconds: int = 0
+    priority: int = 0
     status: str
     createdAt: str
     dataCount: int
+    checkpoint: Optional[Dict] = None
 
 class Result(BaseModel):
     id: int
@@ -54,10 +76,6 @@ class Result(BaseModel):
     imgList: Optional[str] = None
     coverUrl: Optional[str] = None
 
-# In-memory task storage
-tasks: List[Task] = []
-next_task_id = 1
-
 # Rate to seconds mapping
 RATE_MAP = {
     "fast": 60,
@@ -113,12 +131,29 @@ async def lifespan(app: FastAPI):
         await db_manager.create_pool()
         await db_manager.init_tables()
         logger.success("数据库连接池已创建")
+        await seen_filter.load()
     except Exception as e:
         logger.warning(f"数据库连接失败: {e}，API 将以有限功能运行")
+
+    # Shared HTTP connection pool and per-host rate limits for spiders
+    await http_client.start()
+    rate_limiter.load_config()
+
+    # Recurring crawl tasks are triggered by the persistent scheduler
+    scheduler.register_handler("task", run_task_job)
+    await scheduler.start()
+    await resume_interrupted_tasks()
     
     yield
     
     # Shutdown
+    await scheduler.close()
+    await task_executor.close()
+    await backfill_executor.close()
+    await article_writer.close()
+    seen_filter.save_snapshot()
+    parse_executor.close()
+    await http_client.close()
     await db_manager.close_pool()
     logger.info("API 服务已关闭")
 
@@ -142,18 +177,22 @@ async def health_check():
 # Task APIs
 @app.get("/api/tasks", response_model=List[Task])
 async def get_tasks():
-    return tasks
+    return [Task(**t) for t in await task_store.list()]
+
+async def get_task_or_404(task_id: int) -> Task:
+    task = await task_store.get(task_id)
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return Task(**task)
 
 @app.post("/api/tasks", response_model=Task)
 async def create_task(task: TaskCreate):
-    global next_task_id
-    
     source_name = NEWS_SOURCES.get(task.source, task.source)
     rate_seconds = RATE_MAP.get(task.rate, 180)
     task_count = task.count if task.count else 10
     
-    new_task = Task(
-        id=next_task_id,
+    # IDs come from the database, so they never collide with task_ids of stored articles
+    new_task = Task(**await task_store.create(dict(
         name=task.name,
         source=task.source,
         sourceName=source_name,
@@ -162,78 +201,124 @@ async def create_task(task: TaskCreate):
         rate=task.rate,
         rateSeconds=rate_seconds,
         count=task_count,
-        status="running",
+        priority=task.priority,
+        status="queued",
         createdAt=datetime.now().isoformat(),
         dataCount=0
-    )
-    
-    tasks.append(new_task)
-    next_task_id += 1
+    )))
     
-    # Start crawling in background
-    asyncio.create_task(run_spider_task(new_task))
+    # Run now, then repeat every rateSeconds (with jitter) via the scheduler
+    await scheduler.add_job(
+        f"task:{new_task.id}",
+        "task",
+        "interval",
+        rate_seconds,
+        payload={"task_id": new_task.id},
+        jitter=int(os.getenv("SCHEDULER_JITTER", 30)),
+        misfire_grace=rate_seconds,
+        max_instances=1,
+        run_immediately=True,
+    )
     
     return new_task
 
+async def run_task_job(job):
+    """Scheduler handler for API tasks"""
+    task = await task_store.get(job.payload.get("task_id"))
+    if not task:
+        # Task no longer exists
+        await scheduler.remove_job(job.id)
+        return
+    task = Task(**task)
+    # Crawls run through the bounded executor so they queue instead of piling up
+    await task_store.update(task.id, status="queued")
+    try:
+        await task_executor.run(
+            f"task:{task.id}",
+            lambda: run_spider_task(task),
+            priority=task.priority,
+            name=task.name,
+        )
+    except TaskTimeout:
+        # The checkpoint is kept, the next run continues from it
+        await task_store.update(task.id, status="timeout")
+
+async def resume_interrupted_tasks():
+    """Re-run tasks that were queued or running when the process stopped"""
+    try:
+        interrupted = await task_store.interrupted()
+    except Exception as e:
+        logger.error(f"加载未完成的任务失败: {e}")
+        return
+    for task in interrupted:
+        logger.info(f"任务 {task['name']} 上次运行被中断，从检查点继续")
+        await scheduler.run_now(f"task:{task['id']}")
+
+def load_spider_class(source: str):
+    """Import spiders dynamically"""
+    from spiders.ithome import ITHome
+    from spiders.pengpai import PengPai
+    from spiders.wangyi import WangYi
+    from spiders.souhu import SouHu
+    from spiders.tengxunxinwen import TenXuNews
+    from spiders.tengxuntiyu import TenXun
+    from spiders.xinlang import XinLangGuoJi
+    from spiders.zhongguoribao import ChineseDayNews
+    
+    spider_map = {
+        "ithome": ITHome,
+        "pengpai": PengPai,
+        "wangyi": WangYi,
+        "souhu": SouHu,
+        "tengxunxinwen": TenXuNews,
+        "tengxuntiyu": TenXun,
+        "xinlang": XinLangGuoJi,
+        "zhongguoribao": ChineseDayNews
+    }
+    return spider_map.get(source)
+
 async def run_spider_task(task: Task):
     """Background task to run the spider"""
+    await task_store.update(task.id, status="running")
     try:
-        # Import spiders dynamically
-        from spiders.ithome import ITHome
-        from spiders.pengpai import PengPai
-        from spiders.wangyi import WangYi
-        from spiders.souhu import SouHu
-        from spiders.tengxunxinwen import TenXuNews
-        from spiders.tengxuntiyu import TenXun
-        from spiders.xinlang import XinLangGuoJi
-        from spiders.zhongguoribao import ChineseDayNews
-        
-        spider_map = {
-            "ithome": ITHome,
-            "pengpai": PengPai,
-            "wangyi": WangYi,
-            "souhu": SouHu,
-            "tengxunxinwen": TenXuNews,
-            "tengxuntiyu": TenXun,
-            "xinlang": XinLangGuoJi,
-            "zhongguoribao": ChineseDayNews
-        }
-        
-        spider_class = spider_map.get(task.source)
+        spider_class = load_spider_class(task.source)
         if not spider_class:
-            task.status = "failed"
+            await task_store.update(task.id, status="failed")
             return
         
         categories = task.categories if task.categories else ["新闻"]
-        total_saved = 0
+        # Resume an interrupted run: categories already done are not listed again
+        checkpoint = await task_store.load_checkpoint(task.id)
+        if checkpoint.resumed:
+            logger.info(
+                f"任务 {task.name} 从检查点继续，已完成分类: {', '.join(checkpoint.categories_done) or '无'}"
+            )
         
         for cat in categories:
+            if cat in checkpoint.categories_done:
+                continue
             spider = spider_class()
             spider.category = cat
             spider.task_id = task.id
+            spider.checkpoint = checkpoint
+            # An explicit run always lists the category, even if the daemon listed it recently
+            spider.lease_lists = False
             count_for_cat = task.categoryCounts.get(cat, task.count) if task.categoryCounts else task.count
             saved_count = await spider.crawl_and_save(limit=count_for_cat)
-            total_saved += saved_count
+            await checkpoint.category_done(cat, saved_count)
         
-        # Update task
-        for t in tasks:
-            if t.id == task.id:
-                t.status = "completed"
-                t.dataCount = total_saved
-                break
+        # Run finished, the next run starts from scratch
+        total_saved = checkpoint.saved
+        await task_store.update(task.id, status="completed", dataCount=total_saved, checkpoint=None)
         
         logger.success(f"任务 {task.name} 完成，保存了 {total_saved} 篇文章")
         
     except Exception as e:
         logger.error(f"任务 {task.name} 失败: {e}")
-        for t in tasks:
-            if t.id == task.id:
-                t.status = "failed"
-                break
+        await task_store.update(task.id, status="failed")
 
 @app.delete("/api/tasks/{task_id}")
 async def delete_task(task_id: int):
-    global tasks
     try:
         async with db_manager.pool.acquire() as conn:
             async with conn.cursor() as cursor:
@@ -242,17 +327,73 @@ async def delete_task(task_id: int):
     except Exception as e:
         logger.error(f"删除任务结果失败: {e}")
     
-    tasks = [t for t in tasks if t.id != task_id]
+    try:
+        await task_store.delete(task_id)
+    except Exception as e:
+        logger.error(f"删除任务失败: {e}")
+    task_executor.cancel(f"task:{task_id}")
+    await scheduler.remove_job(f"task:{task_id}")
     return {"success": True}
 
 @app.post("/api/tasks/{task_id}/run")
 async def run_task(task_id: int):
-    task = next((t for t in tasks if t.id == task_id), None)
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
+    await get_task_or_404(task_id)
+    
+    # Respects max-instances: refuses to start while the task is still running
+    if not await scheduler.run_now(f"task:{task_id}"):
+        return {"success": False, "error": "Task is already running"}
+    return {"success": True}
+
+@app.post("/api/tasks/{task_id}/cancel")
+async def cancel_task(task_id: int):
+    await get_task_or_404(task_id)
+    
+    # Cancels the current run only; the task stays scheduled
+    if not task_executor.cancel(f"task:{task_id}"):
+        return {"success": False, "error": "Task is not queued or running"}
+    await task_store.update(task_id, status="cancelled")
+    return {"success": True}
+
+# Backfill APIs
+class BackfillCreate(BaseModel):
+    source: str
+    until: str
+    categories: List[str] = []
+
+@app.post("/api/backfill")
+async def create_backfill(request: BackfillCreate):
+    spider_class = load_spider_class(request.source)
+    if not spider_class:
+        raise HTTPException(status_code=404, detail="Source not found")
+    spider = spider_class()
+    if not supports_backfill(spider):
+        raise HTTPException(status_code=400, detail="Source does not support backfill")
+    try:
+        until = datetime.strptime(request.until, "%Y-%m-%d")
+    except ValueError:
+        raise HTTPException(status_code=400, detail="until must be YYYY-MM-DD")
     
-    task.status = "running"
-    asyncio.create_task(run_spider_task(task))
+    # Backfills have their own queue, resume from saved progress, and yield to live crawls
+    handle = backfill_executor.submit(
+        f"backfill:{request.source}",
+        lambda: backfill_runner.run(spider, until, request.categories or None),
+        timeout=0,
+        name=f"{spider.source_name} 回填",
+    )
+    return {"success": True, "status": handle.state}
+
+@app.get("/api/backfill")
+async def get_backfill():
+    return {
+        "executor": backfill_executor.snapshot(),
+        "progress": await backfill_runner.snapshot(),
+    }
+
+@app.delete("/api/backfill/{source}")
+async def cancel_backfill(source: str):
+    # Progress is kept; posting the same backfill again continues from it
+    if not backfill_executor.cancel(f"backfill:{source}"):
+        return {"success": False, "error": "Backfill is not queued or running"}
     return {"success": True}
 
 # Result APIs
@@ -276,15 +417,11 @@ async def get_results(source: Optional[str] = None, category: Optional[str] = No
                 await cursor.execute(query, params)
                 rows = await cursor.fetchall()
                 
+                task_names = {t["id"]: t["name"] for t in await task_store.list()}
                 results = []
                 for row in rows:
                     task_id = row[9] if len(row) > 9 else None
-                    task_name = None
-                    if task_id:
-                        for t in tasks:
-                            if t.id == task_id:
-                                task_name = t.name
-                                break
+                    task_name = task_names.get(task_id) if task_id else None
                     results.append(Result(
                         id=row[0],
                         title=row[1] or "",
@@ -320,6 +457,11 @@ async def delete_result(result_id: int):
 
 @app.get("/api/stats")
 async def get_stats():
+    try:
+        task_counts = await task_store.count_by_status()
+    except Exception as e:
+        logger.error(f"获取任务统计失败: {e}")
+        task_counts = {}
     try:
         async with db_manager.pool.acquire() as conn:
             async with conn.cursor() as cursor:
@@ -339,8 +481,17 @@ async def get_stats():
                     "total": total,
                     "bySource": by_source,
                     "recent24h": recent,
-                    "tasks": len(tasks),
-                    "runningTasks": len([t for t in tasks if t.status == "running"])
+                    "tasks": sum(task_counts.values()),
+                    "runningTasks": task_counts.get("running", 0),
+                    "queuedTasks": task_executor.queue_depth,
+                    "taskExecutor": task_executor.snapshot(),
+                    "concurrency": concurrency_controller.snapshot(),
+                    "crawlBudget": crawl_budget.snapshot(),
+                    "circuitBreakers": retry_manager.snapshot(),
+                    "negativeCache": negative_cache.snapshot(),
+                    "conditionalRequests": validator_cache.snapshot(),
+                    "listFingerprints": list_fingerprints.snapshot(),
+                    "responseStore": response_store.snapshot()
                 }
     except Exception as e:
         logger.error(f"获取统计失败: {e}")
@@ -348,10 +499,40 @@ async def get_stats():
             "total": 0,
             "bySource": {},
             "recent24h": 0,
-            "tasks": len(tasks),
-            "runningTasks": len([t for t in tasks if t.status == "running"])
+            "tasks": sum(task_counts.values()),
+            "runningTasks": task_counts.get("running", 0),
+            "queuedTasks": task_executor.queue_depth,
+            "taskExecutor": task_executor.snapshot(),
+            "concurrency": concurrency_controller.snapshot(),
+            "crawlBudget": crawl_budget.snapshot(),
+            "circuitBreakers": retry_manager.snapshot(),
+            "negativeCache": negative_cache.snapshot(),
+            "conditionalRequests": validator_cache.snapshot(),
+            "listFingerprints": list_fingerprints.snapshot(),
+            "responseStore": response_store.snapshot()
         }
 
+@app.get("/api/scheduler/jobs")
+async def get_scheduler_jobs():
+    return scheduler.snapshot()
+
+@app.get("/api/stats/freshness")
+async def get_freshness_stats():
+    # Publish-to-stored lag percentiles (seconds) and freshness target status,
+    # computed from recently stored articles so the daemon's crawl is included
+    await freshness_tracker.refresh()
+    return freshness_tracker.snapshot()
+
+@app.get("/api/stats/recrawl")
+async def get_recrawl_stats():
+    # Adaptive per-category revisit intervals and observed yield
+    return recrawl_planner.snapshot()
+
+@app.get("/api/stats/selectors")
+async def get_selector_stats():
+    # Per-rule call counts, fallback hits and average cost (thread executor only)
+    return selector_registry.stats()
+
 # Crawl single URL API
 @app.post("/api/crawl-url")
 async def crawl_url(request: Dict):
@@ -442,16 +623,15 @@ async def crawl_url(request: Dict):
 @app.get("/api/download-image")
 async def download_image(url: str):
     try:
-        import aiohttp
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                if response.status == 200:
-                    content = await response.read()
-                    content_type = response.headers.get('Content-Type', 'image/jpeg')
-                    from fastapi.responses import Response
-                    return Response(content=content, media_type=content_type)
-                else:
-                    raise HTTPException(status_code=400, detail="Failed to download image")
+        session = await http_client.get_session()
+        async with session.get(url) as response:
+            if response.status == 200:
+                content = await response.read()
+                content_type = response.headers.get('Content-Type', 'image/jpeg')
+                from fastapi.responses import Response
+                return Response(content=content, media_type=content_type)
+            else:
+                raise HTTPException(status_code=400, detail="Failed to download image")
     except Exception as e:
         logger.error(f"下载图片失败: {e}")
         raise HTTPException(status_code=500, detail=f"Download failed: {str(e)}")
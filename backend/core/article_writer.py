@@ -0,0 +1,152 @@
+import asyncio
+import os
+from typing import List, Optional, Tuple
+
+from core.database import db_manager
+from core.logger_utils import logger
+
+ARTICLE_COLUMNS = (
+    "title",
+    "article_url",
+    "cover_url",
+    "content",
+    "date_str",
+    "source",
+    "category",
+    "img_list",
+    "status",
+    "platform_data",
+    "created_at",
+    "updated_at",
+    "task_id",
+)
+ROW_PLACEHOLDER = f"({', '.join(['%s'] * len(ARTICLE_COLUMNS))})"
+INSERT_PREFIX = f"INSERT INTO accounts_accountnews ({', '.join(ARTICLE_COLUMNS)}) VALUES "
+# MySQL 唯一键冲突的错误码
+DUPLICATE_ENTRY = 1062
+
+
+def _is_duplicate(exc: Exception) -> bool:
+    return bool(exc.args) and exc.args[0] == DUPLICATE_ENTRY
+
+
+class ArticleWriter:
+    """
+    写后批量入库：收集所有爬虫提交的文章行，按条数或时间合并成一条多行 INSERT。
+    整批插入成功说明每行都是新文章；有行已存在（article_url 唯一键冲突）或数据错误时整条语句不生效，
+    改为逐行插入，按每行的写入结果判断是否新插入，出错的行单独记录而不会被截断或改写后写入。
+
+    submit() 返回该行是否新插入（已存在返回 False），关闭时会写完缓冲区。
+    多进程模式下工作进程设置 remote，批次交给主进程的写入器，而不是直接写库。
+    """
+
+    def __init__(self, batch_size=None, flush_interval=None):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.buffer: List[Tuple[tuple, asyncio.Future]] = []
+        self.flush_lock: Optional[asyncio.Lock] = None
+        self.wakeup: Optional[asyncio.Event] = None
+        self.flush_task: Optional[asyncio.Task] = None
+        self.closing = False
+        self.remote = None
+
+    async def start(self):
+        """启动后台刷写协程"""
+        if self.flush_task and not self.flush_task.done():
+            return
+        self.batch_size = int(self.batch_size or os.getenv("ARTICLE_WRITER_BATCH_SIZE", 50))
+        self.flush_interval = float(
+            self.flush_interval or os.getenv("ARTICLE_WRITER_FLUSH_INTERVAL", 1.0)
+        )
+        self.flush_lock = asyncio.Lock()
+        self.wakeup = asyncio.Event()
+        self.closing = False
+        self.flush_task = asyncio.create_task(self._flush_loop())
+
+    async def _flush_loop(self):
+        while not self.closing:
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self.wakeup.clear()
+            await self.flush()
+
+    async def submit(self, row: tuple) -> bool:
+        """
+        提交一行文章数据，等待其所在批次写入
+
+        :param row: 按 ARTICLE_COLUMNS 顺序排列的参数
+        :return: 是否为新插入的文章
+        """
+        await self.start()
+        future = asyncio.get_running_loop().create_future()
+        self.buffer.append((row, future))
+        if len(self.buffer) >= self.batch_size:
+            self.wakeup.set()
+        return await future
+
+    async def flush(self):
+        """立即写入缓冲区中的全部文章"""
+        async with self.flush_lock:
+            while self.buffer:
+                batch = self.buffer[: self.batch_size]
+                del self.buffer[: self.batch_size]
+                await self._write_batch(batch)
+
+    async def _write_batch(self, batch: List[Tuple[tuple, asyncio.Future]]):
+        if self.remote is not None:
+            try:
+                outcomes = await self.remote.write_batch([row for row, _ in batch])
+            except Exception as e:
+                logger.error(f"发送 {len(batch)} 篇文章到写入进程失败: {e}")
+                outcomes = [False] * len(batch)
+            self._resolve(batch, outcomes)
+            return
+
+        try:
+            sql = INSERT_PREFIX + ", ".join([ROW_PLACEHOLDER] * len(batch))
+            params = tuple(value for row, _ in batch for value in row)
+            await db_manager.execute(sql, params)
+            outcomes = [True] * len(batch)
+        except Exception as e:
+            # 单条语句失败时整批都没有写入，逐行重试得到每行的结果
+            if not _is_duplicate(e):
+                logger.error(f"批量写入 {len(batch)} 篇文章失败，改为逐条写入: {e}")
+            outcomes = [await self._write_row(row) for row, _ in batch]
+        self._resolve(batch, outcomes)
+
+    @staticmethod
+    def _resolve(batch: List[Tuple[tuple, asyncio.Future]], outcomes: List[bool]):
+        for (_, future), outcome in zip(batch, outcomes):
+            if not future.done():
+                future.set_result(outcome)
+
+    async def _write_row(self, row: tuple) -> bool:
+        """单行写入，用于隔离导致整批失败的数据"""
+        try:
+            sql = INSERT_PREFIX + ROW_PLACEHOLDER
+            async with db_manager.pool.acquire() as conn:
+                async with conn.cursor() as cursor:
+                    return await cursor.execute(sql, row) > 0
+        except Exception as e:
+            if _is_duplicate(e):
+                return False
+            logger.error(f"SQL参数: {row}")
+            logger.error(f"报错: {e}")
+            return False
+
+    async def close(self):
+        """停止后台协程并写完剩余数据"""
+        if self.flush_task:
+            # 不直接取消，避免正在写入的批次丢失结果
+            self.closing = True
+            self.wakeup.set()
+            await self.flush_task
+            self.flush_task = None
+        if self.flush_lock and self.buffer:
+            await self.flush()
+        logger.info("文章写入缓冲区已清空")
+
+
+article_writer = ArticleWriter()
@@ -0,0 +1,259 @@
+import asyncio
+import json
+import os
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from core.base import BaseSpider
+from core.crawl_budget import crawl_budget
+from core.database import db_manager
+from core.list_walker import parse_date
+from core.logger_utils import logger
+from core.negative_cache import RecentlyFailed
+from core.task_executor import TaskExecutor
+
+
+@dataclass
+class BackfillProgress:
+    source: str
+    category: str
+    until_at: datetime
+    cursor: Any = None
+    oldest_at: Optional[datetime] = None
+    pages: int = 0
+    items: int = 0
+    saved: int = 0
+    status: str = "pending"  # pending / running / done / failed
+
+
+class BackfillRunner:
+    """
+    历史回填：从列表的最新位置往回翻页（搜狐、网易按页码，澎湃按 startTime，中国日报按分页地址），
+    直到文章发布时间早于目标日期或列表到底。
+
+    每翻完一页把游标保存到 crawl_backfill 表，中断后从上次的位置继续；
+    回填完成后再设置更早的目标日期，会从已到达的位置接着往回翻。
+    回填是低优先级任务：详情抓取并发只有 BACKFILL_CONCURRENCY，每页之间停顿 BACKFILL_PAGE_DELAY 秒，
+    同一来源有实时爬取的分类在进行时先让路（最多等 BACKFILL_YIELD_MAX 秒）；
+    请求仍经过按主机的限速，文章通过批量写入器入库。
+    """
+
+    def __init__(self):
+        self.progress: Dict[Tuple[str, str], BackfillProgress] = {}
+        self.concurrency = None
+        self.page_delay = None
+        self.max_pages = None
+        self.yield_max = None
+
+    def _load_config(self):
+        if self.concurrency is not None:
+            return
+        self.concurrency = int(os.getenv("BACKFILL_CONCURRENCY", 2))
+        self.page_delay = float(os.getenv("BACKFILL_PAGE_DELAY", 1))
+        self.max_pages = int(os.getenv("BACKFILL_MAX_PAGES", 500))
+        self.yield_max = float(os.getenv("BACKFILL_YIELD_MAX", 60))
+
+    async def run(
+        self, spider, until: datetime, categories: Optional[Sequence[str]] = None
+    ) -> int:
+        """
+        回填一个爬虫的分类
+
+        :param until: 目标日期，回填到发布时间早于它为止
+        :param categories: 分类名称，默认全部分类
+        :return: 保存的文章数
+        """
+        self._load_config()
+        category_list = getattr(spider, "category_list", None) or [
+            {"name": spider.category, "code": None}
+        ]
+        if categories:
+            category_list = [c for c in category_list if c["name"] in categories]
+        saved = 0
+        for category in category_list:
+            try:
+                saved += await self._run_category(spider, category, until)
+            except NotImplementedError as e:
+                logger.warning(str(e))
+                break
+        logger.success(f"{spider.source_name} 回填到 {until:%Y-%m-%d} 完成，保存了 {saved} 篇文章")
+        return saved
+
+    async def _run_category(self, spider, category: Dict, until: datetime) -> int:
+        name = spider.source_name
+        progress = await self._load(name, category["name"])
+        if progress and progress.status == "done" and progress.until_at <= until:
+            logger.info(f"{name} {category['name']} 已回填到 {progress.until_at:%Y-%m-%d}，跳过")
+            return 0
+        if progress and progress.status == "done" and progress.cursor is None:
+            logger.info(f"{name} {category['name']} 的列表已经回填到底，跳过")
+            return 0
+        if progress is None:
+            progress = BackfillProgress(
+                name, category["name"], until, spider.backfill_start_cursor(category)
+            )
+        elif progress.pages:
+            logger.info(f"{name} {category['name']} 从第 {progress.pages + 1} 页继续回填")
+        progress.until_at = until
+        progress.status = "running"
+        self.progress[(name, category["name"])] = progress
+
+        saved_before = progress.saved
+        try:
+            while progress.cursor is not None and progress.pages < self.max_pages:
+                await self._yield_to_live(name)
+                items, next_cursor = await spider.get_backfill_page(category, progress.cursor)
+                dates = [d for d in (parse_date(item.get("date_str")) for item in items) if d]
+                in_range = [
+                    item
+                    for item in items
+                    if (parse_date(item.get("date_str")) or until) >= until
+                ]
+                progress.saved += await self._crawl_items(spider, in_range)
+                progress.pages += 1
+                progress.items += len(in_range)
+                if dates:
+                    oldest = min(dates)
+                    progress.oldest_at = min(progress.oldest_at or oldest, oldest)
+                reached = bool(dates) and min(dates) < until
+                # 跨过目标日期的这一页留作游标，以后回填到更早的日期时从这一页接着取
+                if not reached:
+                    progress.cursor = next_cursor
+                if reached or next_cursor is None:
+                    progress.status = "done"
+                await self._save(progress)
+                reached_at = (
+                    f"，已到 {progress.oldest_at:%Y-%m-%d %H:%M}" if progress.oldest_at else ""
+                )
+                logger.progress(f"{name} {category['name']} 回填第 {progress.pages} 页{reached_at}")
+                if progress.status == "done":
+                    break
+                await asyncio.sleep(self.page_delay)
+        except NotImplementedError:
+            self.progress.pop((name, category["name"]), None)
+            raise
+        except asyncio.CancelledError:
+            progress.status = "pending"
+            await self._save(progress)
+            raise
+        except Exception as e:
+            logger.error(f"{name} {category['name']} 回填失败: {e}")
+            progress.status = "failed"
+            await self._save(progress)
+        return progress.saved - saved_before
+
+    async def _yield_to_live(self, source: str):
+        """同一来源有实时爬取在进行时等待，避免回填占用它的请求配额"""
+        waited = 0.0
+        while crawl_budget.active(source) and waited < self.yield_max:
+            await asyncio.sleep(1)
+            waited += 1
+
+    async def _crawl_items(self, spider, items: List[Dict]) -> int:
+        if not items:
+            return 0
+        filtered = await spider.filter_existing(items)
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def crawl(item) -> bool:
+            async with semaphore:
+                try:
+                    news_info = await spider.fetch_news_info(item)
+                    return bool(news_info) and await spider.save_article(news_info)
+                except RecentlyFailed as e:
+                    logger.warning(str(e))
+                    return False
+                except Exception as e:
+                    logger.error(f"回填文章失败: {e}")
+                    return False
+
+        return sum(await asyncio.gather(*[crawl(item) for item in filtered]))
+
+    async def _load(self, source: str, category: str) -> Optional[BackfillProgress]:
+        if (source, category) in self.progress:
+            return self.progress[(source, category)]
+        if db_manager.pool is None:
+            return None
+        row = await db_manager.fetchone(
+            "SELECT * FROM crawl_backfill WHERE source = %s AND category = %s", (source, category)
+        )
+        if not row:
+            return None
+        return BackfillProgress(
+            source,
+            category,
+            row["until_at"],
+            json.loads(row["page_cursor"]) if row["page_cursor"] else None,
+            row["oldest_at"],
+            row["pages"],
+            row["items"],
+            row["saved"],
+            row["status"],
+        )
+
+    async def _save(self, progress: BackfillProgress):
+        if db_manager.pool is None:
+            return
+        try:
+            await db_manager.execute(
+                """
+                INSERT INTO crawl_backfill (source, category, until_at, page_cursor, oldest_at,
+                    pages, items, saved, status)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+                ON DUPLICATE KEY UPDATE until_at = VALUES(until_at),
+                    page_cursor = VALUES(page_cursor),
+                    oldest_at = VALUES(oldest_at), pages = VALUES(pages), items = VALUES(items),
+                    saved = VALUES(saved), status = VALUES(status)
+                """,
+                (
+                    progress.source,
+                    progress.category,
+                    progress.until_at,
+                    json.dumps(progress.cursor) if progress.cursor is not None else None,
+                    progress.oldest_at,
+                    progress.pages,
+                    progress.items,
+                    progress.saved,
+                    progress.status,
+                ),
+            )
+        except Exception as e:
+            logger.error(f"保存 {progress.source}/{progress.category} 的回填进度失败: {e}")
+
+    async def snapshot(self) -> List[Dict]:
+        """各分类的回填进度（包括以前运行保存的）"""
+        rows = {}
+        if db_manager.pool is not None:
+            try:
+                for row in await db_manager.fetchall("SELECT * FROM crawl_backfill"):
+                    rows[(row["source"], row["category"])] = BackfillProgress(
+                        row["source"], row["category"], row["until_at"], None, row["oldest_at"],
+                        row["pages"], row["items"], row["saved"], row["status"],
+                    )
+            except Exception as e:
+                logger.error(f"获取回填进度失败: {e}")
+        rows.update(self.progress)
+        return [
+            {
+                "source": p.source,
+                "category": p.category,
+                "until": p.until_at.isoformat() if p.until_at else None,
+                "oldest": p.oldest_at.isoformat() if p.oldest_at else None,
+                "pages": p.pages,
+                "items": p.items,
+                "saved": p.saved,
+                "status": p.status,
+            }
+            for p in rows.values()
+        ]
+
+
+def supports_backfill(spider) -> bool:
+    """爬虫是否实现了回填翻页"""
+    return type(spider).get_backfill_page is not BaseSpider.get_backfill_page
+
+
+backfill_runner = BackfillRunner()
+# 回填单独排队，长时间运行的回填不占用 API 任务的执行名额
+backfill_executor = TaskExecutor(concurrency_env="BACKFILL_MAX_JOBS", default_concurrency=1)
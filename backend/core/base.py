@@ -2,13 +2,30 @@
 import json
 
 import aiohttp
-import chardet
 
+from core.article_writer import article_writer
+from core.charset import charset_decoder
+from core.concurrency import concurrency_controller
 from core.database import db_manager
+from core.freshness import freshness_tracker
+from core.http_client import http_client
 from core.logger_utils import logger
-from typing import List, Dict, Optional
-import asyncio
+from core.negative_cache import RecentlyFailed, failure_kind, negative_cache
+from core.pipeline import CrawlPipeline
+from core.rate_limiter import rate_limiter
+from core.response_store import ResponseNotRecorded, response_store
+from core.retry import retry_manager
+from core.seen_filter import seen_filter
+from core.validator_cache import NotModified, request_key, validator_cache
+from typing import List, Dict, Optional, Tuple
+from contextvars import ContextVar
 from datetime import datetime
+from urllib.parse import urlparse
+
+# 当前详情抓取中请求失败的异常，get_news_info 自己吞掉异常时也能区分失败类别
+_request_errors: ContextVar[Optional[list]] = ContextVar("request_errors", default=None)
+# 条件请求返回 304 的标记
+_NOT_MODIFIED = object()
 
 
 class BaseSpider:
@@ -22,6 +39,24 @@ class BaseSpider:
     }
     source_name = "Unknown"  # 子类需要设置这个属性
     category = "General"  # 子类可以设置分类
+    list_host = None  # 分类代码不是URL时，列表接口所在的主机
+    recrawl_interval = None  # 设置后按分类自适应重爬，值为各分类的初始间隔（秒）
+    checkpoint = None  # API 任务运行时的进度检查点（TaskCheckpoint）
+    lease_lists = True  # 启用共享前沿时是否租用分类列表，API 任务等显式触发的运行设为 False
+
+    def category_key(self, code) -> str:
+        """分类的名称，用于按分类统计"""
+        if isinstance(code, dict):
+            return code.get("name") or str(code.get("code"))
+        return self.category if code is None else str(code)
+
+    def category_host(self, code) -> str:
+        """分类列表请求的主机，用于按主机分配爬取预算"""
+        if isinstance(code, dict):
+            code = code.get("code")
+        if isinstance(code, str) and code.startswith("http"):
+            return urlparse(code).hostname or self.source_name
+        return self.list_host or urlparse(self.url or "").hostname or self.source_name
 
     async def request(
         self,
@@ -32,45 +67,123 @@ class BaseSpider:
         data=None,
         json=None,
         timeout=10,
+        attempts=None,
+        conditional=False,
+        store_body=None,
     ):
         """
-        异步发送 HTTP 请求。
+        异步发送 HTTP 请求，使用进程级共享的连接池会话。
 
         :param method: 请求方法，默认为 GET
         :param url: 请求URL，如果不提供则使用self.url
         :param headers: 请求头
         :param params: 请求参数
         :param data: 请求数据
+        :param json: JSON 请求体
         :param timeout: 请求超时时间，默认为 10 秒
-        :return: 响应对象或 None
+        :param attempts: 最多尝试次数，默认 RETRY_MAX_ATTEMPTS
+        :param conditional: 带上次响应的 ETag / Last-Modified 发送条件请求，
+            服务器返回 304 时抛出 NotModified
+        :param store_body: 计算响应录制键时代替 data / json 的请求体，
+            用于去掉请求体中的时间戳等每次都不同的字段，默认使用实际的请求体
+        :return: 按声明的编码（或检测的编码）解码后的响应正文；回放模式下为录制的响应正文
+        :raises NotModified: 条件请求返回 304
+        :raises ResponseNotRecorded: 仅回放模式下该请求没有录制过
+        :raises CircuitOpenError: 该主机已熔断
+        :raises aiohttp.ClientError: 重试用完后仍失败的请求（含非 2xx 状态码）
+        :raises asyncio.TimeoutError: 重试用完后仍超时
         """
         request_url = url or self.url
         if not request_url:
             raise ValueError("URL is required")
 
-        async with aiohttp.ClientSession() as session:
-            try:
+        # 复用进程级共享会话，保持长连接，避免每次请求重新握手
+        session = await http_client.get_session()
+
+        # 响应录制：回放模式下直接返回磁盘上录制的响应，不访问网络
+        store_key = None
+        if response_store.reads or response_store.writes:
+            if store_body is None:
+                store_key = response_store.request_key(method, request_url, params, data, json)
+            else:
+                store_key = response_store.request_key(method, request_url, params, store_body)
+        if response_store.reads:
+            recorded = await response_store.load(store_key)
+            if recorded:
+                content, meta = recorded
+                return charset_decoder.decode(content, meta.get("charset"), meta.get("host"))
+            if response_store.replay_only:
+                raise ResponseNotRecorded(method, request_url)
+
+        request_headers = headers or self.headers
+        validator_key = None
+        received = {}
+        if conditional:
+            validator_key = request_key(method, request_url, params)
+            request_headers = {**request_headers, **await validator_cache.headers_for(validator_key)}
+
+        async def send():
+            # 按主机限速，同一站点的所有爬虫共用令牌桶；先拿令牌再占并发槽位，
+            # 等令牌的时间不计入请求延迟，也不占用槽位
+            await rate_limiter.acquire(request_url)
+            # 按主机自适应并发：超时、429、5xx 会降低该主机的并发上限
+            async with concurrency_controller.slot(request_url):
                 async with session.request(
                     method=method,
                     url=request_url,
-                    headers=headers or self.headers,
+                    headers=request_headers,
                     params=params,
                     json=json,
                     data=data,
                     timeout=aiohttp.ClientTimeout(total=timeout),
                 ) as response:
+                    if validator_key and response.status == 304:
+                        return _NOT_MODIFIED
                     # 检查响应状态码
                     response.raise_for_status()
 
                     content = await response.read()
-                    code = chardet.detect(content)["encoding"]
-                    if code == "Windows-1254":  # 误判 chardet底层的问题
-                        code = "utf-8"
-                    return await response.text(encoding=code)
-            except aiohttp.ClientError as e:
-                raise e
-            except Exception as e:
-                raise e
+                    received.update(
+                        content=content,
+                        status=response.status,
+                        charset=response.charset,
+                        host=response.url.host,
+                        headers={
+                            name: response.headers[name]
+                            for name in ("Content-Type", "ETag", "Last-Modified")
+                            if name in response.headers
+                        },
+                    )
+                    # 优先使用声明的编码，只解码一次
+                    return charset_decoder.decode(
+                        content, response.charset, response.url.host
+                    )
+
+        # 超时、连接错误和临时状态码退避后重试，主机持续失败时熔断
+        try:
+            text = await retry_manager.call(request_url, send, attempts)
+        except Exception as e:
+            errors = _request_errors.get()
+            if errors is not None:
+                errors.append(e)
+            raise
+        if text is _NOT_MODIFIED:
+            validator_cache.not_modified += 1
+            raise NotModified(request_url)
+        if validator_key:
+            await validator_cache.received(
+                validator_key,
+                request_url,
+                received["headers"].get("ETag"),
+                received["headers"].get("Last-Modified"),
+            )
+        if response_store.writes:
+            await response_store.save(
+                store_key,
+                received.pop("content"),
+                {"method": method.upper(), "url": request_url, "params": params, **received},
+            )
+        return text
 
     async def get_news_list(self, code=None) -> List[Dict]:
         """
@@ -91,6 +204,94 @@ class BaseSpider:
         """
         raise NotImplementedError("Subclasses must implement get_news_info method")
 
+    async def fetch_news_info(self, item: Dict) -> Optional[Dict]:
+        """
+        获取新闻详情，最近失败过的文章在记录过期前直接跳过
+
+        :param item: 新闻项目
+        :return: 新闻详情字典，失败时返回 None
+        :raises RecentlyFailed: 文章在失败记录中，本次没有请求
+        """
+        article_url = item["article_url"]
+        kind = await negative_cache.get(article_url)
+        if kind:
+            raise RecentlyFailed(article_url, kind)
+        errors = []
+        token = _request_errors.set(errors)
+        try:
+            news_info = await self.get_news_info(item)
+        except Exception as e:
+            await negative_cache.add(article_url, failure_kind(e))
+            raise
+        finally:
+            _request_errors.reset(token)
+        if not news_info:
+            # 请求失败按异常分类，请求成功但解析为空（视频页、内容过短）记为 empty
+            await negative_cache.add(article_url, failure_kind(errors[-1] if errors else None))
+        return news_info
+
+    def backfill_start_cursor(self, category):
+        """回填的起始游标，默认从第一页开始"""
+        return 1
+
+    async def get_backfill_page(self, category, cursor) -> Tuple[List[Dict], object]:
+        """
+        回填时获取一页更早的列表，支持回填的子类实现此方法
+
+        :param category: 分类
+        :param cursor: 页游标（页码或时间戳）
+        :return: (文章列表, 下一页游标)，没有更早的文章时游标为 None
+        """
+        raise NotImplementedError(f"{self.source_name} 不支持回填")
+
+    async def filter_existing(self, news_list: List[Dict]) -> List[Dict]:
+        """
+        批量去重：一次查询找出标题或URL已存在的文章
+
+        用 UNION 拆开两个条件，article_url 唯一索引和 idx_title 索引都能生效，
+        避免 OR 条件导致全表扫描。
+
+        :param news_list: 新闻列表
+        :return: 数据库中尚不存在的新闻
+        """
+        if not news_list:
+            return []
+
+        # 内存过滤器判定为未见过的文章一定不在库中，只把可能存在的交给数据库确认
+        await seen_filter.refresh_if_stale()
+        candidates = [item for item in news_list if seen_filter.might_contain(item)]
+        if not candidates:
+            return list(news_list)
+
+        urls = list({item["article_url"] for item in candidates if item.get("article_url")})
+        titles = list({item["title"] for item in candidates if item.get("title")})
+        queries = []
+        params = []
+        if urls:
+            queries.append(
+                "SELECT title, article_url FROM accounts_accountnews "
+                f"WHERE article_url IN ({', '.join(['%s'] * len(urls))})"
+            )
+            params.extend(urls)
+        if titles:
+            queries.append(
+                "SELECT title, article_url FROM accounts_accountnews "
+                f"WHERE title IN ({', '.join(['%s'] * len(titles))})"
+            )
+            params.extend(titles)
+        if not queries:
+            return list(news_list)
+
+        rows = await db_manager.fetchall(" UNION ".join(queries), tuple(params))
+        existing_urls = {row["article_url"] for row in rows}
+        existing_titles = {row["title"] for row in rows}
+        return [
+            item
+            for item in news_list
+            if item.get("article_url") not in existing_urls
+            and item.get("title") not in existing_titles
+        ]
+
     async def save_article(self, article_data: Dict) -> bool:
         """
         保存文章到数据库
@@ -111,23 +312,17 @@ class BaseSpider:
                 )
                 return False
 
-            # 插入新文章
-            sql = """
-                INSERT INTO accounts_accountnews (
-                    title, article_url, cover_url, content, 
-                    date_str, source, category, img_list, status,
-                    platform_data, created_at, updated_at, task_id
-                )
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                """
+            # 交给批量写入器，与其他文章合并成多行 INSERT
+            published = datetime.strptime(date_str, "%Y-%m-%d %H:%M:%S")
+            category = article_data.get("category", self.category)
             params = (
                 article_data["title"],
                 article_data["article_url"],
                 article_data.get("cover_url"),
                 article_data.get("article_info"),
-                datetime.strptime(date_str, "%Y-%m-%d %H:%M:%S"),
+                published,
                 self.source_name,
-                article_data.get("category", self.category),
+                category,
                 img_list_json,
                 0,
                 json.dumps({}),
@@ -135,24 +330,22 @@ class BaseSpider:
                 datetime.now(),
                 getattr(self, 'task_id', None),
             )
-            await db_manager.execute(sql, params)
+            if not await article_writer.submit(params):
+                logger.skip(f"文章已存在: {article_data['title']}")
+                return False
+            seen_filter.add(article_data["article_url"], article_data["title"])
+            # 记录从发布到入库的延迟
+            freshness_tracker.record(self.source_name, category, published, datetime.now())
             return True
 
         except Exception as e:
-
-            if "duplicate key value violates unique constraint" in str(e).lower():
-                logger.skip(f"文章已存在: {article_data['title']}")
-                return False
-            logger.error(f"SQL参数: {params}")
-            logger.error(f"报错: {e}")
+            logger.error(f"保存文章失败: {e}，文章链接: {article_data.get('article_url')}")
             return False
 
     async def crawl_and_save(
         self,
         code=None,
         limit=None,
-        class_sleep_time=0,
-        info_sleep_time=0,
         addition_msg="",
         task_id=None,
     ) -> int:
@@ -163,63 +356,18 @@ class BaseSpider:
         :param limit: 限制数量
         :return: 保存的文章数量
         """
-        try:
-            # 获取新闻列表
-            news_list = await self.get_news_list(code)
-            if limit:
-                news_list = news_list[:limit]
-
-            # 并发获取新闻详情并保存
-            semaphore = asyncio.Semaphore(5)  # 限制并发数
-
-            # 先检查数据库中是否已存在相同标题的文章
-            filtered_news_list = []
-            skip_count = 0
-            for item in news_list:
-                # 检查标题或URL是否已存在
-                existing = await db_manager.fetchone(
-                    "SELECT id FROM accounts_accountnews WHERE title = %s OR article_url = %s",
-                    (item["title"], item["article_url"]),
-                )
-                if not existing:
-                    filtered_news_list.append(item)
-                else:
-                    skip_count += 1
-            logger.skip(f"跳过{skip_count}篇已存在的文章")
-            logger.info(
-                f"{self.source_name}{addition_msg} 总共 {len(news_list)} 篇文章，需要爬取 {len(filtered_news_list)} 篇"
-            )
+        return await self.crawl_units([(code, addition_msg)], limit)
 
-            async def process_news_item(item):
-                async with semaphore:
-                    try:
-                        news_info = await self.get_news_info(item)
-                        if news_info and await self.save_article(news_info):
-                            return 1
-                    except Exception as e:
-                        logger.error(f"处理新闻项目失败: {e}")
-                    return 0
-
-            tasks = []
-            for item in filtered_news_list:
-                task = process_news_item(item)
-                tasks.append(task)
-                if info_sleep_time:
-                    await asyncio.sleep(info_sleep_time)
-
-            if not tasks:  # 如果没有需要爬取的文章，直接返回
-                logger.info(f"{self.source_name}{addition_msg} 没有新文章需要爬取")
-                return 0
-
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-
-            saved_count = sum(r for r in results if isinstance(r, int))
-
-            logger.success(
-                f"{self.source_name}{addition_msg} 爬取完成，保存了 {saved_count if saved_count > 0 else 0} 篇文章"
-            )
-            return saved_count
+    async def crawl_units(self, units: List[Tuple], limit=None) -> int:
+        """
+        通过流式流水线爬取多个分类，各分类的列表发现、去重、详情抓取和入库相互重叠
 
+        :param units: (分类代码, 日志附加信息) 列表
+        :param limit: 每个分类的限制数量
+        :return: 保存的文章数量
+        """
+        try:
+            return await CrawlPipeline(self).run(units, limit)
         except Exception as e:
             logger.error(f"{self.source_name} 爬取失败: {e}")
             return 0
@@ -0,0 +1,105 @@
+import codecs
+import os
+import re
+from typing import Dict, Optional
+
+import chardet
+
+# 只在页面头部查找 <meta charset> 声明
+META_CHARSET_RE = re.compile(
+    rb"""<meta[^>]+charset\s*=\s*["']?\s*([a-zA-Z0-9_\-]+)""", re.IGNORECASE
+)
+
+# chardet 常见误判或需要放宽的编码
+ENCODING_ALIASES = {
+    "windows-1254": "utf-8",  # 误判 chardet底层的问题
+    "ascii": "utf-8",
+    "gb2312": "gb18030",
+    "gbk": "gb18030",
+}
+
+
+class CharsetDecoder:
+    """
+    响应解码器：按 HTTP 头 charset → <meta charset> → UTF-8 → 站点记忆编码 → chardet
+    的顺序确定编码，chardet 只检测有限长度的前缀，正文只解码一次。
+    """
+
+    def __init__(self, sniff_bytes=None, detect_bytes=None):
+        # 环境变量在第一次使用时才读取，模块导入早于 load_dotenv
+        self.sniff_bytes = sniff_bytes
+        self.detect_bytes = detect_bytes
+        self.loaded = False
+        # 每个主机最近一次成功使用的编码
+        self.host_encodings: Dict[str, str] = {}
+
+    def _load_config(self):
+        if self.loaded:
+            return
+        self.sniff_bytes = int(self.sniff_bytes or os.getenv("CHARSET_SNIFF_BYTES", 4096))
+        self.detect_bytes = int(self.detect_bytes or os.getenv("CHARSET_DETECT_BYTES", 32768))
+        self.loaded = True
+
+    def normalize(self, encoding: Optional[str]) -> Optional[str]:
+        """规范化编码名称，无法识别的编码返回 None"""
+        if not encoding:
+            return None
+        encoding = encoding.strip().lower()
+        encoding = ENCODING_ALIASES.get(encoding, encoding)
+        try:
+            return codecs.lookup(encoding).name
+        except LookupError:
+            return None
+
+    def sniff_meta(self, content: bytes) -> Optional[str]:
+        """从页面头部的 <meta charset> 中提取编码"""
+        self._load_config()
+        match = META_CHARSET_RE.search(content[: self.sniff_bytes])
+        if match:
+            return self.normalize(match.group(1).decode("ascii", "ignore"))
+        return None
+
+    def detect(self, content: bytes) -> Optional[str]:
+        """仅对前缀调用 chardet，避免检测整个正文"""
+        self._load_config()
+        return self.normalize(chardet.detect(content[: self.detect_bytes])["encoding"])
+
+    def decode(
+        self, content: bytes, declared: Optional[str] = None, host: Optional[str] = None
+    ) -> str:
+        """
+        将响应字节解码为字符串
+
+        :param content: 响应正文
+        :param declared: HTTP Content-Type 中声明的 charset
+        :param host: 响应所属主机，用于记忆编码
+        :return: 解码后的文本
+        """
+        candidates = [
+            self.normalize(declared),
+            self.sniff_meta(content),
+            # UTF-8 严格解码很少误判，放在站点记忆编码之前
+            "utf-8",
+            self.host_encodings.get(host) if host else None,
+        ]
+        tried = set()
+        for encoding in candidates:
+            if not encoding or encoding in tried:
+                continue
+            tried.add(encoding)
+            try:
+                text = content.decode(encoding)
+            except (UnicodeDecodeError, LookupError):
+                continue
+            if host:
+                self.host_encodings[host] = encoding
+            return text
+
+        # 声明的编码都不可用时才回退到前缀检测
+        encoding = self.detect(content) or "utf-8"
+        if host:
+            self.host_encodings[host] = encoding
+        return content.decode(encoding, errors="replace")
+
+
+charset_decoder = CharsetDecoder()
@@ -0,0 +1,137 @@
+import asyncio
+import os
+import time
+from typing import Dict
+from urllib.parse import urlparse
+
+import aiohttp
+
+from core.logger_utils import logger
+
+# 视为“站点过载”的状态码，触发乘性减小并发
+OVERLOAD_STATUS = {429, 500, 502, 503, 504}
+
+
+class AIMDLimiter:
+    """
+    加性增、乘性减（AIMD）的自适应并发限制器。
+
+    请求成功且延迟低于目标时，每完成约 limit 个请求并发上限加 1；
+    遇到超时、429 或 5xx 时并发上限乘以 decrease_factor，
+    同一冷却期内只减一次，避免一批并发失败把上限压到最低。
+    """
+
+    def __init__(
+        self,
+        name: str,
+        initial_limit: float,
+        min_limit: int,
+        max_limit: int,
+        latency_target: float,
+        decrease_factor: float = 0.5,
+        cooldown: float = 5.0,
+    ):
+        self.name = name
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target = latency_target
+        self.decrease_factor = decrease_factor
+        self.cooldown = cooldown
+        self.in_flight = 0
+        self.last_decrease = 0.0
+        self.condition = asyncio.Condition()
+
+    @property
+    def current_limit(self) -> int:
+        return max(self.min_limit, int(self.limit))
+
+    async def acquire(self):
+        async with self.condition:
+            await self.condition.wait_for(lambda: self.in_flight < self.current_limit)
+            self.in_flight += 1
+
+    async def release(self, outcome: str, latency: float):
+        """
+        释放并发槽位并根据结果调整上限
+
+        :param outcome: success / overload / error（error 不影响上限）
+        :param latency: 本次请求耗时（秒）
+        """
+        async with self.condition:
+            self.in_flight -= 1
+            if outcome == "overload":
+                now = time.monotonic()
+                if now - self.last_decrease >= self.cooldown:
+                    self.last_decrease = now
+                    self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+                    logger.warning(
+                        f"{self.name} 出现超时或过载，并发上限降至 {self.current_limit}"
+                    )
+            elif outcome == "success" and latency <= self.latency_target:
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            self.condition.notify_all()
+
+    def slot(self) -> "ConcurrencySlot":
+        return ConcurrencySlot(self)
+
+
+class ConcurrencySlot:
+    """占用一个并发槽位的上下文管理器，退出时根据异常类型判定结果"""
+
+    def __init__(self, limiter: AIMDLimiter):
+        self.limiter = limiter
+        self.started = 0.0
+
+    async def __aenter__(self):
+        await self.limiter.acquire()
+        self.started = time.monotonic()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            outcome = "success"
+        elif issubclass(exc_type, asyncio.TimeoutError):
+            outcome = "overload"
+        elif (
+            isinstance(exc, aiohttp.ClientResponseError)
+            and exc.status in OVERLOAD_STATUS
+        ):
+            outcome = "overload"
+        else:
+            outcome = "error"
+        await self.limiter.release(outcome, time.monotonic() - self.started)
+        return False
+
+
+class ConcurrencyController:
+    """按主机维护 AIMD 并发限制器"""
+
+    def __init__(self):
+        self.limiters: Dict[str, AIMDLimiter] = {}
+
+    def get(self, host: str) -> AIMDLimiter:
+        limiter = self.limiters.get(host)
+        if limiter is None:
+            limiter = self.limiters[host] = AIMDLimiter(
+                name=host,
+                initial_limit=float(os.getenv("CONCURRENCY_INITIAL", 5)),
+                min_limit=int(os.getenv("CONCURRENCY_MIN", 1)),
+                max_limit=int(os.getenv("CONCURRENCY_MAX", 32)),
+                latency_target=float(os.getenv("CONCURRENCY_LATENCY_TARGET", 2.0)),
+            )
+        return limiter
+
+    def slot(self, url: str) -> ConcurrencySlot:
+        """为 URL 所属主机占用一个并发槽位"""
+        return self.get(urlparse(url).hostname or "").slot()
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """当前各主机的并发上限和在途请求数"""
+        return {
+            host: {"limit": limiter.current_limit, "inFlight": limiter.in_flight}
+            for host, limiter in self.limiters.items()
+        }
+
+
+concurrency_controller = ConcurrencyController()
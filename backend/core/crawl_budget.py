@@ -0,0 +1,113 @@
+import asyncio
+import os
+from typing import Dict, Optional
+
+
+class BudgetLease:
+    """一个分类占用的预算，分类处理完成后释放，重复释放无效"""
+
+    def __init__(self, semaphores):
+        self.semaphores = semaphores
+        self.released = False
+
+    def release(self):
+        if self.released:
+            return
+        self.released = True
+        for semaphore in self.semaphores:
+            semaphore.release()
+
+
+class CrawlBudget:
+    """
+    进程级分类爬取预算：限制同时在处理中的分类数。
+
+    一个分类从拉取列表开始占用预算，直到它的所有文章入库或失败后释放，
+    同时受全局、单个来源、单个列表主机三级上限约束。
+    全局名额中预留 CRAWL_BUDGET_RESERVED 个给有新鲜度目标的分类，普通分类用不到这部分。
+    所有爬虫共用同一份预算，多个来源的分类可以同时进行，
+    整轮耗时取决于最慢的主机，而不是所有分类耗时之和。
+    """
+
+    def __init__(self, global_limit=None, per_source=None, per_host=None, reserved=None):
+        self.global_limit = global_limit
+        self.per_source = per_source
+        self.per_host = per_host
+        self.reserved = reserved
+        self.global_semaphore: Optional[asyncio.Semaphore] = None
+        self.bulk_semaphore: Optional[asyncio.Semaphore] = None
+        self.source_semaphores: Dict[str, asyncio.Semaphore] = {}
+        self.host_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    def _load_config(self):
+        if self.global_semaphore is not None:
+            return
+        self.global_limit = int(self.global_limit or os.getenv("CRAWL_BUDGET_GLOBAL", 24))
+        self.per_source = int(self.per_source or os.getenv("CRAWL_BUDGET_PER_SOURCE", 6))
+        self.per_host = int(self.per_host or os.getenv("CRAWL_BUDGET_PER_HOST", 4))
+        self.reserved = int(
+            self.reserved if self.reserved is not None else os.getenv("CRAWL_BUDGET_RESERVED", 4)
+        )
+        self.reserved = min(self.reserved, self.global_limit - 1)
+        self.global_semaphore = asyncio.Semaphore(self.global_limit)
+        self.bulk_semaphore = asyncio.Semaphore(self.global_limit - self.reserved)
+
+    async def acquire(self, source: str, host: str, priority: bool = False) -> BudgetLease:
+        """
+        等待并占用一个分类的预算
+
+        :param source: 来源名称
+        :param host: 列表接口所在主机
+        :param priority: 是否为有新鲜度目标的分类，可以使用预留名额
+        :return: 分类完成时调用 release() 的租约
+        """
+        self._load_config()
+        source_semaphore = self.source_semaphores.setdefault(
+            source, asyncio.Semaphore(self.per_source)
+        )
+        host_semaphore = self.host_semaphores.setdefault(
+            host, asyncio.Semaphore(self.per_host)
+        )
+        # 所有调用方按同一顺序获取，先占用细粒度的名额，不会互相死锁
+        semaphores = [source_semaphore, host_semaphore]
+        if not priority:
+            semaphores.append(self.bulk_semaphore)
+        semaphores.append(self.global_semaphore)
+        acquired = []
+        try:
+            for semaphore in semaphores:
+                await semaphore.acquire()
+                acquired.append(semaphore)
+        except BaseException:
+            for semaphore in acquired:
+                semaphore.release()
+            raise
+        return BudgetLease(acquired)
+
+    def active(self, source: str) -> int:
+        """来源当前正在处理的分类数"""
+        semaphore = self.source_semaphores.get(source)
+        return self.per_source - semaphore._value if semaphore else 0
+
+    def snapshot(self) -> Dict:
+        """当前各级预算的占用情况"""
+        if self.global_semaphore is None:
+            return {}
+        return {
+            "global": {
+                "limit": self.global_limit,
+                "active": self.global_limit - self.global_semaphore._value,
+                "reserved": self.reserved,
+            },
+            "bySource": {
+                source: self.per_source - semaphore._value
+                for source, semaphore in self.source_semaphores.items()
+            },
+            "byHost": {
+                host: self.per_host - semaphore._value
+                for host, semaphore in self.host_semaphores.items()
+            },
+        }
+
+
+crawl_budget = CrawlBudget()
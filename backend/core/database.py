@@ -145,5 +145,171 @@ class MySQLManager:
                 except Exception as e:
                     print(f"prompt 列可能已存在: {e}")
 
+                # 调度任务表：触发规则和下次运行时间，重启后按原计划继续
+                await cursor.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS crawl_jobs (
+                        id VARCHAR(100) PRIMARY KEY,
+                        kind VARCHAR(50) NOT NULL,
+                        trigger_type VARCHAR(20) NOT NULL,
+                        trigger_value VARCHAR(100) NOT NULL,
+                        payload JSON,
+                        jitter INT DEFAULT 0,
+                        misfire_grace INT,
+                        max_instances INT DEFAULT 1,
+                        next_run_at DATETIME,
+                        last_run_at DATETIME,
+                        last_status VARCHAR(20),
+                        enabled SMALLINT DEFAULT 1,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+                    )
+                    """
+                )
+
+                # 共享爬取前沿：分类列表和文章详情的带租约工作项
+                await cursor.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS crawl_frontier (
+                        id BIGINT AUTO_INCREMENT PRIMARY KEY,
+                        item_key CHAR(40) NOT NULL UNIQUE,
+                        kind VARCHAR(20) NOT NULL,
+                        source VARCHAR(100) NOT NULL,
+                        payload JSON,
+                        status VARCHAR(10) NOT NULL DEFAULT 'pending',
+                        lease_owner VARCHAR(100),
+                        lease_token CHAR(32),
+                        lease_expires_at DATETIME,
+                        available_at DATETIME NOT NULL,
+                        attempts INT DEFAULT 0,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+                        INDEX idx_lease_token (lease_token),
+                        INDEX idx_kind_source (kind, source, status)
+                    )
+                    """
+                )
+
+                # 分类重爬统计：估计的新文章速率和自适应的重爬间隔
+                await cursor.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS crawl_category_stats (
+                        source VARCHAR(100) NOT NULL,
+                        category VARCHAR(100) NOT NULL,
+                        interval_seconds DOUBLE NOT NULL,
+                        rate DOUBLE,
+                        last_visit_at DATETIME,
+                        next_due_at DATETIME,
+                        visits INT DEFAULT 0,
+                        new_total INT DEFAULT 0,
+                        skipped_total INT DEFAULT 0,
+                        PRIMARY KEY (source, category)
+                    )
+                    """
+                )
+
+                # 分类列表的高水位：已见过的最新文章，翻页到这里为止
+                await cursor.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS crawl_list_watermarks (
+                        source VARCHAR(100) NOT NULL,
+                        category VARCHAR(100) NOT NULL,
+                        latest_at DATETIME,
+                        latest_id VARCHAR(100),
+                        pages INT DEFAULT 0,
+                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+                        PRIMARY KEY (source, category)
+                    )
+                    """
+                )
+
+                # 历史回填进度：每个分类往回翻到的位置
+                await cursor.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS crawl_backfill (
+                        source VARCHAR(100) NOT NULL,
+                        category VARCHAR(100) NOT NULL,
+                        until_at DATETIME NOT NULL,
+                        page_cursor VARCHAR(255),
+                        oldest_at DATETIME,
+                        pages INT DEFAULT 0,
+                        items INT DEFAULT 0,
+                        saved INT DEFAULT 0,
+                        status VARCHAR(20) NOT NULL,
+                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+                        PRIMARY KEY (source, category)
+                    )
+                    """
+                )
+
+                # 详情获取失败的文章地址（负缓存），过期后重新抓取
+                await cursor.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS crawl_negative_cache (
+                        url_key CHAR(40) PRIMARY KEY,
+                        url TEXT NOT NULL,
+                        kind VARCHAR(20) NOT NULL,
+                        expires_at DATETIME NOT NULL,
+                        INDEX idx_expires_at (expires_at)
+                    )
+                    """
+                )
+
+                # 分类列表上次完整处理时的指纹，列表未变化时跳过去重和详情抓取
+                await cursor.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS crawl_list_fingerprints (
+                        source VARCHAR(100) NOT NULL,
+                        category VARCHAR(100) NOT NULL,
+                        fingerprint CHAR(32) NOT NULL,
+                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+                        PRIMARY KEY (source, category)
+                    )
+                    """
+                )
+
+                # 列表接口的 HTTP 校验器，用于条件请求
+                await cursor.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS crawl_http_validators (
+                        request_key CHAR(40) PRIMARY KEY,
+                        url TEXT NOT NULL,
+                        etag VARCHAR(255),
+                        last_modified VARCHAR(64),
+                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+                    )
+                    """
+                )
+
+                # API 创建的爬取任务和运行进度检查点
+                await cursor.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS crawl_tasks (
+                        id INT AUTO_INCREMENT PRIMARY KEY,
+                        name VARCHAR(255) NOT NULL,
+                        source VARCHAR(100) NOT NULL,
+                        source_name VARCHAR(100),
+                        categories JSON,
+                        category_counts JSON,
+                        rate VARCHAR(20),
+                        rate_seconds INT,
+                        count INT DEFAULT 10,
+                        priority INT DEFAULT 0,
+                        status VARCHAR(20) NOT NULL,
+                        data_count INT DEFAULT 0,
+                        checkpoint JSON,
+                        created_at DATETIME NOT NULL,
+                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+                    )
+                    """
+                )
+                # 任务 ID 接在已入库文章引用过的 task_id 之后，避免新任务认领旧任务的文章
+                await cursor.execute("SELECT MAX(task_id) FROM accounts_accountnews")
+                max_task_id = (await cursor.fetchone())[0]
+                if max_task_id:
+                    await cursor.execute(
+                        f"ALTER TABLE crawl_tasks AUTO_INCREMENT = {int(max_task_id) + 1}"
+                    )
+
 
 db_manager = MySQLManager()
@@ -0,0 +1,159 @@
+import json
+import math
+import os
+import time
+from collections import deque
+from datetime import datetime
+from typing import Deque, Dict, Iterable, Optional, Tuple
+
+from core.database import db_manager
+from core.logger_utils import logger
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+def percentile(sorted_values, pct: float) -> float:
+    """最近秩法计算百分位数，sorted_values 需已排序且非空"""
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(values: Iterable[float]) -> Dict:
+    values = sorted(values)
+    if not values:
+        return {"count": 0}
+    summary = {"count": len(values)}
+    for pct in PERCENTILES:
+        summary[f"p{pct}"] = round(percentile(values, pct), 1)
+    return summary
+
+
+class FreshnessTracker:
+    """
+    新鲜度指标：文章从发布（date_str）到入库的延迟。
+
+    每篇成功入库的文章按来源和分类记录一个延迟样本，每个分类保留最近 FRESHNESS_WINDOW 个，
+    超过 FRESHNESS_MAX_LAG 秒的（首次爬取的旧文章、回填）不计入。
+    数据库可用时每 FRESHNESS_REFRESH_INTERVAL 秒从最近入库的 FRESHNESS_SAMPLE_ROWS 篇文章
+    （created_at - date_str）重新计算样本，调度进程、工作进程和 API 进程入库的文章都会计入，重启后也不会丢失。
+    FRESHNESS_TARGETS 为运营设置的目标，JSON 格式，键为“分类”或“来源/分类”，
+    例如 {"时事热点": {"p95": 300}, "国际": {"p95": 300}}；
+    有目标的分类优先占用爬取预算，重爬间隔不超过目标，未达标时再减半。
+    """
+
+    def __init__(self):
+        self.samples: Dict[Tuple[str, str], Deque[float]] = {}
+        self.targets: Dict[str, Tuple[int, float]] = {}
+        self.window = None
+        self.max_lag = None
+        self.refresh_interval = None
+        self.sample_rows = None
+        self.refreshed_at = 0.0
+
+    def load_config(self):
+        """读取窗口大小和新鲜度目标"""
+        self.window = int(os.getenv("FRESHNESS_WINDOW", 1000))
+        self.max_lag = float(os.getenv("FRESHNESS_MAX_LAG", 172800))
+        self.refresh_interval = float(os.getenv("FRESHNESS_REFRESH_INTERVAL", 60))
+        self.sample_rows = int(os.getenv("FRESHNESS_SAMPLE_ROWS", 20000))
+        self.targets = {}
+        try:
+            raw = json.loads(os.getenv("FRESHNESS_TARGETS") or "{}")
+            for key, target in raw.items():
+                (name, seconds), = target.items()
+                self.targets[key] = (int(name.lstrip("pP")), float(seconds))
+        except Exception as e:
+            logger.error(f"FRESHNESS_TARGETS 配置无效: {e}")
+
+    def record(self, source: str, category: str, published: datetime, stored: datetime):
+        """记录一篇文章的发布到入库延迟"""
+        if self.window is None:
+            self.load_config()
+        lag = max(0.0, (stored - published).total_seconds())
+        if lag > self.max_lag:
+            return
+        key = (source, category)
+        if key not in self.samples:
+            self.samples[key] = deque(maxlen=self.window)
+        self.samples[key].append(lag)
+
+    async def refresh(self, force: bool = False):
+        """从数据库中最近入库的文章重新计算延迟样本"""
+        if self.window is None:
+            self.load_config()
+        if db_manager.pool is None:
+            return
+        if not force and time.monotonic() - self.refreshed_at < self.refresh_interval:
+            return
+        self.refreshed_at = time.monotonic()
+        try:
+            rows = await db_manager.fetchall(
+                "SELECT source, category, date_str, created_at FROM accounts_accountnews "
+                "ORDER BY id DESC LIMIT %s",
+                (self.sample_rows,),
+            )
+        except Exception as e:
+            logger.error(f"加载新鲜度样本失败: {e}")
+            return
+        samples: Dict[Tuple[str, str], Deque[float]] = {}
+        # 按入库顺序加入，每个分类保留最近的 FRESHNESS_WINDOW 个
+        for row in reversed(rows):
+            if not isinstance(row["date_str"], datetime) or not isinstance(row["created_at"], datetime):
+                continue
+            lag = max(0.0, (row["created_at"] - row["date_str"]).total_seconds())
+            if lag > self.max_lag:
+                continue
+            key = (row["source"], row["category"])
+            if key not in samples:
+                samples[key] = deque(maxlen=self.window)
+            samples[key].append(lag)
+        self.samples = samples
+
+    def target_for(self, source: str, category: str) -> Optional[Tuple[int, float]]:
+        """分类的新鲜度目标 (百分位, 秒)，“来源/分类”优先于“分类”"""
+        if self.window is None:
+            self.load_config()
+        return self.targets.get(f"{source}/{category}") or self.targets.get(category)
+
+    def is_priority(self, source: str, category: str) -> bool:
+        return self.target_for(source, category) is not None
+
+    def current(self, source: str, category: str, pct: int) -> Optional[float]:
+        values = self.samples.get((source, category))
+        if not values:
+            return None
+        return percentile(sorted(values), pct)
+
+    def interval_cap(self, source: str, category: str) -> Optional[float]:
+        """有目标的分类的最大重爬间隔：不超过目标延迟，未达标时减半"""
+        target = self.target_for(source, category)
+        if target is None:
+            return None
+        pct, seconds = target
+        observed = self.current(source, category, pct)
+        if observed is not None and observed > seconds:
+            return seconds / 2
+        return seconds
+
+    def snapshot(self) -> Dict:
+        """整体、各来源、各分类的延迟百分位（秒）和目标达成情况"""
+        by_source: Dict[str, list] = {}
+        by_category = {}
+        for (source, category), values in self.samples.items():
+            by_source.setdefault(source, []).extend(values)
+            summary = summarize(values)
+            target = self.target_for(source, category)
+            if target:
+                pct, seconds = target
+                observed = percentile(sorted(values), pct)
+                summary["target"] = {f"p{pct}": seconds}
+                summary["targetMet"] = observed <= seconds
+            by_category[f"{source}/{category}"] = summary
+        return {
+            "overall": summarize(v for values in self.samples.values() for v in values),
+            "bySource": {source: summarize(values) for source, values in by_source.items()},
+            "byCategory": by_category,
+        }
+
+
+freshness_tracker = FreshnessTracker()
@@ -0,0 +1,294 @@
+import hashlib
+import json
+import os
+import socket
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+from core.database import db_manager
+from core.logger_utils import logger
+
+
+@dataclass
+class WorkItem:
+    key: str
+    kind: str
+    source: str
+    payload: Dict
+    attempts: int = 0
+
+
+def item_key(kind: str, source: str, identity: str) -> str:
+    """工作项的唯一键（定长摘要，URL 过长也能建唯一索引）"""
+    return hashlib.blake2b(f"{kind}:{source}:{identity}".encode("utf-8"), digest_size=20).hexdigest()
+
+
+class MemoryFrontier:
+    """进程内的工作队列，语义与 MySQLFrontier 相同，用于单机和测试"""
+
+    def __init__(self):
+        self.items: Dict[str, Dict] = {}
+
+    def _available(self, entry: Dict, now: float, max_attempts: int) -> bool:
+        if entry["status"] in ("done", "dead") or entry["available_at"] > now:
+            return False
+        if entry["attempts"] >= max_attempts:
+            return False
+        return entry["status"] == "pending" or entry["lease_expires_at"] < now
+
+    def _lease(self, entry: Dict, owner: str, timeout: float, now: float):
+        entry.update(
+            status="leased", owner=owner, lease_expires_at=now + timeout,
+            attempts=entry["attempts"] + 1, updated_at=now,
+        )
+
+    async def claim(self, items: Sequence[WorkItem], owner, timeout, max_attempts) -> List[str]:
+        now = time.time()
+        claimed = []
+        for item in items:
+            entry = self.items.get(item.key)
+            if entry is None:
+                entry = self.items[item.key] = {
+                    "kind": item.kind, "source": item.source, "payload": item.payload,
+                    "status": "pending", "owner": None, "lease_expires_at": 0.0,
+                    "available_at": 0.0, "attempts": 0, "updated_at": now,
+                }
+            if self._available(entry, now, max_attempts):
+                self._lease(entry, owner, timeout, now)
+                claimed.append(item.key)
+        return claimed
+
+    async def lease_expired(self, kind, source, owner, limit, timeout, max_attempts) -> List[WorkItem]:
+        now = time.time()
+        leased = []
+        for key, entry in self.items.items():
+            if len(leased) >= limit:
+                break
+            if entry["kind"] != kind or entry["source"] != source:
+                continue
+            # 只接手租约过期或被释放的工作项（至少被租用过一次）
+            if entry["attempts"] and self._available(entry, now, max_attempts):
+                self._lease(entry, owner, timeout, now)
+                leased.append(WorkItem(key, kind, source, entry["payload"], entry["attempts"]))
+        return leased
+
+    async def complete(self, key, owner, revisit_after=None):
+        entry = self.items.get(key)
+        if entry is None or entry["owner"] != owner:
+            return
+        now = time.time()
+        if revisit_after is None:
+            entry.update(status="done", owner=None, updated_at=now)
+        else:
+            entry.update(
+                status="pending", owner=None, attempts=0, available_at=now + revisit_after,
+                updated_at=now,
+            )
+
+    async def release(self, key, owner, delay=0.0, max_attempts=None):
+        entry = self.items.get(key)
+        if entry is None or entry["owner"] != owner:
+            return
+        now = time.time()
+        # 重试次数用完的工作项不再租出，等待清理
+        status = "dead" if max_attempts and entry["attempts"] >= max_attempts else "pending"
+        entry.update(status=status, owner=None, available_at=now + delay, updated_at=now)
+
+    async def purge(self, older_than, max_attempts):
+        now = time.time()
+        cutoff = now - older_than
+        for key in [
+            k
+            for k, e in self.items.items()
+            if e["updated_at"] < cutoff
+            and (
+                e["status"] in ("done", "dead")
+                # 最后一次租约过期（节点崩溃）的工作项也不会再被租出
+                or (e["attempts"] >= max_attempts and e["lease_expires_at"] < now)
+            )
+        ]:
+            del self.items[key]
+
+
+class MySQLFrontier:
+    """
+    基于 crawl_frontier 表的共享工作队列，多个节点连同一个 MySQL 即可协同。
+
+    租约用单条 UPDATE ... LIMIT 加唯一 lease_token 原子获取，不依赖行锁或 SKIP LOCKED；
+    过期时间统一使用数据库的 NOW()，避免各节点时钟不一致。
+    """
+
+    LEASABLE = (
+        "status NOT IN ('done', 'dead') AND available_at <= NOW() AND attempts < %s "
+        "AND (status = 'pending' OR lease_expires_at < NOW())"
+    )
+
+    async def _leased_by(self, token: str) -> List[Dict]:
+        return await db_manager.fetchall(
+            "SELECT item_key, kind, source, payload, attempts FROM crawl_frontier "
+            "WHERE lease_token = %s",
+            (token,),
+        )
+
+    async def claim(self, items: Sequence[WorkItem], owner, timeout, max_attempts) -> List[str]:
+        if not items:
+            return []
+        token = uuid.uuid4().hex
+        await db_manager.execute(
+            "INSERT IGNORE INTO crawl_frontier (item_key, kind, source, payload, status, available_at) "
+            f"VALUES {', '.join(['(%s, %s, %s, %s, %s, NOW())'] * len(items))}",
+            tuple(
+                value
+                for item in items
+                for value in (
+                    item.key, item.kind, item.source,
+                    json.dumps(item.payload, ensure_ascii=False, default=str), "pending",
+                )
+            ),
+        )
+        await db_manager.execute(
+            "UPDATE crawl_frontier SET status = 'leased', lease_owner = %s, lease_token = %s, "
+            "lease_expires_at = NOW() + INTERVAL %s SECOND, attempts = attempts + 1 "
+            f"WHERE item_key IN ({', '.join(['%s'] * len(items))}) AND {self.LEASABLE}",
+            (owner, token, int(timeout), *[item.key for item in items], max_attempts),
+        )
+        return [row["item_key"] for row in await self._leased_by(token)]
+
+    async def lease_expired(self, kind, source, owner, limit, timeout, max_attempts) -> List[WorkItem]:
+        token = uuid.uuid4().hex
+        await db_manager.execute(
+            "UPDATE crawl_frontier SET status = 'leased', lease_owner = %s, lease_token = %s, "
+            "lease_expires_at = NOW() + INTERVAL %s SECOND, attempts = attempts + 1 "
+            f"WHERE kind = %s AND source = %s AND attempts > 0 AND {self.LEASABLE} "
+            "ORDER BY id LIMIT %s",
+            (owner, token, int(timeout), kind, source, max_attempts, limit),
+        )
+        return [
+            WorkItem(
+                row["item_key"], row["kind"], row["source"],
+                json.loads(row["payload"]) if row["payload"] else {}, row["attempts"],
+            )
+            for row in await self._leased_by(token)
+        ]
+
+    async def complete(self, key, owner, revisit_after=None):
+        if revisit_after is None:
+            await db_manager.execute(
+                "UPDATE crawl_frontier SET status = 'done', lease_owner = NULL, lease_token = NULL "
+                "WHERE item_key = %s AND lease_owner = %s",
+                (key, owner),
+            )
+        else:
+            await db_manager.execute(
+                "UPDATE crawl_frontier SET status = 'pending', lease_owner = NULL, lease_token = NULL, "
+                "attempts = 0, available_at = NOW() + INTERVAL %s SECOND "
+                "WHERE item_key = %s AND lease_owner = %s",
+                (int(revisit_after), key, owner),
+            )
+
+    async def release(self, key, owner, delay=0.0, max_attempts=None):
+        await db_manager.execute(
+            "UPDATE crawl_frontier SET status = IF(attempts >= %s, 'dead', 'pending'), "
+            "lease_owner = NULL, lease_token = NULL, available_at = NOW() + INTERVAL %s SECOND "
+            "WHERE item_key = %s AND lease_owner = %s",
+            (max_attempts or 2 ** 31 - 1, int(delay), key, owner),
+        )
+
+    async def purge(self, older_than, max_attempts):
+        await db_manager.execute(
+            "DELETE FROM crawl_frontier WHERE updated_at < NOW() - INTERVAL %s SECOND "
+            "AND (status IN ('done', 'dead') "
+            "OR (attempts >= %s AND lease_expires_at < NOW()))",
+            (int(older_than), max_attempts),
+        )
+
+
+class Frontier:
+    """
+    分布式爬取前沿：分类列表抓取和文章详情抓取都是带租约的工作项。
+
+    节点先 claim 工作项才去请求，别的节点持有未过期租约的工作项直接跳过，
+    多个节点连同一个 MySQL 时同一列表、同一文章只会被请求一次；
+    处理完成后 complete（列表项按重爬间隔重新可见），失败则 release 稍后重试，
+    重试 FRONTIER_MAX_ATTEMPTS 次仍失败的标记为 dead，与已完成的工作项一起定期清理，
+    节点崩溃后租约在 FRONTIER_VISIBILITY_TIMEOUT 秒后过期，由其他节点通过 lease_expired 接手。
+    FRONTIER_BACKEND=mysql 启用共享表，memory 为进程内实现，不设置则不使用。
+    """
+
+    def __init__(self):
+        self.backend = None
+        self.configured = False
+        self.owner = None
+        self.visibility_timeout = None
+        self.max_attempts = None
+        self.retry_delay = None
+
+    def configure(self):
+        if self.configured:
+            return
+        self.configured = True
+        backend = (os.getenv("FRONTIER_BACKEND") or "").lower()
+        if backend == "mysql":
+            self.backend = MySQLFrontier()
+        elif backend == "memory":
+            self.backend = MemoryFrontier()
+        elif backend:
+            logger.error(f"未知的 FRONTIER_BACKEND: {backend}，不使用共享前沿")
+        self.owner = os.getenv("FRONTIER_NODE_ID") or f"{socket.gethostname()}:{os.getpid()}"
+        self.visibility_timeout = float(os.getenv("FRONTIER_VISIBILITY_TIMEOUT", 300))
+        self.max_attempts = int(os.getenv("FRONTIER_MAX_ATTEMPTS", 5))
+        self.retry_delay = float(os.getenv("FRONTIER_RETRY_DELAY", 60))
+        if self.backend:
+            logger.info(f"共享爬取前沿已启用: {backend}，节点 {self.owner}")
+
+    @property
+    def enabled(self) -> bool:
+        self.configure()
+        return self.backend is not None
+
+    async def claim(self, items: Sequence[WorkItem]) -> List[str]:
+        """尝试租用工作项（不存在则创建），返回本节点拿到租约的键"""
+        try:
+            return await self.backend.claim(
+                items, self.owner, self.visibility_timeout, self.max_attempts
+            )
+        except Exception as e:
+            # 前沿不可用时退化为单机行为，重复请求由唯一索引兜底
+            logger.error(f"租用工作项失败: {e}")
+            return [item.key for item in items]
+
+    async def lease_expired(self, kind: str, source: str, limit: int) -> List[WorkItem]:
+        """接手其他节点租约已过期或释放待重试的工作项"""
+        try:
+            return await self.backend.lease_expired(
+                kind, source, self.owner, limit, self.visibility_timeout, self.max_attempts
+            )
+        except Exception as e:
+            logger.error(f"接手过期工作项失败: {e}")
+            return []
+
+    async def complete(self, key: str, revisit_after: Optional[float] = None):
+        """完成工作项；revisit_after 不为空时该项在指定秒数后重新可租用"""
+        try:
+            await self.backend.complete(key, self.owner, revisit_after)
+        except Exception as e:
+            logger.error(f"完成工作项失败: {e}")
+
+    async def release(self, key: str, delay: Optional[float] = None):
+        """放弃租约，delay 秒后其他节点可重试"""
+        try:
+            await self.backend.release(
+                key, self.owner, self.retry_delay if delay is None else delay, self.max_attempts
+            )
+        except Exception as e:
+            logger.error(f"释放工作项失败: {e}")
+
+    async def purge(self, older_than: float = 86400):
+        """清理已完成和重试次数用完的工作项"""
+        if self.enabled:
+            await self.backend.purge(older_than, self.max_attempts)
+
+
+frontier = Frontier()
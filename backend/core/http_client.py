@@ -0,0 +1,77 @@
+import os
+import ssl
+from typing import Optional
+
+import aiohttp
+
+from core.logger_utils import logger
+
+
+class HttpClientManager:
+    """
+    进程级共享的 HTTP 客户端，所有爬虫复用同一个 aiohttp 会话。
+
+    连接池保持长连接（keep-alive），按主机限制连接数，缓存 DNS 解析结果，
+    并共用一个 SSL 上下文以复用 TLS 会话，避免每次请求都重新握手。
+    """
+
+    def __init__(
+        self,
+        limit=None,
+        limit_per_host=None,
+        dns_ttl=None,
+        keepalive_timeout=None,
+    ):
+        # 配置在 start() 时才读取环境变量，保证 load_dotenv() 已经执行
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.dns_ttl = dns_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.ssl_context: Optional[ssl.SSLContext] = None
+
+    async def start(self):
+        """创建共享会话和连接池"""
+        if self.session and not self.session.closed:
+            return self.session
+
+        limit = int(self.limit or os.getenv("HTTP_POOL_LIMIT", 100))
+        limit_per_host = int(
+            self.limit_per_host or os.getenv("HTTP_POOL_LIMIT_PER_HOST", 32)
+        )
+        dns_ttl = int(self.dns_ttl or os.getenv("HTTP_DNS_TTL", 300))
+        keepalive_timeout = float(
+            self.keepalive_timeout or os.getenv("HTTP_KEEPALIVE_TIMEOUT", 30)
+        )
+
+        # 同一个 SSLContext 内部维护会话缓存，连接重建时可以复用 TLS 会话
+        self.ssl_context = ssl.create_default_context()
+        connector = aiohttp.TCPConnector(
+            limit=limit,
+            limit_per_host=limit_per_host,
+            ttl_dns_cache=dns_ttl,
+            use_dns_cache=True,
+            keepalive_timeout=keepalive_timeout,
+            ssl=self.ssl_context,
+        )
+        self.session = aiohttp.ClientSession(connector=connector)
+        logger.info(
+            f"HTTP 连接池已创建: 总连接数 {limit}，单主机连接数 {limit_per_host}，DNS 缓存 {dns_ttl} 秒"
+        )
+        return self.session
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        """获取共享会话，未启动时自动创建（便于单独运行某个爬虫）"""
+        if self.session is None or self.session.closed:
+            await self.start()
+        return self.session
+
+    async def close(self):
+        """关闭共享会话，释放所有连接"""
+        if self.session and not self.session.closed:
+            await self.session.close()
+            logger.info("HTTP 连接池已关闭")
+        self.session = None
+
+
+http_client = HttpClientManager()
@@ -0,0 +1,77 @@
+import hashlib
+from typing import Dict, List, Tuple
+
+from core.database import db_manager
+from core.logger_utils import logger
+
+
+def fingerprint(news_list: List[Dict]) -> str:
+    """列表的指纹：按顺序排列的文章地址的摘要"""
+    digest = hashlib.blake2b(digest_size=16)
+    for item in news_list:
+        digest.update(str(item.get("article_url")).encode("utf-8"))
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+
+class ListFingerprints:
+    """
+    每个分类上次完整处理过的列表指纹。
+
+    很多列表接口是 POST / JSON，没有 ETag 等校验器，每次都要下载；
+    列表内容和顺序与上次相同时，去重查询和详情抓取都可以跳过。
+    只有列表里的文章都处理完（没有详情获取失败）才保存指纹，失败的文章下次仍会重试。
+    指纹保存在 crawl_list_fingerprints 表，重启后沿用。
+    """
+
+    def __init__(self):
+        self.fingerprints: Dict[Tuple[str, str], str] = {}
+        self.loaded_sources = set()
+        self.unchanged_total = 0
+
+    async def _load_source(self, source: str):
+        if source in self.loaded_sources or db_manager.pool is None:
+            return
+        self.loaded_sources.add(source)
+        try:
+            rows = await db_manager.fetchall(
+                "SELECT category, fingerprint FROM crawl_list_fingerprints WHERE source = %s",
+                (source,),
+            )
+        except Exception as e:
+            logger.error(f"加载 {source} 的列表指纹失败: {e}")
+            return
+        for row in rows:
+            self.fingerprints.setdefault((source, row["category"]), row["fingerprint"])
+
+    async def unchanged(self, source: str, category: str, value: str) -> bool:
+        """列表是否与上次完整处理时相同"""
+        await self._load_source(source)
+        if self.fingerprints.get((source, category)) != value:
+            return False
+        self.unchanged_total += 1
+        return True
+
+    async def save(self, source: str, category: str, value: str):
+        if self.fingerprints.get((source, category)) == value:
+            return
+        self.fingerprints[(source, category)] = value
+        if db_manager.pool is None:
+            return
+        try:
+            await db_manager.execute(
+                """
+                INSERT INTO crawl_list_fingerprints (source, category, fingerprint)
+                VALUES (%s, %s, %s)
+                ON DUPLICATE KEY UPDATE fingerprint = VALUES(fingerprint)
+                """,
+                (source, category, value),
+            )
+        except Exception as e:
+            logger.error(f"保存 {source}/{category} 的列表指纹失败: {e}")
+
+    def snapshot(self) -> Dict:
+        return {"categories": len(self.fingerprints), "unchanged": self.unchanged_total}
+
+
+list_fingerprints = ListFingerprints()
@@ -0,0 +1,199 @@
+import os
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from core.database import db_manager
+from core.logger_utils import logger
+
+# 取一页列表：参数为页游标，返回 (该页的文章, 下一页游标)，没有下一页时游标为 None
+PageFetcher = Callable[[Any], Awaitable[Tuple[List[Dict], Any]]]
+
+# 流水线拉取列表期间推进的高水位，分类的文章都处理完成后才保存，
+# 否则详情失败的文章滑出第一页后，下次遍历会停在新的高水位而不再列出它们
+pending_watermarks: ContextVar[Optional[List[tuple]]] = ContextVar(
+    "pending_watermarks", default=None
+)
+
+
+@dataclass
+class Watermark:
+    source: str
+    category: str
+    latest_at: Optional[datetime] = None  # 已见过的最新文章发布时间
+    latest_id: Optional[str] = None  # 已见过的最新文章 ID（如澎湃 contId）
+    pages: int = 0  # 上次走过的页数
+
+
+def parse_date(date_str) -> Optional[datetime]:
+    try:
+        return datetime.strptime(str(date_str)[:19], "%Y-%m-%d %H:%M:%S")
+    except (TypeError, ValueError):
+        return None
+
+
+class ListWalker:
+    """
+    分页列表遍历：每个分类记录已见过的最新文章（高水位），
+    每次从第一页开始往后翻，直到某一页出现不晚于高水位的文章、没有下一页或达到 LIST_MAX_PAGES。
+
+    两次爬取之间新增的文章超过一页时也不会漏掉，列表没有变化时只请求一页。
+    首次遍历的分类没有高水位，只取 LIST_INITIAL_PAGES 页，历史文章交给回填。
+    流水线中推进的高水位在分类的文章都处理完成后才保存（见 CrawlPipeline._commit_lists），
+    高水位保存在 crawl_list_watermarks 表，重启后沿用。
+    """
+
+    def __init__(self):
+        self.watermarks: Dict[Tuple[str, str], Watermark] = {}
+        self.loaded_sources = set()
+        self.max_pages = None
+        self.initial_pages = None
+
+    def _load_config(self):
+        if self.max_pages is not None:
+            return
+        self.max_pages = int(os.getenv("LIST_MAX_PAGES", 5))
+        self.initial_pages = int(os.getenv("LIST_INITIAL_PAGES", 1))
+
+    async def _load_source(self, source: str):
+        if source in self.loaded_sources or db_manager.pool is None:
+            return
+        self.loaded_sources.add(source)
+        try:
+            rows = await db_manager.fetchall(
+                "SELECT * FROM crawl_list_watermarks WHERE source = %s", (source,)
+            )
+        except Exception as e:
+            logger.error(f"加载 {source} 的列表高水位失败: {e}")
+            return
+        for row in rows:
+            self.watermarks[(source, row["category"])] = Watermark(
+                source, row["category"], row["latest_at"], row["latest_id"], row["pages"] or 0
+            )
+
+    async def get(self, source: str, category: str) -> Watermark:
+        self._load_config()
+        await self._load_source(source)
+        key = (source, category)
+        if key not in self.watermarks:
+            self.watermarks[key] = Watermark(source, category)
+        return self.watermarks[key]
+
+    @staticmethod
+    def _reached(watermark: Watermark, items: List[Dict], id_field: Optional[str]) -> bool:
+        """该页是否已经出现上次见过的文章"""
+        for item in items:
+            if id_field and watermark.latest_id and str(item.get(id_field)) == watermark.latest_id:
+                return True
+            published = parse_date(item.get("date_str"))
+            if watermark.latest_at and published and published <= watermark.latest_at:
+                return True
+        return False
+
+    async def walk(
+        self,
+        spider,
+        category: str,
+        fetch_page: PageFetcher,
+        first_cursor: Any = 1,
+        id_field: Optional[str] = None,
+    ) -> List[Dict]:
+        """
+        从第一页开始翻页，返回所有走过的页的文章（按页顺序）
+
+        :param category: 分类名称，高水位按来源和分类记录
+        :param fetch_page: 取一页列表的协程函数
+        :param id_field: 文章 ID 字段，与日期一起判断是否到达高水位
+        """
+        watermark = await self.get(spider.source_name, category)
+        max_pages = self.max_pages if watermark.latest_at else self.initial_pages
+        checkpoint = spider.checkpoint
+        result: List[Dict] = []
+        seen_urls = set()
+        cursor, pages = first_cursor, 0
+        while cursor is not None and pages < max_pages:
+            try:
+                items, next_cursor = await fetch_page(cursor)
+            except Exception as e:
+                # 第一页失败按列表获取失败处理，后面的页失败时保留已取到的文章
+                if not pages:
+                    raise
+                logger.warning(f"{spider.source_name} {category} 第 {pages + 1} 页获取失败: {e}")
+                break
+            pages += 1
+            # 翻页期间列表有更新时，后一页会出现前一页的文章；整页被过滤时继续翻页
+            items = [item for item in items if item["article_url"] not in seen_urls]
+            seen_urls.update(item["article_url"] for item in items)
+            result.extend(items)
+            if checkpoint:
+                checkpoint.set_cursor(category, cursor)
+            if self._reached(watermark, items, id_field):
+                break
+            cursor = next_cursor
+        else:
+            if cursor is not None and watermark.latest_at:
+                logger.warning(
+                    f"{spider.source_name} {category} 翻了 {pages} 页仍未到上次的位置，可能有文章遗漏"
+                )
+
+        await self._advance(watermark, result, id_field, pages)
+        if pages > 1:
+            logger.progress(f"{spider.source_name} {category} 翻页 {pages} 页，共 {len(result)} 篇")
+        return result
+
+    async def _advance(
+        self, watermark: Watermark, items: List[Dict], id_field: Optional[str], pages: int
+    ):
+        newest = None
+        for item in items:
+            published = parse_date(item.get("date_str"))
+            if published and (newest is None or published > parse_date(newest.get("date_str"))):
+                newest = item
+        watermark.pages = pages
+        if newest is None:
+            return
+        newest_at = parse_date(newest["date_str"])
+        latest_id = str(newest.get(id_field)) if id_field else None
+        pending = pending_watermarks.get()
+        if pending is not None:
+            pending.append((watermark, newest_at, latest_id))
+            return
+        await self.commit(watermark, newest_at, latest_id)
+
+    async def commit(self, watermark: Watermark, latest_at: datetime, latest_id: Optional[str]):
+        """推进并保存高水位，不晚于当前高水位时忽略"""
+        if watermark.latest_at and latest_at <= watermark.latest_at:
+            return
+        watermark.latest_at = latest_at
+        watermark.latest_id = latest_id
+        await self._save(watermark)
+
+    async def _save(self, watermark: Watermark):
+        # 多个进程可能遍历同一分类，高水位只往前推进；latest_id 要在 latest_at 更新之前按旧值判断
+        if db_manager.pool is None:
+            return
+        try:
+            await db_manager.execute(
+                """
+                INSERT INTO crawl_list_watermarks (source, category, latest_at, latest_id, pages)
+                VALUES (%s, %s, %s, %s, %s)
+                ON DUPLICATE KEY UPDATE
+                    latest_id = IF(latest_at IS NULL OR VALUES(latest_at) > latest_at,
+                        VALUES(latest_id), latest_id),
+                    latest_at = GREATEST(COALESCE(latest_at, VALUES(latest_at)), VALUES(latest_at)),
+                    pages = VALUES(pages)
+                """,
+                (
+                    watermark.source,
+                    watermark.category,
+                    watermark.latest_at,
+                    watermark.latest_id,
+                    watermark.pages,
+                ),
+            )
+        except Exception as e:
+            logger.error(f"保存 {watermark.source}/{watermark.category} 的列表高水位失败: {e}")
+
+
+list_walker = ListWalker()
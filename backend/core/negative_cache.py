@@ -0,0 +1,150 @@
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from core.database import db_manager
+from core.logger_utils import logger
+from core.retry import is_transient
+
+# 失败类别及默认的过期秒数：
+# empty   - 页面取到了但解析不出正文（视频页、内容过短、页面结构变化），隔较久再试
+# error   - 非暂时的错误（404、403、解析异常），页面可能已删除，隔更久再试
+# network - 超时、连接错误、熔断，重试已用完，稍后就可以再试
+FAILURE_TTLS = {"empty": 6 * 3600, "error": 24 * 3600, "network": 600}
+
+
+class RecentlyFailed(Exception):
+    """文章最近获取失败过，记录过期前跳过"""
+
+    def __init__(self, url: str, kind: str):
+        super().__init__(f"跳过最近失败的url（{kind}）: {url}")
+        self.url = url
+        self.kind = kind
+
+
+def failure_kind(exc: Optional[BaseException]) -> str:
+    """按异常判断失败类别，没有异常表示解析结果为空"""
+    if exc is None:
+        return "empty"
+    return "network" if is_transient(exc) else "error"
+
+
+def url_key(url: str) -> str:
+    return hashlib.blake2b(url.encode("utf-8"), digest_size=20).hexdigest()
+
+
+class NegativeCache:
+    """
+    详情获取失败的文章地址，在过期前不再请求。
+
+    按 LRU 淘汰，最多保留 NEGATIVE_CACHE_SIZE 条；过期时间按失败类别不同（NEGATIVE_CACHE_<类别>_TTL 秒），
+    暂时损坏的文章过期后会被重新抓取。NEGATIVE_CACHE_PERSIST=1 时同时写入 crawl_negative_cache 表，
+    调度进程和 API 进程共用，重启后仍然有效。
+    """
+
+    def __init__(self):
+        self.entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self.max_size = None
+        self.ttls: Dict[str, float] = {}
+        self.persist = False
+        self.hits = 0
+
+    def _load_config(self):
+        if self.max_size is not None:
+            return
+        self.max_size = int(os.getenv("NEGATIVE_CACHE_SIZE", 10000))
+        self.ttls = {
+            kind: float(os.getenv(f"NEGATIVE_CACHE_{kind.upper()}_TTL", ttl))
+            for kind, ttl in FAILURE_TTLS.items()
+        }
+        self.persist = os.getenv("NEGATIVE_CACHE_PERSIST", "0") == "1"
+
+    @property
+    def persistent(self) -> bool:
+        return self.persist and db_manager.pool is not None
+
+    def _remember(self, key: str, expires_at: float, kind: str):
+        self.entries[key] = (expires_at, kind)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    async def get(self, url: str) -> Optional[str]:
+        """未过期时返回失败类别，否则返回 None"""
+        self._load_config()
+        key = url_key(url)
+        entry = self.entries.get(key)
+        if entry is None and self.persistent:
+            entry = await self._load(key)
+            if entry:
+                self._remember(key, *entry)
+        if entry is None:
+            return None
+        expires_at, kind = entry
+        if expires_at <= time.time():
+            self.entries.pop(key, None)
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return kind
+
+    async def add(self, url: str, kind: str):
+        """记录一次失败，kind 为 empty、error 或 network"""
+        self._load_config()
+        ttl = self.ttls[kind]
+        if ttl <= 0:
+            return
+        key = url_key(url)
+        expires_at = time.time() + ttl
+        self._remember(key, expires_at, kind)
+        if not self.persistent:
+            return
+        try:
+            await db_manager.execute(
+                """
+                INSERT INTO crawl_negative_cache (url_key, url, kind, expires_at)
+                VALUES (%s, %s, %s, %s)
+                ON DUPLICATE KEY UPDATE kind = VALUES(kind), expires_at = VALUES(expires_at)
+                """,
+                (key, url, kind, datetime.fromtimestamp(expires_at)),
+            )
+        except Exception as e:
+            logger.error(f"保存失败地址记录失败: {e}")
+
+    async def _load(self, key: str) -> Optional[Tuple[float, str]]:
+        try:
+            row = await db_manager.fetchone(
+                "SELECT kind, expires_at FROM crawl_negative_cache "
+                "WHERE url_key = %s AND expires_at > NOW()",
+                (key,),
+            )
+        except Exception as e:
+            logger.error(f"查询失败地址记录失败: {e}")
+            return None
+        return (row["expires_at"].timestamp(), row["kind"]) if row else None
+
+    async def purge(self):
+        """删除已过期的记录"""
+        self._load_config()
+        now = time.time()
+        for key in [k for k, (expires_at, _) in self.entries.items() if expires_at <= now]:
+            del self.entries[key]
+        if not self.persistent:
+            return
+        try:
+            await db_manager.execute("DELETE FROM crawl_negative_cache WHERE expires_at <= NOW()")
+        except Exception as e:
+            logger.error(f"清理失败地址记录失败: {e}")
+
+    def snapshot(self) -> Dict:
+        self._load_config()
+        kinds: Dict[str, int] = {}
+        for _, kind in self.entries.values():
+            kinds[kind] = kinds.get(kind, 0) + 1
+        return {"size": len(self.entries), "limit": self.max_size, "hits": self.hits, **kinds}
+
+
+negative_cache = NegativeCache()
@@ -0,0 +1,67 @@
+import asyncio
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Optional
+
+from core.logger_utils import logger
+from core.selector_registry import selector_registry
+
+
+def _parse_with_stats(func, args, kwargs):
+    """在解析进程中运行解析函数，并带回本次之前累计的提取规则统计"""
+    return func(*args, **kwargs), selector_registry.drain()
+
+
+class ParseExecutor:
+    """
+    页面解析执行器：把 lxml 解析、XPath 提取、正则等 CPU 密集的工作放到线程池或进程池，
+    避免阻塞事件循环，只把提取出的小字典返回给协程。
+
+    PARSE_EXECUTOR=thread（默认，lxml 解析时会释放 GIL）或 process；
+    进程模式下解析函数必须是模块级函数，参数和返回值必须可序列化；
+    解析进程中的提取规则统计随结果带回主进程合并，/api/stats/selectors 的统计与线程模式一致。
+    """
+
+    def __init__(self, mode=None, workers=None):
+        self.mode = mode
+        self.workers = workers
+        self.executor: Optional[Executor] = None
+
+    def start(self):
+        """创建线程池或进程池"""
+        if self.executor is not None:
+            return self.executor
+        self.mode = (self.mode or os.getenv("PARSE_EXECUTOR", "thread")).lower()
+        self.workers = int(self.workers or os.getenv("PARSE_WORKERS", os.cpu_count() or 4))
+        if self.mode == "process":
+            self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        else:
+            self.mode = "thread"
+            self.executor = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="parser"
+            )
+        logger.info(f"解析执行器已启动: {self.mode} x {self.workers}")
+        return self.executor
+
+    async def run(self, func, *args, **kwargs):
+        """在执行器中运行解析函数并等待结果"""
+        executor = self.start()
+        loop = asyncio.get_running_loop()
+        if self.mode == "process":
+            result, counters = await loop.run_in_executor(
+                executor, partial(_parse_with_stats, func, args, kwargs)
+            )
+            selector_registry.merge(counters)
+            return result
+        return await loop.run_in_executor(executor, partial(func, *args, **kwargs))
+
+    def close(self):
+        """关闭执行器"""
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+            self.executor = None
+            logger.info("解析执行器已关闭")
+
+
+parse_executor = ParseExecutor()
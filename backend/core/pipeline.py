@@ -0,0 +1,383 @@
+import asyncio
+import os
+from dataclasses import dataclass
+from typing import Any, List, Optional, Sequence, Tuple
+
+from core.crawl_budget import BudgetLease, crawl_budget
+from core.freshness import freshness_tracker
+from core.frontier import WorkItem, frontier, item_key
+from core.list_walker import list_walker, pending_watermarks
+from core.list_fingerprint import fingerprint, list_fingerprints
+from core.logger_utils import logger
+from core.negative_cache import RecentlyFailed
+from core.recrawl import recrawl_planner
+from core.validator_cache import NotModified, pending_validators, validator_cache
+
+# 队列结束标记，每个下游工作协程收到一个后退出
+STOP = object()
+
+
+def _first_error(group: BaseExceptionGroup) -> BaseException:
+    """TaskGroup 把协程的异常包装成 ExceptionGroup，向调用方抛出其中第一个原始异常"""
+    error: BaseException = group
+    while isinstance(error, BaseExceptionGroup):
+        error = error.exceptions[0]
+    return error
+
+
+@dataclass
+class CrawlUnit:
+    """一次列表抓取（一个分类），记录该分类在各阶段的进度"""
+
+    code: Any
+    addition_msg: str = ""
+    total: int = 0
+    pending: int = 0
+    saved: int = 0
+    listed: bool = False
+    failed: bool = False
+    priority: bool = False
+    finished: bool = False
+    lease: Optional[BudgetLease] = None
+    list_key: Optional[str] = None
+    unchanged: bool = False
+    fingerprint: Optional[str] = None
+    incomplete: bool = False
+    truncated: bool = False
+    validators: Optional[List[tuple]] = None
+    watermarks: Optional[List[tuple]] = None
+
+
+class CrawlPipeline:
+    """
+    流式爬取流水线：列表发现 → 去重 → 详情抓取与解析 → 入库。
+
+    各阶段之间用有界 asyncio.Queue 连接，每个阶段有独立的工作协程数；
+    下游队列满时上游自动等待，内存占用只取决于队列长度而不是分类数。
+    爬虫设置了 recrawl_interval 时只处理到了重爬时间的分类，并按去重结果调整各分类的间隔。
+    每个分类一个发现协程，同时处理的分类数由进程级的 crawl_budget 决定，
+    前一个分类的详情仍在抓取时，其他分类的列表已经开始发现。
+    详情的抓取和解析都在 spider.get_news_info 中完成，解析已交给 parse_executor。
+    启用共享 frontier 时，列表和每篇文章都要先拿到租约才请求，并接手其他节点租约过期的文章。
+    列表返回 304 或与上次完整处理时的指纹相同时，跳过去重和详情抓取。
+    """
+
+    def __init__(
+        self,
+        spider,
+        detail_workers=None,
+        persist_workers=None,
+        list_queue_size=None,
+        detail_queue_size=None,
+        persist_queue_size=None,
+    ):
+        self.spider = spider
+        self.detail_workers = int(detail_workers or os.getenv("PIPELINE_DETAIL_WORKERS", 16))
+        # 入库要等所在批次写完才返回，工作协程数与批量写入的批大小一致才能凑满一批
+        self.persist_workers = int(
+            persist_workers
+            or os.getenv(
+                "PIPELINE_PERSIST_WORKERS", os.getenv("ARTICLE_WRITER_BATCH_SIZE", 50)
+            )
+        )
+        self.list_queue_size = int(list_queue_size or os.getenv("PIPELINE_LIST_QUEUE", 4))
+        self.detail_queue_size = int(
+            detail_queue_size or os.getenv("PIPELINE_DETAIL_QUEUE", 100)
+        )
+        self.persist_queue_size = int(
+            persist_queue_size or os.getenv("PIPELINE_PERSIST_QUEUE", 100)
+        )
+        self.recover_batch = int(os.getenv("FRONTIER_RECOVER_BATCH", 50))
+        self.limit = None
+        self.units: List[CrawlUnit] = []
+
+    @property
+    def name(self) -> str:
+        return self.spider.source_name
+
+    async def run(self, units: Sequence[Tuple[Any, str]], limit=None) -> int:
+        """
+        运行流水线
+
+        :param units: (分类代码, 日志附加信息) 列表
+        :param limit: 每个分类最多处理的文章数
+        :return: 保存的文章总数
+        """
+        self.limit = limit
+        self.units = [CrawlUnit(code, addition_msg) for code, addition_msg in units]
+        if self.spider.recrawl_interval:
+            self.units = await self._due_units()
+        # 有新鲜度目标的分类排在前面，并可使用预算中的预留名额
+        for unit in self.units:
+            unit.priority = freshness_tracker.is_priority(
+                self.name, self.spider.category_key(unit.code)
+            )
+        self.units.sort(key=lambda unit: not unit.priority)
+        self.list_queue: asyncio.Queue = asyncio.Queue(self.list_queue_size)
+        self.detail_queue: asyncio.Queue = asyncio.Queue(self.detail_queue_size)
+        self.persist_queue: asyncio.Queue = asyncio.Queue(self.persist_queue_size)
+
+        stages = [
+            ([self._discover(unit) for unit in self.units], self.list_queue, 1),
+            ([self._dedup(), self._recover()], self.detail_queue, self.detail_workers),
+            (
+                [self._fetch_detail() for _ in range(self.detail_workers)],
+                self.persist_queue,
+                self.persist_workers,
+            ),
+            ([self._persist() for _ in range(self.persist_workers)], None, 0),
+        ]
+        try:
+            # 逐级关闭：一个阶段的工作协程全部退出后，再给下一阶段的每个工作协程发结束标记；
+            # 任一协程出错时取消其余协程并等待它们退出，之后才归还预算
+            async with asyncio.TaskGroup() as group:
+                for workers, downstream, downstream_workers in stages:
+                    group.create_task(self._run_stage(workers, downstream, downstream_workers))
+            await self._commit_lists()
+        except ExceptionGroup as e:
+            raise _first_error(e) from None
+        finally:
+            # 流水线异常退出或被取消时归还未完成分类占用的预算
+            for unit in self.units:
+                if unit.lease:
+                    unit.lease.release()
+        return sum(unit.saved for unit in self.units)
+
+    async def _due_units(self) -> List[CrawlUnit]:
+        due = [
+            unit
+            for unit in self.units
+            if await recrawl_planner.is_due(
+                self.name, self.spider.category_key(unit.code), self.spider.recrawl_interval
+            )
+        ]
+        if len(due) < len(self.units):
+            logger.info(f"{self.name} 本轮 {len(due)}/{len(self.units)} 个分类到了重爬时间")
+        return due
+
+    async def _run_stage(
+        self, workers, downstream: Optional[asyncio.Queue], downstream_workers: int
+    ):
+        async with asyncio.TaskGroup() as group:
+            for worker in workers:
+                group.create_task(worker)
+        for _ in range(downstream_workers):
+            await downstream.put(STOP)
+
+    async def _discover(self, unit: CrawlUnit):
+        # 显式触发的运行（API 任务）不租用列表，不受周期爬取设置的重爬间隔影响
+        if frontier.enabled and self.spider.lease_lists and not await self._claim_list(unit):
+            logger.info(f"{self.name}{unit.addition_msg} 已由其他节点处理，跳过")
+            self._finish(unit)
+            return
+        unit.lease = await crawl_budget.acquire(
+            self.name, self.spider.category_host(unit.code), unit.priority
+        )
+        unit.validators = []
+        unit.watermarks = []
+        token = pending_validators.set(unit.validators)
+        watermark_token = pending_watermarks.set(unit.watermarks)
+        try:
+            news_list = await self.spider.get_news_list(unit.code)
+            if self.limit and len(news_list) > self.limit:
+                news_list = news_list[: self.limit]
+                unit.truncated = True
+        except NotModified:
+            logger.info(f"{self.name}{unit.addition_msg} 列表未变化，跳过")
+            unit.unchanged = True
+            news_list = []
+        except Exception as e:
+            logger.error(f"{self.name}{unit.addition_msg} 获取列表失败: {e}")
+            unit.failed = True
+            news_list = []
+        finally:
+            pending_validators.reset(token)
+            pending_watermarks.reset(watermark_token)
+        await self.list_queue.put((unit, news_list))
+
+    async def _dedup(self):
+        while (entry := await self.list_queue.get()) is not STOP:
+            unit, news_list = entry
+            if news_list:
+                unit.fingerprint = fingerprint(news_list)
+                if await list_fingerprints.unchanged(
+                    self.name, self.spider.category_key(unit.code), unit.fingerprint
+                ):
+                    logger.info(f"{self.name}{unit.addition_msg} 列表与上次相同，跳过")
+                    unit.unchanged = True
+            try:
+                # 一次查询检查整个列表的标题或URL是否已存在，列表未变化时不用查询
+                filtered = (
+                    await self.spider.filter_existing(news_list)
+                    if news_list and not unit.unchanged
+                    else []
+                )
+            except Exception as e:
+                logger.error(f"{self.name}{unit.addition_msg} 去重失败: {e}")
+                unit.failed = True
+                filtered = []
+            unit.total = len(news_list)
+            unit.pending = len(filtered)
+            unit.listed = True
+            stats = None
+            # 多数爬虫获取列表出错时返回空列表，空列表不能当作一次没有新文章的访问，否则故障期间重爬间隔会被拉长
+            empty = not news_list and not unit.unchanged
+            if empty and not unit.failed:
+                logger.warning(f"{self.name}{unit.addition_msg} 列表为空，不计入产出统计")
+            if not unit.failed and not empty:
+                stats = await self._record_yield(unit, len(filtered), len(news_list) - len(filtered))
+            if not unit.unchanged:
+                logger.skip(f"跳过{len(news_list) - len(filtered)}篇已存在的文章")
+            if frontier.enabled:
+                filtered = await self._claim_details(filtered)
+                unit.pending = len(filtered)
+            if unit.list_key:
+                # 列表项按重爬间隔重新可见，失败的稍后由任意节点重试
+                if unit.failed or empty:
+                    revisit_after = frontier.retry_delay
+                elif stats and self.spider.recrawl_interval:
+                    revisit_after = stats.interval
+                else:
+                    revisit_after = 0
+                await frontier.complete(unit.list_key, revisit_after=revisit_after)
+            if unit.unchanged:
+                self._finish(unit)
+                continue
+            logger.info(
+                f"{self.name}{unit.addition_msg} 总共 {len(news_list)} 篇文章，需要爬取 {len(filtered)} 篇"
+            )
+            if not filtered:
+                logger.info(f"{self.name}{unit.addition_msg} 没有新文章需要爬取")
+                self._finish(unit)
+            for item in filtered:
+                await self.detail_queue.put((unit, item))
+
+    async def _fetch_detail(self):
+        while (entry := await self.detail_queue.get()) is not STOP:
+            unit, item = entry
+            skipped = False
+            try:
+                news_info = await self.spider.fetch_news_info(item)
+            except RecentlyFailed as e:
+                # 失败记录中的文章本次没有请求，不算分类未处理完，否则一篇失效的文章会让该分类一直不保存指纹
+                logger.warning(str(e))
+                news_info = None
+                skipped = True
+            except Exception as e:
+                logger.error(f"处理新闻项目失败: {e}")
+                news_info = None
+            if news_info:
+                await self.persist_queue.put((unit, news_info, item))
+            else:
+                if not skipped:
+                    unit.incomplete = True
+                if frontier.enabled:
+                    await frontier.release(self._detail_key(item))
+                self._item_done(unit, False)
+
+    async def _persist(self):
+        while (entry := await self.persist_queue.get()) is not STOP:
+            unit, news_info, item = entry
+            try:
+                saved = await self.spider.save_article(news_info)
+            except Exception as e:
+                logger.error(f"处理新闻项目失败: {e}")
+                unit.incomplete = True
+                saved = False
+            if frontier.enabled:
+                # 已存在或缺少必要字段的文章重试也没有意义，一律标记完成
+                await frontier.complete(self._detail_key(item))
+            if self.spider.checkpoint:
+                await self.spider.checkpoint.item_fetched()
+            self._item_done(unit, saved)
+
+    async def _commit_lists(self):
+        """
+        保存完整处理过的列表的高水位、指纹和 HTTP 校验器，之后列表不变时跳过该分类；
+        有失败或列表为空的分类下次仍需去重和重试，被 limit 截断的列表不保存高水位和校验器
+        """
+        for unit in self.units:
+            if unit.failed or unit.incomplete:
+                continue
+            if not unit.truncated:
+                for watermark in unit.watermarks or []:
+                    await list_walker.commit(*watermark)
+            if not unit.fingerprint or unit.unchanged:
+                continue
+            await list_fingerprints.save(
+                self.name, self.spider.category_key(unit.code), unit.fingerprint
+            )
+            if not unit.truncated:
+                for validators in unit.validators or []:
+                    await validator_cache.store(*validators)
+
+    def _detail_key(self, item) -> str:
+        return item_key("detail", self.name, item["article_url"])
+
+    async def _claim_list(self, unit: CrawlUnit) -> bool:
+        category = self.spider.category_key(unit.code)
+        unit.list_key = item_key("list", self.name, category)
+        claimed = await frontier.claim(
+            [WorkItem(unit.list_key, "list", self.name, {"category": category})]
+        )
+        return bool(claimed)
+
+    async def _claim_details(self, news_list: List) -> List:
+        """只保留本节点拿到租约的文章，其余正由其他节点处理或已完成"""
+        if not news_list:
+            return news_list
+        items = [
+            WorkItem(self._detail_key(item), "detail", self.name, item) for item in news_list
+        ]
+        claimed = set(await frontier.claim(items))
+        if len(claimed) < len(items):
+            logger.skip(f"跳过{len(items) - len(claimed)}篇其他节点正在处理的文章")
+        return [item.payload for item in items if item.key in claimed]
+
+    async def _recover(self):
+        """接手租约已过期（节点崩溃）或释放待重试的文章"""
+        if not frontier.enabled:
+            return
+        items = await frontier.lease_expired("detail", self.name, self.recover_batch)
+        if not items:
+            return
+        unit = CrawlUnit(
+            None, " 恢复", total=len(items), pending=len(items), listed=True
+        )
+        self.units.append(unit)
+        logger.info(f"{self.name} 接手 {len(items)} 篇未完成的文章")
+        for item in items:
+            await self.detail_queue.put((unit, item.payload))
+
+    async def _record_yield(self, unit: CrawlUnit, new: int, skipped: int):
+        category = self.spider.category_key(unit.code)
+        await freshness_tracker.refresh()
+        stats = await recrawl_planner.record(
+            self.name,
+            category,
+            new,
+            skipped,
+            self.spider.recrawl_interval,
+            freshness_tracker.interval_cap(self.name, category),
+        )
+        if self.spider.recrawl_interval:
+            logger.progress(
+                f"{self.name}{unit.addition_msg} 下次重爬间隔 {stats.interval:.0f} 秒"
+            )
+        return stats
+
+    def _item_done(self, unit: CrawlUnit, saved: bool):
+        unit.pending -= 1
+        if saved:
+            unit.saved += 1
+        if unit.listed and unit.pending == 0 and not unit.finished:
+            logger.success(
+                f"{self.name}{unit.addition_msg} 爬取完成，保存了 {unit.saved} 篇文章"
+            )
+            self._finish(unit)
+
+    @staticmethod
+    def _finish(unit: CrawlUnit):
+        unit.finished = True
+        if unit.lease:
+            unit.lease.release()
@@ -0,0 +1,143 @@
+import asyncio
+import json
+import os
+import time
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+from core.logger_utils import logger
+
+# 各站点默认限速（每秒请求数, 突发容量），按域名后缀匹配，可被 RATE_LIMIT_HOSTS 覆盖
+DEFAULT_HOST_LIMITS: Dict[str, Tuple[float, int]] = {
+    "sohu.com": (3, 5),
+    "163.com": (3, 5),
+    "thepaper.cn": (2, 4),
+    "chinadaily.com.cn": (1, 2),
+    "sina.com.cn": (3, 5),
+    "qq.com": (5, 10),
+    "ithome.com": (3, 5),
+}
+
+
+class TokenBucket:
+    """令牌桶：以 rate 的速度补充令牌，最多积攒 burst 个"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        """取走一个令牌，令牌不足时等待补充"""
+        async with self.lock:
+            while True:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class HostRateLimiter:
+    """
+    按站点域名（而不是按爬虫）限速，同一进程内的所有爬虫共用，
+    守护进程的定时任务和 API 触发的任务都经过这里。
+    """
+
+    def __init__(self, default_rate=None, default_burst=None):
+        self.default_rate = default_rate
+        self.default_burst = default_burst
+        self.host_limits: Dict[str, Tuple[float, int]] = {}
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.loaded = False
+
+    def load_config(self):
+        """从环境变量读取限速配置，RATE_LIMIT_HOSTS 为 JSON：{"域名": [每秒请求数, 突发容量]}"""
+        self.default_rate = float(self.default_rate or os.getenv("RATE_LIMIT_RPS", 5))
+        self.default_burst = int(self.default_burst or os.getenv("RATE_LIMIT_BURST", 5))
+        if self.default_rate <= 0 or self.default_burst < 1:
+            logger.warning("RATE_LIMIT_RPS / RATE_LIMIT_BURST 必须大于 0，已使用默认值 5 / 5")
+            self.default_rate, self.default_burst = 5.0, 5
+        self.host_limits = dict(DEFAULT_HOST_LIMITS)
+        host_limits = os.getenv("RATE_LIMIT_HOSTS")
+        if host_limits:
+            try:
+                for host, (rate, burst) in json.loads(host_limits).items():
+                    rate, burst = float(rate), int(burst)
+                    # 令牌桶按 rate 计算等待时间，rate 为 0 或负数会除零或永远等待
+                    if rate <= 0 or burst < 1:
+                        logger.warning(f"RATE_LIMIT_HOSTS 中 {host} 的限速必须大于 0，已忽略")
+                        continue
+                    self.host_limits[host] = (rate, burst)
+            except (ValueError, TypeError) as e:
+                logger.warning(f"RATE_LIMIT_HOSTS 配置无效，已忽略: {e}")
+        self.buckets.clear()
+        self.loaded = True
+
+    def configure(self, host: str, rate: float, burst: int):
+        """运行时调整某个域名的限速"""
+        if rate <= 0 or burst < 1:
+            raise ValueError(f"{host} 的限速必须大于 0")
+        if not self.loaded:
+            self.load_config()
+        self.host_limits[host] = (rate, burst)
+        for key in list(self.buckets):
+            if key == host or key.endswith(f".{host}"):
+                del self.buckets[key]
+
+    def matched_domain(self, host: str) -> Optional[str]:
+        """最长的匹配域名后缀，没有配置时返回 None"""
+        match: Optional[str] = None
+        for domain in self.host_limits:
+            if host == domain or host.endswith(f".{domain}"):
+                if match is None or len(domain) > len(match):
+                    match = domain
+        return match
+
+    def limit_for(self, host: str) -> Tuple[float, int]:
+        """按最长域名后缀匹配限速配置"""
+        match = self.matched_domain(host)
+        if match:
+            return self.host_limits[match]
+        return self.default_rate, self.default_burst
+
+    def bucket_for(self, host: str) -> TokenBucket:
+        """
+        令牌桶按匹配到的域名共用，同一站点的各个子域名（news.sohu.com、m.sohu.com）合计不超过该站点的限速；
+        只有使用默认限速的主机才各自一个令牌桶
+        """
+        if not self.loaded:
+            self.load_config()
+        key = self.matched_domain(host) or host
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            rate, burst = self.limit_for(host)
+            bucket = self.buckets[key] = TokenBucket(rate, burst)
+        return bucket
+
+    async def acquire(self, url: str):
+        """请求前调用，按 URL 所属主机取令牌"""
+        host = urlparse(url).hostname
+        if host:
+            await self.bucket_for(host).acquire()
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """当前各站点（匹配到的域名，或使用默认限速的主机）的限速状态"""
+        return {
+            host: {
+                "rate": bucket.rate,
+                "burst": bucket.burst,
+                "tokens": round(bucket.tokens, 2),
+            }
+            for host, bucket in self.buckets.items()
+        }
+
+
+rate_limiter = HostRateLimiter()
@@ -0,0 +1,188 @@
+import os
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from core.database import db_manager
+from core.logger_utils import logger
+
+
+@dataclass
+class CategoryStats:
+    source: str
+    category: str
+    interval: float
+    rate: Optional[float] = None  # 估计的新文章产生速率（篇/秒）
+    last_visit_at: Optional[datetime] = None
+    next_due_at: Optional[datetime] = None
+    visits: int = 0
+    new_total: int = 0
+    skipped_total: int = 0
+
+
+class RecrawlPlanner:
+    """
+    按分类自适应的重爬间隔。
+
+    每次拉取列表后，根据新文章数和两次访问之间的时间估计该分类的新文章速率（指数滑动平均），
+    把间隔设为“平均每次能拿到 RECRAWL_TARGET_NEW 篇新文章”所需的时间，
+    并限制在 [RECRAWL_MIN_INTERVAL, RECRAWL_MAX_INTERVAL] 之间，单次最多放大一倍；
+    列表里全是新文章说明上次之后可能已有文章被挤出列表，速率按两倍计算。
+    长期没有新文章的分类间隔逐步拉长，把请求留给更新频繁的分类。
+    统计保存在 crawl_category_stats 表，重启后沿用。
+    """
+
+    def __init__(self):
+        self.stats: Dict[Tuple[str, str], CategoryStats] = {}
+        self.loaded_sources = set()
+        self.min_interval = None
+        self.max_interval = None
+        self.target_new = None
+        self.alpha = None
+
+    def _load_config(self):
+        if self.min_interval is not None:
+            return
+        self.min_interval = float(os.getenv("RECRAWL_MIN_INTERVAL", 60))
+        self.max_interval = float(os.getenv("RECRAWL_MAX_INTERVAL", 3600))
+        self.target_new = float(os.getenv("RECRAWL_TARGET_NEW", 3))
+        self.alpha = float(os.getenv("RECRAWL_SMOOTHING", 0.3))
+
+    async def _load_source(self, source: str):
+        if source in self.loaded_sources or db_manager.pool is None:
+            return
+        self.loaded_sources.add(source)
+        try:
+            rows = await db_manager.fetchall(
+                "SELECT * FROM crawl_category_stats WHERE source = %s", (source,)
+            )
+        except Exception as e:
+            logger.error(f"加载 {source} 的分类重爬统计失败: {e}")
+            return
+        for row in rows:
+            self.stats[(source, row["category"])] = CategoryStats(
+                source=source,
+                category=row["category"],
+                interval=row["interval_seconds"],
+                rate=row["rate"],
+                last_visit_at=row["last_visit_at"],
+                next_due_at=row["next_due_at"],
+                visits=row["visits"],
+                new_total=row["new_total"],
+                skipped_total=row["skipped_total"],
+            )
+
+    async def get(
+        self, source: str, category: str, initial_interval: Optional[float] = None
+    ) -> CategoryStats:
+        """分类的统计，首次出现时以 initial_interval（默认最小间隔）作为初始间隔"""
+        self._load_config()
+        await self._load_source(source)
+        stats = self.stats.get((source, category))
+        if stats is None:
+            interval = min(
+                self.max_interval, max(self.min_interval, float(initial_interval or 0))
+            )
+            stats = self.stats[(source, category)] = CategoryStats(source, category, interval)
+        return stats
+
+    async def is_due(
+        self, source: str, category: str, initial_interval: Optional[float] = None
+    ) -> bool:
+        """分类是否到了重爬时间（留几秒余量，避免调度抖动导致整轮错过）"""
+        stats = await self.get(source, category, initial_interval)
+        return stats.next_due_at is None or stats.next_due_at <= datetime.now() + timedelta(
+            seconds=5
+        )
+
+    async def record(
+        self,
+        source: str,
+        category: str,
+        new: int,
+        skipped: int,
+        initial_interval: Optional[float] = None,
+        interval_cap: Optional[float] = None,
+    ) -> CategoryStats:
+        """
+        记录一次列表拉取的结果并计算下次重爬时间
+
+        :param new: 去重后需要爬取的文章数
+        :param skipped: 已存在而跳过的文章数
+        :param interval_cap: 额外的间隔上限（新鲜度目标），仍不低于最小间隔
+        """
+        stats = await self.get(source, category, initial_interval)
+        now = datetime.now()
+        elapsed = (
+            (now - stats.last_visit_at).total_seconds() if stats.last_visit_at else stats.interval
+        )
+        observed = new / max(elapsed, 1.0)
+        if new and not skipped:
+            observed *= 2
+        stats.rate = observed if stats.rate is None else (
+            self.alpha * observed + (1 - self.alpha) * stats.rate
+        )
+
+        if stats.rate > 0:
+            interval = self.target_new / stats.rate
+        else:
+            interval = stats.interval * 1.5
+        interval = min(interval, stats.interval * 2)
+        if interval_cap is not None:
+            interval = min(interval, interval_cap)
+        stats.interval = min(self.max_interval, max(self.min_interval, interval))
+        stats.last_visit_at = now
+        stats.next_due_at = now + timedelta(seconds=stats.interval)
+        stats.visits += 1
+        stats.new_total += new
+        stats.skipped_total += skipped
+        await self._save(stats)
+        return stats
+
+    async def _save(self, stats: CategoryStats):
+        if db_manager.pool is None:
+            return
+        try:
+            await db_manager.execute(
+                """
+                INSERT INTO crawl_category_stats (source, category, interval_seconds, rate,
+                    last_visit_at, next_due_at, visits, new_total, skipped_total)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+                ON DUPLICATE KEY UPDATE interval_seconds = VALUES(interval_seconds),
+                    rate = VALUES(rate), last_visit_at = VALUES(last_visit_at),
+                    next_due_at = VALUES(next_due_at), visits = VALUES(visits),
+                    new_total = VALUES(new_total), skipped_total = VALUES(skipped_total)
+                """,
+                (
+                    stats.source,
+                    stats.category,
+                    stats.interval,
+                    stats.rate,
+                    stats.last_visit_at,
+                    stats.next_due_at,
+                    stats.visits,
+                    stats.new_total,
+                    stats.skipped_total,
+                ),
+            )
+        except Exception as e:
+            logger.error(f"保存 {stats.source}/{stats.category} 的重爬统计失败: {e}")
+
+    def snapshot(self) -> List[Dict]:
+        """各分类当前的重爬间隔和产出"""
+        return [
+            {
+                "source": stats.source,
+                "category": stats.category,
+                "interval": round(stats.interval),
+                "ratePerHour": round((stats.rate or 0) * 3600, 2),
+                "nextDueAt": stats.next_due_at.isoformat() if stats.next_due_at else None,
+                "visits": stats.visits,
+                "newTotal": stats.new_total,
+                "skippedTotal": stats.skipped_total,
+            }
+            for stats in self.stats.values()
+        ]
+
+
+recrawl_planner = RecrawlPlanner()
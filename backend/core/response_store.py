@@ -0,0 +1,142 @@
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from core.logger_utils import logger
+
+STORE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "responses")
+MODES = ("off", "record", "replay", "read-through")
+
+
+class ResponseNotRecorded(Exception):
+    """仅回放模式下请求的响应没有录制过"""
+
+    def __init__(self, method: str, url: str):
+        super().__init__(f"没有录制过的响应: {method} {url}")
+        self.url = url
+
+
+def _canonical(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, bytes):
+        return value.decode("utf-8", "replace")
+    if isinstance(value, str):
+        return value
+    return json.dumps(value, sort_keys=True, ensure_ascii=False)
+
+
+class ResponseStore:
+    """
+    磁盘上的 HTTP 响应录制与回放，用于开发调试和用新的解析规则重新提取已下载过的页面。
+
+    RESPONSE_STORE_MODE 为 record 时每个成功的响应都写入磁盘，replay 时只从磁盘读取、不访问网络，
+    read-through 时先读磁盘，没有录制过的再请求并录制。
+    请求按方法、地址、参数和请求体生成键，索引文件记录状态、编码和响应头等元数据；
+    响应体按内容摘要 gzip 压缩存储，相同内容只保存一份。
+    """
+
+    def __init__(self):
+        self.mode = None
+        self.directory = None
+        self.counters = {"hits": 0, "misses": 0, "recorded": 0}
+
+    def _load_config(self):
+        if self.mode is not None:
+            return
+        mode = os.getenv("RESPONSE_STORE_MODE", "off").strip().lower().replace("_", "-")
+        if mode not in MODES:
+            logger.warning(f"未知的 RESPONSE_STORE_MODE: {mode}，已关闭响应录制")
+            mode = "off"
+        self.mode = mode
+        self.directory = os.getenv("RESPONSE_STORE_DIR", STORE_DIR)
+        if mode != "off":
+            logger.info(f"响应录制模式: {mode}，目录: {self.directory}")
+
+    @property
+    def reads(self) -> bool:
+        self._load_config()
+        return self.mode in ("replay", "read-through")
+
+    @property
+    def writes(self) -> bool:
+        self._load_config()
+        return self.mode in ("record", "read-through")
+
+    @property
+    def replay_only(self) -> bool:
+        self._load_config()
+        return self.mode == "replay"
+
+    @staticmethod
+    def request_key(method: str, url: str, params=None, data=None, json_body=None) -> str:
+        identity = "\n".join(
+            [method.upper(), url, _canonical(params), _canonical(data), _canonical(json_body)]
+        )
+        return hashlib.sha256(identity.encode("utf-8")).hexdigest()
+
+    def _path(self, kind: str, digest: str, suffix: str) -> str:
+        return os.path.join(self.directory, kind, digest[:2], f"{digest}{suffix}")
+
+    async def load(self, key: str) -> Optional[Tuple[bytes, Dict]]:
+        """读取录制的响应，返回 (响应体, 元数据)，没有录制过时返回 None"""
+        self._load_config()
+        loop = asyncio.get_running_loop()
+        try:
+            result = await loop.run_in_executor(None, self._read, key)
+        except Exception as e:
+            logger.error(f"读取录制的响应失败: {e}")
+            result = None
+        self.counters["hits" if result else "misses"] += 1
+        return result
+
+    def _read(self, key: str) -> Optional[Tuple[bytes, Dict]]:
+        index_path = self._path("requests", key, ".json")
+        if not os.path.exists(index_path):
+            return None
+        with open(index_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        with gzip.open(self._path("objects", meta["content"], ".gz"), "rb") as f:
+            return f.read(), meta
+
+    async def save(self, key: str, content: bytes, meta: Dict):
+        """录制一个响应"""
+        self._load_config()
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(None, self._write, key, content, meta)
+            self.counters["recorded"] += 1
+        except Exception as e:
+            logger.error(f"录制响应 {meta.get('url')} 失败: {e}")
+
+    def _write(self, key: str, content: bytes, meta: Dict):
+        digest = hashlib.sha256(content).hexdigest()
+        object_path = self._path("objects", digest, ".gz")
+        if not os.path.exists(object_path):
+            self._replace(object_path, gzip.compress(content))
+        meta = {**meta, "content": digest, "size": len(content),
+                "recordedAt": datetime.now().isoformat()}
+        self._replace(
+            self._path("requests", key, ".json"),
+            json.dumps(meta, ensure_ascii=False, indent=2).encode("utf-8"),
+        )
+
+    @staticmethod
+    def _replace(path: str, payload: bytes):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # 多个工作进程可能同时录制同一个响应，临时文件按进程区分
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+
+    def snapshot(self) -> Dict:
+        self._load_config()
+        return {"mode": self.mode, **self.counters}
+
+
+response_store = ResponseStore()
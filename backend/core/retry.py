@@ -0,0 +1,208 @@
+import asyncio
+import os
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Dict, Optional
+from urllib.parse import urlparse
+
+import aiohttp
+
+from core.logger_utils import logger
+
+# 可重试的状态码：请求超时、限流和服务端临时错误
+RETRYABLE_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(Exception):
+    """主机熔断中，请求未发出"""
+
+    def __init__(self, host: str, retry_in: float):
+        super().__init__(f"{host} 已熔断，{retry_in:.0f} 秒后重试")
+        self.host = host
+        self.retry_in = retry_in
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """超时、连接错误和临时状态码可以重试，其他 4xx、解析错误等重试也不会成功"""
+    if isinstance(exc, aiohttp.ClientResponseError):
+        return exc.status in RETRYABLE_STATUS
+    return isinstance(
+        exc, (asyncio.TimeoutError, aiohttp.ClientConnectionError, aiohttp.ClientPayloadError)
+    )
+
+
+def is_transient(exc: BaseException) -> bool:
+    """失败是否是暂时的（稍后可能成功），暂时的失败不应把文章永久拉黑"""
+    return is_retryable(exc) or isinstance(exc, CircuitOpenError)
+
+
+def retry_after(exc: BaseException) -> Optional[float]:
+    """响应头 Retry-After 要求等待的秒数（秒数或 HTTP 日期）"""
+    headers = getattr(exc, "headers", None)
+    value = headers.get("Retry-After") if headers else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+class CircuitBreaker:
+    """
+    单个主机的熔断器：连续 failure_threshold 次可重试的失败后打开，
+    打开期间请求直接失败，reset_timeout 秒后放行一个探测请求（半开），
+    探测成功则关闭，失败则重新打开并把等待时间加倍（不超过 max_reset_timeout）。
+    """
+
+    def __init__(self, host: str, failure_threshold: int, reset_timeout: float,
+                 max_reset_timeout: float):
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.base_reset_timeout = reset_timeout
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+
+    def before_request(self):
+        if self.state == "closed":
+            return
+        remaining = self.opened_at + self.reset_timeout - time.monotonic()
+        if self.state == "open" and remaining <= 0:
+            self.state = "half_open"
+            self.probing = False
+        if self.state == "half_open" and not self.probing:
+            self.probing = True
+            return
+        raise CircuitOpenError(self.host, max(remaining, 1.0))
+
+    def record_success(self):
+        if self.state != "closed":
+            logger.success(f"{self.host} 已恢复，熔断关闭")
+        self.state = "closed"
+        self.failures = 0
+        self.reset_timeout = self.base_reset_timeout
+        self.probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == "half_open":
+            self.reset_timeout = min(self.max_reset_timeout, self.reset_timeout * 2)
+            self._open()
+        elif self.state == "closed" and self.failures >= self.failure_threshold:
+            self._open()
+
+    def _open(self):
+        self.state = "open"
+        self.opened_at = time.monotonic()
+        self.probing = False
+        logger.warning(
+            f"{self.host} 连续失败 {self.failures} 次，熔断 {self.reset_timeout:g} 秒"
+        )
+
+
+class RetryManager:
+    """
+    请求重试和按主机熔断。
+
+    可重试的失败按指数退避加全抖动等待后重试（最多 RETRY_MAX_ATTEMPTS 次），
+    响应带 Retry-After 时至少等待它要求的时间，要求超过 RETRY_AFTER_MAX 秒时不再重试；
+    等待期间不占用并发槽位。同一主机连续失败达到 CIRCUIT_FAILURE_THRESHOLD 次后熔断，
+    熔断期间的请求立即失败，不再占用并发和等待超时。
+    """
+
+    def __init__(self):
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.max_attempts = None
+        self.base_delay = None
+        self.max_delay = None
+        self.retry_after_max = None
+
+    def _load_config(self):
+        if self.max_attempts is not None:
+            return
+        self.max_attempts = int(os.getenv("RETRY_MAX_ATTEMPTS", 3))
+        self.base_delay = float(os.getenv("RETRY_BASE_DELAY", 0.5))
+        self.max_delay = float(os.getenv("RETRY_MAX_DELAY", 30))
+        self.retry_after_max = float(os.getenv("RETRY_AFTER_MAX", 120))
+
+    def breaker(self, host: str) -> CircuitBreaker:
+        if host not in self.breakers:
+            self.breakers[host] = CircuitBreaker(
+                host,
+                int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", 5)),
+                float(os.getenv("CIRCUIT_RESET_TIMEOUT", 30)),
+                float(os.getenv("CIRCUIT_MAX_RESET_TIMEOUT", 600)),
+            )
+        return self.breakers[host]
+
+    def _delay(self, attempt: int, exc: BaseException) -> Optional[float]:
+        """第 attempt 次失败后的等待时间，None 表示不再重试"""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        requested = retry_after(exc)
+        if requested is not None:
+            if requested > self.retry_after_max:
+                return None
+            delay = max(delay, requested)
+        return delay
+
+    async def call(self, url: str, send: Callable[[], Awaitable], attempts: Optional[int] = None):
+        """
+        发送请求，失败时按策略重试
+
+        :param url: 请求地址，用于确定主机
+        :param send: 发送一次请求的协程函数
+        :param attempts: 最多尝试次数，默认 RETRY_MAX_ATTEMPTS
+        """
+        self._load_config()
+        breaker = self.breaker(urlparse(url).hostname or url)
+        attempts = attempts or self.max_attempts
+        attempt = 0
+        while True:
+            breaker.before_request()
+            try:
+                result = await send()
+            except asyncio.CancelledError:
+                breaker.probing = False
+                raise
+            except Exception as e:
+                if not is_retryable(e):
+                    # 404 等说明主机正常，只是这个请求本身无效
+                    if isinstance(e, aiohttp.ClientResponseError):
+                        breaker.record_success()
+                    breaker.probing = False
+                    raise
+                breaker.record_failure()
+                attempt += 1
+                delay = self._delay(attempt, e) if attempt < attempts else None
+                if delay is None:
+                    raise
+                logger.warning(f"请求失败，{delay:.1f} 秒后第 {attempt} 次重试: {url} ({e!r})")
+                await asyncio.sleep(delay)
+                continue
+            breaker.record_success()
+            return result
+
+    def snapshot(self) -> Dict:
+        """各主机的熔断状态（只列出有过失败的主机）"""
+        return {
+            host: {
+                "state": breaker.state,
+                "failures": breaker.failures,
+                "resetTimeout": breaker.reset_timeout,
+            }
+            for host, breaker in self.breakers.items()
+            if breaker.failures or breaker.state != "closed"
+        }
+
+
+retry_manager = RetryManager()
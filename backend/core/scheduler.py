@@ -0,0 +1,430 @@
+import asyncio
+import json
+import random
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+
+from core.database import db_manager
+from core.logger_utils import logger
+
+
+class IntervalTrigger:
+    """固定间隔触发"""
+
+    type = "interval"
+
+    def __init__(self, seconds):
+        self.seconds = int(seconds)
+        if self.seconds <= 0:
+            raise ValueError(f"间隔必须大于 0: {seconds}")
+
+    @property
+    def value(self) -> str:
+        return str(self.seconds)
+
+    def next_fire(self, after: datetime) -> datetime:
+        return after + timedelta(seconds=self.seconds)
+
+
+class CronTrigger:
+    """
+    五段 cron 表达式触发：分 时 日 月 周（0 和 7 都表示周日）。
+
+    每段支持 *、数字、a-b 范围、逗号列表和 /n 步长；
+    日和周都不是 * 时，满足其一即可（与标准 cron 一致）。
+    """
+
+    type = "cron"
+    FIELDS = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+    def __init__(self, expression: str):
+        parts = expression.split()
+        if len(parts) != 5:
+            raise ValueError(f"cron 表达式必须是 5 段: {expression}")
+        self.expression = expression
+        self.minutes, self.hours, self.days, self.months, weekdays = [
+            self._parse(part, low, high) for part, (low, high) in zip(parts, self.FIELDS)
+        ]
+        # cron 中周日为 0/7，转换为 datetime.weekday() 的 6
+        self.weekdays = {(day - 1) % 7 for day in weekdays}
+        self.any_day = parts[2] == "*"
+        self.any_weekday = parts[4] == "*"
+
+    @staticmethod
+    def _parse(part: str, low: int, high: int) -> Set[int]:
+        values = set()
+        for item in part.split(","):
+            step = 1
+            if "/" in item:
+                item, step_str = item.split("/")
+                step = int(step_str)
+            if item == "*":
+                start, end = low, high
+            elif "-" in item:
+                start, end = map(int, item.split("-"))
+            else:
+                start = int(item)
+                end = high if step > 1 else start
+            if start < low or end > high or start > end or step <= 0:
+                raise ValueError(f"cron 字段超出范围: {part}")
+            values.update(range(start, end + 1, step))
+        return values
+
+    @property
+    def value(self) -> str:
+        return self.expression
+
+    def _day_matches(self, moment: datetime) -> bool:
+        day_ok = moment.day in self.days
+        weekday_ok = moment.weekday() in self.weekdays
+        if self.any_day:
+            return weekday_ok
+        if self.any_weekday:
+            return day_ok
+        return day_ok or weekday_ok
+
+    def next_fire(self, after: datetime) -> datetime:
+        moment = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = moment + timedelta(days=366 * 4)
+        # 按月、日、时、分逐级跳过不匹配的区间
+        while moment <= limit:
+            if moment.month not in self.months:
+                year = moment.year + moment.month // 12
+                moment = moment.replace(year=year, month=moment.month % 12 + 1, day=1, hour=0, minute=0)
+                continue
+            if not self._day_matches(moment):
+                moment = (moment + timedelta(days=1)).replace(hour=0, minute=0)
+                continue
+            if moment.hour not in self.hours:
+                moment = (moment + timedelta(hours=1)).replace(minute=0)
+                continue
+            if moment.minute not in self.minutes:
+                moment += timedelta(minutes=1)
+                continue
+            return moment
+        raise ValueError(f"cron 表达式没有可触发的时间: {self.expression}")
+
+
+def make_trigger(trigger_type: str, value):
+    """根据类型和值创建触发器"""
+    if trigger_type == IntervalTrigger.type:
+        return IntervalTrigger(value)
+    if trigger_type == CronTrigger.type:
+        return CronTrigger(value)
+    raise ValueError(f"未知的触发器类型: {trigger_type}")
+
+
+@dataclass
+class Job:
+    id: str
+    kind: str
+    trigger: object
+    payload: Dict = field(default_factory=dict)
+    jitter: int = 0
+    misfire_grace: Optional[int] = None
+    max_instances: int = 1
+    next_run_at: Optional[datetime] = None
+    last_run_at: Optional[datetime] = None
+    last_status: Optional[str] = None
+    running: int = 0
+
+
+class JobScheduler:
+    """
+    持久化任务调度器，守护进程的爬虫和 API 创建的任务都由它触发。
+
+    任务的触发规则和下次运行时间保存在 crawl_jobs 表中，重启后继续按原计划运行；
+    每次计算下次运行时间都加上随机抖动，避免多个爬虫同时触发；
+    重启后发现错过的运行超过 misfire_grace 秒时跳过，不补跑，多次错过只算一次；
+    同一任务正在运行的实例数达到 max_instances 时跳过本次触发。
+    任务按 kind 分派给 register_handler 注册的协程函数，进程只加载自己能处理的 kind。
+    """
+
+    def __init__(self):
+        self.handlers: Dict[str, Callable[[Job], Awaitable]] = {}
+        self.jobs: Dict[str, Job] = {}
+        self.running_tasks: Set[asyncio.Task] = set()
+        self.wakeup: Optional[asyncio.Event] = None
+        self.loop_task: Optional[asyncio.Task] = None
+
+    def register_handler(self, kind: str, handler: Callable[[Job], Awaitable]):
+        """注册某类任务的执行函数"""
+        self.handlers[kind] = handler
+
+    @property
+    def persistent(self) -> bool:
+        return db_manager.pool is not None
+
+    async def start(self, job_ids: Optional[Set[str]] = None):
+        """
+        从数据库加载任务并启动调度循环
+
+        :param job_ids: 只加载这些任务；多进程模式下每个工作进程只运行分配给自己的任务
+        """
+        if self.loop_task and not self.loop_task.done():
+            return
+        self.wakeup = asyncio.Event()
+        if self.persistent and self.handlers:
+            try:
+                rows = await db_manager.fetchall(
+                    "SELECT * FROM crawl_jobs WHERE enabled = 1 AND kind IN "
+                    f"({', '.join(['%s'] * len(self.handlers))})",
+                    tuple(self.handlers),
+                )
+                for row in rows:
+                    if job_ids is not None and row["id"] not in job_ids:
+                        continue
+                    job = self._job_from_row(row)
+                    if job:
+                        self.jobs.setdefault(job.id, job)
+            except Exception as e:
+                logger.error(f"加载调度任务失败: {e}")
+        self.loop_task = asyncio.create_task(self._run_loop())
+        logger.info(f"调度器已启动，共 {len(self.jobs)} 个任务")
+
+    async def run_forever(self, job_ids: Optional[Set[str]] = None):
+        """启动调度器并一直运行到被取消"""
+        await self.start(job_ids)
+        await self.loop_task
+
+    def _job_from_row(self, row: Dict) -> Optional[Job]:
+        try:
+            job = Job(
+                id=row["id"],
+                kind=row["kind"],
+                trigger=make_trigger(row["trigger_type"], row["trigger_value"]),
+                payload=json.loads(row["payload"]) if row.get("payload") else {},
+                jitter=row["jitter"] or 0,
+                misfire_grace=row["misfire_grace"],
+                max_instances=row["max_instances"] or 1,
+                next_run_at=row["next_run_at"],
+                last_run_at=row["last_run_at"],
+                last_status=row["last_status"],
+            )
+            if job.next_run_at is None:
+                # 没有保存下次运行时间的任务从现在起按触发规则重新计算
+                job.next_run_at = self._next_run(job, datetime.now())
+            return job
+        except Exception as e:
+            logger.error(f"调度任务 {row.get('id')} 配置无效: {e}")
+            return None
+
+    def _next_run(self, job: Job, after: datetime) -> datetime:
+        next_run = job.trigger.next_fire(after)
+        if job.jitter:
+            next_run += timedelta(seconds=random.uniform(0, job.jitter))
+        return next_run
+
+    async def add_job(
+        self,
+        job_id: str,
+        kind: str,
+        trigger_type: str,
+        trigger_value,
+        payload: Optional[Dict] = None,
+        jitter: int = 0,
+        misfire_grace: Optional[int] = None,
+        max_instances: int = 1,
+        run_immediately: bool = False,
+    ) -> Job:
+        """
+        添加或更新任务；任务已存在时保留已保存的下次运行时间
+
+        :param job_id: 任务唯一标识
+        :param kind: 任务类型，对应 register_handler 注册的执行函数
+        :param trigger_type: interval 或 cron
+        :param trigger_value: 间隔秒数或 cron 表达式
+        :param payload: 传给执行函数的参数
+        :param jitter: 每次触发时间的随机延后上限（秒）
+        :param misfire_grace: 允许的最大延迟（秒），超过则跳过本次；None 表示总是补跑一次
+        :param max_instances: 同时运行的最大实例数
+        :param run_immediately: 新任务是否立即（加抖动后）运行
+        :return: 任务
+        """
+        trigger = make_trigger(trigger_type, trigger_value)
+        now = datetime.now()
+        existing = self.jobs.get(job_id)
+        if existing is None and self.persistent:
+            try:
+                row = await db_manager.fetchone("SELECT * FROM crawl_jobs WHERE id = %s", (job_id,))
+                existing = self._job_from_row(row) if row else None
+            except Exception as e:
+                logger.error(f"读取调度任务 {job_id} 失败: {e}")
+
+        job = Job(
+            id=job_id,
+            kind=kind,
+            trigger=trigger,
+            payload=payload or {},
+            jitter=jitter,
+            misfire_grace=misfire_grace,
+            max_instances=max_instances,
+        )
+        if existing and existing.trigger.value == trigger.value:
+            job.next_run_at = existing.next_run_at or now
+            job.last_run_at = existing.last_run_at
+            job.last_status = existing.last_status
+            job.running = existing.running
+        elif run_immediately:
+            job.next_run_at = now + timedelta(seconds=random.uniform(0, jitter))
+        else:
+            job.next_run_at = self._next_run(job, now)
+        self.jobs[job_id] = job
+        await self._save_job(job)
+        if self.wakeup:
+            self.wakeup.set()
+        return job
+
+    async def remove_job(self, job_id: str):
+        """删除任务，正在运行的实例不受影响"""
+        self.jobs.pop(job_id, None)
+        if self.persistent:
+            try:
+                await db_manager.execute("DELETE FROM crawl_jobs WHERE id = %s", (job_id,))
+            except Exception as e:
+                logger.error(f"删除调度任务 {job_id} 失败: {e}")
+
+    async def run_now(self, job_id: str) -> bool:
+        """立即运行一次任务，不改变下次运行时间；达到并发上限时返回 False"""
+        job = self.jobs.get(job_id)
+        if job is None or job.running >= job.max_instances:
+            return False
+        self._launch(job)
+        return True
+
+    async def _save_job(self, job: Job):
+        if not self.persistent:
+            return
+        try:
+            await db_manager.execute(
+                """
+                INSERT INTO crawl_jobs (id, kind, trigger_type, trigger_value, payload, jitter,
+                    misfire_grace, max_instances, next_run_at, last_run_at, last_status, enabled)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, 1)
+                ON DUPLICATE KEY UPDATE kind = VALUES(kind), trigger_type = VALUES(trigger_type),
+                    trigger_value = VALUES(trigger_value), payload = VALUES(payload),
+                    jitter = VALUES(jitter), misfire_grace = VALUES(misfire_grace),
+                    max_instances = VALUES(max_instances), next_run_at = VALUES(next_run_at),
+                    last_run_at = VALUES(last_run_at), last_status = VALUES(last_status)
+                """,
+                (
+                    job.id,
+                    job.kind,
+                    job.trigger.type,
+                    job.trigger.value,
+                    json.dumps(job.payload, ensure_ascii=False),
+                    job.jitter,
+                    job.misfire_grace,
+                    job.max_instances,
+                    job.next_run_at,
+                    job.last_run_at,
+                    job.last_status,
+                ),
+            )
+        except Exception as e:
+            logger.error(f"保存调度任务 {job.id} 失败: {e}")
+
+    async def _run_loop(self):
+        while True:
+            now = datetime.now()
+            due = [
+                job for job in self.jobs.values() if job.next_run_at and job.next_run_at <= now
+            ]
+            for job in due:
+                # 单个任务出错不能让调度循环退出，其他任务仍要按时运行
+                try:
+                    await self._fire(job, now)
+                except Exception as e:
+                    logger.error(f"触发任务 {job.id} 失败: {e}")
+
+            upcoming = [job.next_run_at for job in self.jobs.values() if job.next_run_at]
+            delay = (min(upcoming) - datetime.now()).total_seconds() if upcoming else 60
+            self.wakeup.clear()
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), max(0.05, min(delay, 60)))
+            except asyncio.TimeoutError:
+                pass
+
+    async def _fire(self, job: Job, now: datetime):
+        lateness = (now - job.next_run_at).total_seconds()
+        # 多次错过的运行合并为一次，下次运行时间从现在重新计算
+        try:
+            job.next_run_at = self._next_run(job, now)
+        except ValueError as e:
+            logger.error(f"任务 {job.id} 没有下一次运行时间，已停用: {e}")
+            await self._disable(job)
+            return
+        if job.misfire_grace is not None and lateness > job.misfire_grace:
+            logger.warning(f"任务 {job.id} 错过运行时间 {lateness:.0f} 秒，跳过本次")
+            job.last_status = "misfired"
+        elif job.running >= job.max_instances:
+            logger.warning(f"任务 {job.id} 已有 {job.running} 个实例在运行，跳过本次")
+            job.last_status = "skipped"
+        else:
+            self._launch(job)
+        await self._save_job(job)
+        logger.progress(f"{job.id} 下一次运行时间 {job.next_run_at:%Y-%m-%d %H:%M:%S}")
+
+    async def _disable(self, job: Job):
+        """停用任务：不再调度，数据库中标记为未启用，重启后也不再加载"""
+        self.jobs.pop(job.id, None)
+        if not self.persistent:
+            return
+        try:
+            await db_manager.execute("UPDATE crawl_jobs SET enabled = 0 WHERE id = %s", (job.id,))
+        except Exception as e:
+            logger.error(f"停用调度任务 {job.id} 失败: {e}")
+
+    def _launch(self, job: Job):
+        job.running += 1
+        job.last_run_at = datetime.now()
+        job.last_status = "running"
+        task = asyncio.create_task(self._execute(job))
+        self.running_tasks.add(task)
+        task.add_done_callback(self.running_tasks.discard)
+
+    async def _execute(self, job: Job):
+        status = "success"
+        try:
+            await self.handlers[job.kind](job)
+        except asyncio.CancelledError:
+            status = "cancelled"
+            raise
+        except Exception as e:
+            status = "failed"
+            logger.error(f"任务 {job.id} 运行失败: {e}")
+        finally:
+            job.running -= 1
+            job.last_status = status
+            if job.id in self.jobs and status != "cancelled":
+                await self._save_job(job)
+
+    def snapshot(self) -> List[Dict]:
+        """各任务的调度状态"""
+        return [
+            {
+                "id": job.id,
+                "kind": job.kind,
+                "trigger": f"{job.trigger.type}:{job.trigger.value}",
+                "nextRunAt": job.next_run_at.isoformat() if job.next_run_at else None,
+                "lastRunAt": job.last_run_at.isoformat() if job.last_run_at else None,
+                "lastStatus": job.last_status,
+                "running": job.running,
+            }
+            for job in self.jobs.values()
+        ]
+
+    async def close(self):
+        """停止调度循环并取消正在运行的任务"""
+        if self.loop_task:
+            self.loop_task.cancel()
+            await asyncio.gather(self.loop_task, return_exceptions=True)
+            self.loop_task = None
+        for task in list(self.running_tasks):
+            task.cancel()
+        await asyncio.gather(*self.running_tasks, return_exceptions=True)
+        logger.info("调度器已停止")
+
+
+scheduler = JobScheduler()
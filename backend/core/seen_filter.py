@@ -0,0 +1,196 @@
+import hashlib
+import math
+import os
+import re
+import struct
+import time
+from typing import Dict, Optional
+
+from core.database import db_manager
+from core.logger_utils import logger
+
+SNAPSHOT_MAGIC = b"SEEN1"
+SNAPSHOT_HEADER = struct.Struct(">5sQQBQ")  # magic, last_id, 位数, 哈希次数, 元素数
+
+
+class BloomFilter:
+    """布隆过滤器：不存在时一定返回 False，存在时可能误报"""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.num_bits = max(
+            8, int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        )
+        self.num_hashes = max(1, int(round(self.num_bits / capacity * math.log(2))))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str):
+        # 双重哈希：一次 blake2b 拆出两个 64 位整数生成 k 个位置
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:], "big") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, key: str):
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+class SeenFilter:
+    """
+    已入库文章的内存过滤器（article_url 和规范化后的标题）。
+
+    启动时从 accounts_accountnews 构建（有快照时先加载快照再增量追平），
+    save_article 成功后同步加入，并定期按自增 id 拉取其他进程写入的新行。
+    过滤器判定“不存在”的文章无需查库；判定“可能存在”的再由数据库确认。
+    """
+
+    def __init__(self):
+        self.bloom: Optional[BloomFilter] = None
+        self.last_id = 0
+        self.last_refresh = 0.0
+        self.loaded = False
+
+    @staticmethod
+    def normalize_title(title: str) -> str:
+        return re.sub(r"\s+", "", title or "")
+
+    def _keys(self, url: Optional[str], title: Optional[str]):
+        if url:
+            yield f"u:{url}"
+        if title:
+            yield f"t:{self.normalize_title(title)}"
+
+    def add(self, url: Optional[str], title: Optional[str]):
+        """记录一篇已入库的文章"""
+        if self.bloom is None:
+            return
+        for key in self._keys(url, title):
+            self.bloom.add(key)
+
+    def might_contain(self, item: Dict) -> bool:
+        """文章可能已存在时返回 True；未加载时一律返回 True 交给数据库判断"""
+        if self.bloom is None:
+            return True
+        return any(
+            key in self.bloom for key in self._keys(item.get("article_url"), item.get("title"))
+        )
+
+    async def load(self, snapshot_path=None):
+        """构建过滤器：优先加载磁盘快照，再从数据库追平之后新增的文章"""
+        snapshot_path = snapshot_path or os.getenv("SEEN_FILTER_SNAPSHOT")
+        started = time.time()
+        row = await db_manager.fetchone(
+            "SELECT COUNT(*) AS total, COALESCE(MAX(id), 0) AS max_id FROM accounts_accountnews"
+        )
+        total, max_id = (row["total"], row["max_id"]) if row else (0, 0)
+        loaded = bool(snapshot_path) and self._load_snapshot(snapshot_path)
+        if loaded and self.last_id > max_id:
+            # 表被清空或重建过，快照中的 id 已失效
+            logger.warning("过滤器快照比数据库新，将从数据库重建")
+            loaded = False
+        if not loaded:
+            capacity = max(int(os.getenv("SEEN_FILTER_CAPACITY", 1000000)), total * 4)
+            self.bloom = BloomFilter(
+                capacity, float(os.getenv("SEEN_FILTER_ERROR_RATE", 0.001))
+            )
+            self.last_id = 0
+        added = await self.refresh()
+        self.loaded = True
+        logger.success(
+            f"已入库文章过滤器加载完成，新增 {added} 条，耗时 {time.time() - started:.2f} 秒"
+        )
+
+    async def refresh(self, batch_size=10000) -> int:
+        """按自增 id 增量拉取尚未加入过滤器的文章，返回新增条数"""
+        if self.bloom is None:
+            return 0
+        # 并发事务的自增 id 可能乱序提交，较小的 id 晚于 last_id 才可见；
+        # 每次都回看 last_id 之前的一段 id，已加入的键不再重复计数
+        overlap = int(os.getenv("SEEN_FILTER_REFRESH_OVERLAP", 1000))
+        previous_id = self.last_id
+        cursor = max(0, self.last_id - overlap)
+        added = 0
+        while True:
+            rows = await db_manager.fetchall(
+                "SELECT id, title, article_url FROM accounts_accountnews "
+                "WHERE id > %s ORDER BY id LIMIT %s",
+                (cursor, batch_size),
+            )
+            for row in rows:
+                if row["id"] > previous_id or not self.might_contain(row):
+                    self.add(row["article_url"], row["title"])
+                    added += 1
+            if rows:
+                cursor = rows[-1]["id"]
+                self.last_id = max(self.last_id, cursor)
+            if len(rows) < batch_size:
+                break
+        self.last_refresh = time.monotonic()
+        return added
+
+    async def refresh_if_stale(self):
+        """超过刷新间隔时追平其他进程写入的文章"""
+        interval = float(os.getenv("SEEN_FILTER_REFRESH_INTERVAL", 30))
+        if self.loaded and time.monotonic() - self.last_refresh >= interval:
+            await self.refresh()
+
+    def _load_snapshot(self, path: str) -> bool:
+        if not os.path.exists(path):
+            return False
+        try:
+            with open(path, "rb") as f:
+                magic, last_id, num_bits, num_hashes, count = SNAPSHOT_HEADER.unpack(
+                    f.read(SNAPSHOT_HEADER.size)
+                )
+                if magic != SNAPSHOT_MAGIC:
+                    raise ValueError("快照格式不正确")
+                bloom = BloomFilter.__new__(BloomFilter)
+                bloom.num_bits = num_bits
+                bloom.num_hashes = num_hashes
+                bloom.count = count
+                bloom.bits = bytearray(f.read())
+                if len(bloom.bits) != (num_bits + 7) // 8:
+                    raise ValueError("快照长度不正确")
+        except Exception as e:
+            logger.warning(f"过滤器快照加载失败，将从数据库重建: {e}")
+            return False
+        self.bloom = bloom
+        self.last_id = last_id
+        logger.info(f"已加载过滤器快照 {path}，截至文章 id {last_id}")
+        return True
+
+    def save_snapshot(self, snapshot_path=None):
+        """将过滤器写入磁盘，下次启动只需增量追平"""
+        snapshot_path = snapshot_path or os.getenv("SEEN_FILTER_SNAPSHOT")
+        if not snapshot_path or self.bloom is None:
+            return
+        try:
+            directory = os.path.dirname(snapshot_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # 多个工作进程可能同时保存，临时文件按进程区分
+            tmp_path = f"{snapshot_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(
+                    SNAPSHOT_HEADER.pack(
+                        SNAPSHOT_MAGIC,
+                        self.last_id,
+                        self.bloom.num_bits,
+                        self.bloom.num_hashes,
+                        self.bloom.count,
+                    )
+                )
+                f.write(self.bloom.bits)
+            os.replace(tmp_path, snapshot_path)
+            logger.info(f"过滤器快照已保存: {snapshot_path}")
+        except Exception as e:
+            logger.error(f"保存过滤器快照失败: {e}")
+
+
+seen_filter = SeenFilter()
@@ -0,0 +1,181 @@
+import json
+import os
+import re
+import threading
+import time
+from typing import Dict, List
+
+from lxml import etree
+
+from core.logger_utils import logger
+
+RULES_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "spiders", "rules")
+STRING_VALUE = etree.XPath("string(.)")
+
+
+class FieldRule:
+    """
+    单个字段的提取规则，XPath 在加载时编译一次。
+
+    xpath 可以是多个备选表达式，按顺序尝试，第一个有结果的生效。
+    mode:
+        first   - 第一个结果（字符串）
+        all     - 全部结果（字符串列表）
+        lines   - 全部结果各自追加换行后拼接成正文
+        strings - 每个元素的 string(.)，去掉空白项
+        node    - 第一个元素节点
+        nodes   - 全部元素节点
+    """
+
+    def __init__(self, name: str, spec: Dict):
+        xpaths = spec["xpath"]
+        if isinstance(xpaths, str):
+            xpaths = [xpaths]
+        self.name = name
+        self.expressions = xpaths
+        self.compiled = [etree.XPath(x) for x in xpaths]
+        self.mode = spec.get("mode", "first")
+        self.strip = spec.get("strip", self.mode in ("first", "all"))
+        self.replace = spec.get("replace", [])
+        self.regex = re.compile(spec["regex"]) if spec.get("regex") else None
+        self.prefix = spec.get("prefix", "")
+        self.default = spec.get("default")
+        # 统计：调用次数、各备选表达式命中次数、累计耗时；解析在线程池中执行，更新时加锁
+        self.calls = 0
+        self.hits = [0] * len(self.compiled)
+        self.elapsed = 0.0
+        self.lock = threading.Lock()
+
+    def _clean(self, value) -> str:
+        value = str(value)
+        if self.strip:
+            value = value.strip()
+        for old, new in self.replace:
+            value = value.replace(old, new)
+        if self.regex:
+            match = self.regex.search(value)
+            value = match.group() if match else ""
+        return f"{self.prefix}{value}" if self.prefix and value else value
+
+    def extract(self, node):
+        started = time.perf_counter()
+        result = []
+        hit = None
+        for index, compiled in enumerate(self.compiled):
+            result = compiled(node)
+            if result:
+                hit = index
+                break
+
+        if self.mode == "node":
+            value = result[0] if result else self.default
+        elif self.mode == "nodes":
+            value = list(result)
+        elif self.mode == "strings":
+            value = [text for text in (STRING_VALUE(e).strip() for e in result) if text]
+        elif self.mode == "all":
+            value = [self._clean(r) for r in result]
+        elif self.mode == "lines":
+            value = "".join(f"{r}\n" for r in result)
+        else:
+            value = self._clean(result[0]) if result else self.default
+        elapsed = time.perf_counter() - started
+        with self.lock:
+            self.calls += 1
+            if hit is not None:
+                self.hits[hit] += 1
+            self.elapsed += elapsed
+        return value
+
+    def counters(self):
+        """调用次数、各备选命中次数和累计耗时的一致快照"""
+        with self.lock:
+            return self.calls, list(self.hits), self.elapsed
+
+    def take(self):
+        """取出统计并清零，用于把解析进程中的统计交给主进程"""
+        with self.lock:
+            counters = self.calls, self.hits, self.elapsed
+            self.calls, self.hits, self.elapsed = 0, [0] * len(self.compiled), 0.0
+        return counters
+
+    def add(self, calls: int, hits: List[int], elapsed: float):
+        """累加其他进程中的统计"""
+        with self.lock:
+            self.calls += calls
+            self.hits = [a + b for a, b in zip(self.hits, hits)]
+            self.elapsed += elapsed
+
+
+class SelectorRegistry:
+    """
+    按来源加载提取规则（spiders/rules/<来源>.json），规则文件结构为
+    {"分组": {"字段": {"xpath": [...], "mode": ...}}}，新增页面结构只需修改规则文件。
+    """
+
+    def __init__(self, rules_dir=None):
+        self.rules_dir = rules_dir or os.getenv("SELECTOR_RULES_DIR", RULES_DIR)
+        self.rules: Dict[str, Dict[str, Dict[str, FieldRule]]] = {}
+        self.lock = threading.Lock()
+
+    def load(self, source: str) -> Dict[str, Dict[str, FieldRule]]:
+        """加载并编译某个来源的规则，结果会缓存"""
+        rules = self.rules.get(source)
+        if rules is not None:
+            return rules
+        with self.lock:
+            if source not in self.rules:
+                path = os.path.join(self.rules_dir, f"{source}.json")
+                with open(path, encoding="utf-8") as f:
+                    spec = json.load(f)
+                self.rules[source] = {
+                    group: {name: FieldRule(name, field) for name, field in fields.items()}
+                    for group, fields in spec.items()
+                }
+                logger.info(f"已编译 {source} 的提取规则")
+        return self.rules[source]
+
+    def rule(self, source: str, group: str, field: str) -> FieldRule:
+        return self.load(source)[group][field]
+
+    def extract(self, source: str, group: str, field: str, node):
+        """用指定规则从节点中提取字段"""
+        return self.rule(source, group, field).extract(node)
+
+    def drain(self) -> List[tuple]:
+        """取出本进程中有调用的规则的统计并清零：[(来源, 分组, 字段, 调用次数, 命中次数, 耗时)]"""
+        result = []
+        for source, groups in list(self.rules.items()):
+            for group, fields in groups.items():
+                for name, rule in fields.items():
+                    calls, hits, elapsed = rule.take()
+                    if calls:
+                        result.append((source, group, name, calls, hits, elapsed))
+        return result
+
+    def merge(self, counters: List[tuple]):
+        """合并 drain() 从解析进程带回的统计"""
+        for source, group, name, calls, hits, elapsed in counters:
+            self.rule(source, group, name).add(calls, hits, elapsed)
+
+    def stats(self) -> List[Dict]:
+        """各规则的调用次数、备选命中次数和平均耗时"""
+        result = []
+        for source, groups in self.rules.items():
+            for group, fields in groups.items():
+                for name, rule in fields.items():
+                    calls, hits, elapsed = rule.counters()
+                    result.append(
+                        {
+                            "source": source,
+                            "rule": f"{group}.{name}",
+                            "calls": calls,
+                            "hits": dict(zip(rule.expressions, hits)),
+                            "avgMs": round(elapsed / calls * 1000, 3) if calls else 0,
+                        }
+                    )
+        return result
+
+
+selector_registry = SelectorRegistry()
+
@@ -0,0 +1,244 @@
+import asyncio
+import itertools
+import multiprocessing
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from core.article_writer import article_writer
+from core.logger_utils import logger
+
+# 读取线程的停止标记
+STOP = None
+
+
+class WriterChannel:
+    """
+    工作进程一侧的写入通道：把本进程 article_writer 攒好的批次发给主进程写入，
+    并等待主进程返回每行是否为新插入。
+    """
+
+    def __init__(self, worker_id: int, generation: int, request_queue, response_queue):
+        self.worker_id = worker_id
+        self.generation = generation
+        self.request_queue = request_queue
+        self.response_queue = response_queue
+        self.batch_ids = itertools.count(1)
+        self.pending: Dict[int, asyncio.Future] = {}
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.reader: Optional[threading.Thread] = None
+        self.timeout = float(os.getenv("SUPERVISOR_WRITE_TIMEOUT", 60))
+
+    def start(self):
+        """启动接收主进程回执的线程"""
+        self.loop = asyncio.get_running_loop()
+        self.reader = threading.Thread(target=self._read_responses, daemon=True)
+        self.reader.start()
+
+    def _read_responses(self):
+        while (message := self.response_queue.get()) is not STOP:
+            batch_id, outcomes = message
+            self.loop.call_soon_threadsafe(self._resolve, batch_id, outcomes)
+
+    def _resolve(self, batch_id: int, outcomes: List[bool]):
+        future = self.pending.pop(batch_id, None)
+        if future and not future.done():
+            future.set_result(outcomes)
+
+    async def write_batch(self, rows: List[tuple]) -> List[bool]:
+        """发送一批文章行并等待写入结果"""
+        batch_id = next(self.batch_ids)
+        future = self.loop.create_future()
+        self.pending[batch_id] = future
+        await self.loop.run_in_executor(
+            None, self.request_queue.put, (self.worker_id, self.generation, batch_id, rows)
+        )
+        # 主进程的写入任务异常或主进程退出时收不到回执，超时后按整批失败处理，不阻塞写入器
+        try:
+            return await asyncio.wait_for(future, self.timeout)
+        except asyncio.TimeoutError:
+            self.pending.pop(batch_id, None)
+            raise TimeoutError(f"等待主进程写入结果超过 {self.timeout:g} 秒")
+
+    def close(self):
+        if self.reader:
+            self.response_queue.put(STOP)
+            self.reader.join(timeout=5)
+            self.reader = None
+
+
+class WorkerHandle:
+    def __init__(self, worker_id: int, spider_names: List[str]):
+        self.worker_id = worker_id
+        self.spider_names = spider_names
+        self.process: Optional[multiprocessing.Process] = None
+        self.response_queue = None
+        self.generation = 0
+        self.started_at = 0.0
+        self.restarts = 0
+        self.restart_pending = False
+
+
+class Supervisor:
+    """
+    多进程监督者：每个工作进程运行一组爬虫（各自的事件循环、HTTP 连接池和解析线程），
+    抓取结果通过进程间队列批量交给主进程，由主进程唯一的 article_writer 合并写库。
+    工作进程异常退出后按指数退避自动重启，稳定运行一段时间后退避清零。
+    """
+
+    def __init__(
+        self,
+        target: Callable,
+        assignment: List[List[str]],
+        restart_delay=None,
+        max_restart_delay=None,
+    ):
+        """
+        :param target: 工作进程入口，参数为 (worker_id, generation, spider_names, request_queue, response_queue)
+        :param assignment: 每个工作进程负责的爬虫名称列表
+        """
+        self.target = target
+        self.context = multiprocessing.get_context("spawn")
+        self.request_queue = self.context.Queue()
+        self.workers = [
+            WorkerHandle(worker_id, names) for worker_id, names in enumerate(assignment)
+        ]
+        self.restart_delay = float(restart_delay or os.getenv("SUPERVISOR_RESTART_DELAY", 2))
+        self.max_restart_delay = float(
+            max_restart_delay or os.getenv("SUPERVISOR_MAX_RESTART_DELAY", 60)
+        )
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.reader: Optional[threading.Thread] = None
+        self.write_tasks = set()
+        self.stopping = False
+
+    def _spawn(self, worker: WorkerHandle):
+        # 每次启动换一个回执队列，旧进程未完成批次的回执不会串到新进程
+        worker.generation += 1
+        worker.response_queue = self.context.Queue()
+        worker.process = self.context.Process(
+            target=self.target,
+            args=(
+                worker.worker_id,
+                worker.generation,
+                worker.spider_names,
+                self.request_queue,
+                worker.response_queue,
+            ),
+            name=f"crawler-worker-{worker.worker_id}",
+            daemon=False,
+        )
+        worker.process.start()
+        worker.started_at = time.monotonic()
+        logger.info(
+            f"工作进程 {worker.worker_id} 已启动 (pid {worker.process.pid}): {', '.join(worker.spider_names)}"
+        )
+
+    def _read_requests(self):
+        while (message := self.request_queue.get()) is not STOP:
+            self.loop.call_soon_threadsafe(self._schedule_write, message)
+
+    def _schedule_write(self, message):
+        task = asyncio.create_task(self._write(*message))
+        self.write_tasks.add(task)
+        task.add_done_callback(self.write_tasks.discard)
+
+    async def _write(self, worker_id: int, generation: int, batch_id: int, rows: List[tuple]):
+        # 逐行交给主进程的批量写入器，多个工作进程的批次会合并成更大的 INSERT
+        outcomes = await asyncio.gather(*[article_writer.submit(row) for row in rows])
+        worker = self.workers[worker_id]
+        if worker.generation == generation:
+            worker.response_queue.put((batch_id, list(outcomes)))
+
+    async def run(self):
+        """启动所有工作进程并监控，直到被取消"""
+        self.loop = asyncio.get_running_loop()
+        self.reader = threading.Thread(target=self._read_requests, daemon=True)
+        self.reader.start()
+        for worker in self.workers:
+            self._spawn(worker)
+
+        while True:
+            await asyncio.sleep(1)
+            for worker in self.workers:
+                if worker.restart_pending or worker.process.is_alive() or self.stopping:
+                    continue
+                uptime = time.monotonic() - worker.started_at
+                if uptime > self.max_restart_delay:
+                    worker.restarts = 0
+                delay = min(self.max_restart_delay, self.restart_delay * 2 ** worker.restarts)
+                worker.restarts += 1
+                logger.error(
+                    f"工作进程 {worker.worker_id} 已退出 (exitcode {worker.process.exitcode})，{delay:.0f} 秒后重启"
+                )
+                worker.restart_pending = True
+                self.loop.call_later(delay, self._respawn, worker)
+
+    def _respawn(self, worker: WorkerHandle):
+        worker.restart_pending = False
+        if not self.stopping:
+            self._spawn(worker)
+
+    def snapshot(self) -> List[Dict]:
+        """各工作进程的状态"""
+        return [
+            {
+                "worker": worker.worker_id,
+                "pid": worker.process.pid if worker.process else None,
+                "alive": bool(worker.process and worker.process.is_alive()),
+                "spiders": worker.spider_names,
+                "restarts": worker.restarts,
+            }
+            for worker in self.workers
+        ]
+
+    async def close(self, timeout=None):
+        """通知工作进程退出（它们会先写完缓冲区），等待退出后停止接收"""
+        self.stopping = True
+        timeout = float(timeout or os.getenv("SUPERVISOR_SHUTDOWN_TIMEOUT", 30))
+        for worker in self.workers:
+            if worker.process and worker.process.is_alive():
+                worker.process.terminate()
+        deadline = time.monotonic() + timeout
+        for worker in self.workers:
+            if worker.process:
+                await self.loop.run_in_executor(
+                    None, worker.process.join, max(0.0, deadline - time.monotonic())
+                )
+                if worker.process.is_alive():
+                    logger.warning(f"工作进程 {worker.worker_id} 未按时退出，强制结束")
+                    worker.process.kill()
+        if self.reader:
+            self.request_queue.put(STOP)
+            await self.loop.run_in_executor(None, self.reader.join, 5)
+        if self.write_tasks:
+            await asyncio.gather(*self.write_tasks, return_exceptions=True)
+        logger.info("所有工作进程已退出")
+
+
+def build_assignment(names: List[str], workers: int, raw: Optional[str] = None) -> List[List[str]]:
+    """
+    计算爬虫到工作进程的分配
+
+    :param names: 全部爬虫名称
+    :param workers: 工作进程数，未显式分配时按轮询分配
+    :param raw: 显式分配，如 "souhu;wangyi,pengpai;ithome,xinlang"，未列出的爬虫轮询补到各进程
+    """
+    if raw:
+        assignment = [
+            [name.strip() for name in group.split(",") if name.strip()]
+            for group in raw.split(";")
+            if group.strip()
+        ]
+        unknown = {name for group in assignment for name in group} - set(names)
+        if unknown:
+            raise ValueError(f"未知的爬虫: {', '.join(sorted(unknown))}")
+        assigned = {name for group in assignment for name in group}
+        rest = [name for name in names if name not in assigned]
+    else:
+        assignment = [[] for _ in range(max(1, min(workers, len(names))))]
+        rest = list(names)
+    for index, name in enumerate(rest):
+        assignment[index % len(assignment)].append(name)
+    return [group for group in assignment if group]
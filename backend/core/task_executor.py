@@ -0,0 +1,204 @@
+import asyncio
+import heapq
+import itertools
+import os
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from core.logger_utils import logger
+
+
+class TaskTimeout(asyncio.TimeoutError):
+    """任务运行超过执行器设置的超时时间"""
+
+    def __init__(self, name: str, timeout: float):
+        super().__init__(f"任务 {name} 运行超过 {timeout:g} 秒")
+        self.name = name
+        self.timeout = timeout
+
+
+class TaskHandle:
+    """提交给执行器的一个任务，future 在任务结束（完成、失败、超时或取消）时完成"""
+
+    def __init__(self, key: str, name: str, factory: Callable[[], Awaitable], priority: int,
+                 timeout: Optional[float]):
+        self.key = key
+        self.name = name
+        self.factory = factory
+        self.priority = priority
+        self.timeout = timeout
+        self.state = "queued"
+        self.queued_at = time.monotonic()
+        self.started_at: Optional[float] = None
+        self.task: Optional[asyncio.Task] = None
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+
+
+class TaskExecutor:
+    """
+    有界任务执行器：API 触发的爬取任务排队执行，同时运行的数量不超过 TASK_EXECUTOR_CONCURRENCY。
+
+    排队的任务按优先级（数值大的先运行）、同优先级按提交顺序执行；
+    每个任务有超时（TASK_TIMEOUT 秒，0 为不限制），可以在排队或运行中按键取消。
+    爬取和 API 请求处理在同一个事件循环里，限制同时运行的全量爬取，API 响应时间才不会被拖慢。
+    """
+
+    def __init__(
+        self,
+        max_concurrency=None,
+        default_timeout=None,
+        concurrency_env="TASK_EXECUTOR_CONCURRENCY",
+        default_concurrency=2,
+    ):
+        self.max_concurrency = max_concurrency
+        self.default_timeout = default_timeout
+        self.concurrency_env = concurrency_env
+        self.default_concurrency = default_concurrency
+        self.queue: List[Tuple[int, int, TaskHandle]] = []
+        self.sequence = itertools.count()
+        self.active: Dict[str, TaskHandle] = {}
+        self.running: Dict[str, TaskHandle] = {}
+        self.counters = {"completed": 0, "failed": 0, "cancelled": 0, "timeout": 0}
+
+    def _load_config(self):
+        if self.default_timeout is not None:
+            return
+        self.max_concurrency = int(
+            self.max_concurrency or os.getenv(self.concurrency_env, self.default_concurrency)
+        )
+        self.default_timeout = float(os.getenv("TASK_TIMEOUT", 3600))
+
+    def submit(
+        self,
+        key: str,
+        factory: Callable[[], Awaitable],
+        priority: int = 0,
+        timeout: Optional[float] = None,
+        name: Optional[str] = None,
+    ) -> TaskHandle:
+        """
+        提交任务，同一个键已在排队或运行时返回已有的任务
+
+        :param factory: 无参函数，开始运行时调用并返回要执行的协程
+        :param priority: 优先级，数值大的先运行
+        :param timeout: 超时秒数，默认 TASK_TIMEOUT
+        """
+        self._load_config()
+        if key in self.active:
+            return self.active[key]
+        handle = TaskHandle(
+            key, name or key, factory, priority,
+            self.default_timeout if timeout is None else timeout,
+        )
+        # 等待结果的一方被取消时（如调度器关闭），同时取消排队或运行中的任务
+        handle.future.add_done_callback(lambda future: self._on_done(handle))
+        self.active[key] = handle
+        heapq.heappush(self.queue, (-priority, next(self.sequence), handle))
+        self._dispatch()
+        if handle.state == "queued":
+            logger.info(f"任务 {handle.name} 已排队，前面还有 {self.queue_depth - 1} 个")
+        return handle
+
+    async def run(self, key: str, factory: Callable[[], Awaitable], **kwargs):
+        """提交任务并等待结果"""
+        return await self.submit(key, factory, **kwargs).future
+
+    def cancel(self, key: str) -> bool:
+        """取消排队或运行中的任务"""
+        handle = self.active.get(key)
+        if handle is None:
+            return False
+        handle.future.cancel()
+        return True
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(1 for _, _, handle in self.queue if handle.state == "queued")
+
+    def _dispatch(self):
+        while self.queue and len(self.running) < self.max_concurrency:
+            _, _, handle = heapq.heappop(self.queue)
+            # 已取消的任务留在堆里，出队时丢弃
+            if handle.state != "queued":
+                continue
+            handle.state = "running"
+            handle.started_at = time.monotonic()
+            self.running[handle.key] = handle
+            handle.task = asyncio.create_task(self._execute(handle))
+
+    async def _execute(self, handle: TaskHandle):
+        deadline = asyncio.timeout(handle.timeout or None)
+        try:
+            async with deadline:
+                result = await handle.factory()
+            state = "completed"
+            if not handle.future.done():
+                handle.future.set_result(result)
+        except asyncio.TimeoutError as e:
+            # 只有执行器的期限到了才算超时，任务内部的请求或数据库超时按失败处理
+            error = e
+            if deadline.expired():
+                state = "timeout"
+                logger.error(f"任务 {handle.name} 运行超过 {handle.timeout:g} 秒，已终止")
+                error = TaskTimeout(handle.name, handle.timeout)
+            else:
+                state = "failed"
+            if not handle.future.done():
+                handle.future.set_exception(error)
+        except asyncio.CancelledError:
+            state = "cancelled"
+            if not handle.future.done():
+                handle.future.cancel()
+        except Exception as e:
+            state = "failed"
+            if not handle.future.done():
+                handle.future.set_exception(e)
+        finally:
+            self.running.pop(handle.key, None)
+            self._dispatch()
+        handle.state = state
+        self.counters[state] += 1
+
+    def _on_done(self, handle: TaskHandle):
+        self.active.pop(handle.key, None)
+        if not handle.future.cancelled():
+            return
+        if handle.state == "queued":
+            handle.state = "cancelled"
+            self.counters["cancelled"] += 1
+            logger.info(f"任务 {handle.name} 已在排队中取消")
+        elif handle.task and not handle.task.done():
+            logger.info(f"正在取消任务 {handle.name}")
+            handle.task.cancel()
+
+    def snapshot(self) -> Dict:
+        """并发上限、运行中和排队中的任务"""
+        self._load_config()
+        now = time.monotonic()
+        queued = sorted(
+            (entry for entry in self.queue if entry[2].state == "queued"), key=lambda e: e[:2]
+        )
+        return {
+            "limit": self.max_concurrency,
+            "queueDepth": len(queued),
+            "running": [
+                {"key": h.key, "name": h.name, "seconds": round(now - h.started_at)}
+                for h in self.running.values()
+            ],
+            "queued": [
+                {"key": h.key, "name": h.name, "priority": h.priority,
+                 "waitSeconds": round(now - h.queued_at)}
+                for _, _, h in queued
+            ],
+            **self.counters,
+        }
+
+    async def close(self):
+        """取消所有排队和运行中的任务"""
+        for key in list(self.active):
+            self.cancel(key)
+        tasks = [h.task for h in self.running.values() if h.task]
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+task_executor = TaskExecutor()
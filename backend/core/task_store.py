@@ -0,0 +1,201 @@
+import json
+import os
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from core.database import db_manager
+from core.logger_utils import logger
+
+# API 字段名与 crawl_tasks 列名的对应关系
+FIELD_COLUMNS = {
+    "name": "name",
+    "source": "source",
+    "sourceName": "source_name",
+    "categories": "categories",
+    "categoryCounts": "category_counts",
+    "rate": "rate",
+    "rateSeconds": "rate_seconds",
+    "count": "count",
+    "priority": "priority",
+    "status": "status",
+    "dataCount": "data_count",
+    "checkpoint": "checkpoint",
+    "createdAt": "created_at",
+}
+JSON_FIELDS = {"categories", "categoryCounts", "checkpoint"}
+# 进程退出时处于这些状态的任务视为被中断
+ACTIVE_STATUSES = ("queued", "running")
+
+
+class TaskCheckpoint:
+    """
+    一次任务运行的进度：已完成的分类、已处理的文章数和各分类的列表游标。
+
+    爬虫通过 spider.checkpoint 上报进度，分类完成时立即保存，
+    文章进度最多每 TASK_CHECKPOINT_INTERVAL 秒保存一次；运行被中断后下次从检查点继续。
+    """
+
+    def __init__(self, task_id: int, data: Optional[Dict] = None):
+        data = data or {}
+        self.task_id = task_id
+        self.categories_done: List[str] = list(data.get("categoriesDone", []))
+        self.items_fetched: int = data.get("itemsFetched", 0)
+        self.saved: int = data.get("saved", 0)
+        self.cursors: Dict[str, Any] = dict(data.get("cursors", {}))
+        self.started_at: str = data.get("startedAt") or datetime.now().isoformat()
+        self.flush_interval = float(os.getenv("TASK_CHECKPOINT_INTERVAL", 10))
+        self.last_flush = time.monotonic()
+
+    @property
+    def resumed(self) -> bool:
+        return bool(self.categories_done or self.items_fetched)
+
+    def to_dict(self) -> Dict:
+        return {
+            "categoriesDone": self.categories_done,
+            "itemsFetched": self.items_fetched,
+            "saved": self.saved,
+            "cursors": self.cursors,
+            "startedAt": self.started_at,
+        }
+
+    def get_cursor(self, category: str):
+        return self.cursors.get(category)
+
+    def set_cursor(self, category: str, cursor):
+        self.cursors[category] = cursor
+
+    async def item_fetched(self):
+        """一篇文章处理完成"""
+        self.items_fetched += 1
+        await self.flush()
+
+    async def category_done(self, category: str, saved: int):
+        """一个分类处理完成，本次运行不再重新列出该分类"""
+        if category not in self.categories_done:
+            self.categories_done.append(category)
+        self.saved += saved
+        self.cursors.pop(category, None)
+        await self.flush(force=True)
+
+    async def flush(self, force: bool = False):
+        if not force and time.monotonic() - self.last_flush < self.flush_interval:
+            return
+        self.last_flush = time.monotonic()
+        await task_store.update(self.task_id, checkpoint=self.to_dict())
+
+
+class TaskStore:
+    """
+    API 任务的持久化存储（crawl_tasks 表），重启后任务和运行进度都不会丢失。
+    任务 ID 由数据库自增生成，不会与已入库文章引用的旧 task_id 重复；
+    数据库不可用时退化为进程内存储。
+    """
+
+    def __init__(self):
+        self.memory: Dict[int, Dict] = {}
+        self.next_id = 1
+
+    @property
+    def persistent(self) -> bool:
+        return db_manager.pool is not None
+
+    @staticmethod
+    def _to_row(fields: Dict) -> Dict:
+        row = {}
+        for field, value in fields.items():
+            if field in JSON_FIELDS and value is not None:
+                value = json.dumps(value, ensure_ascii=False)
+            elif field == "createdAt" and isinstance(value, str):
+                value = datetime.fromisoformat(value)
+            row[FIELD_COLUMNS[field]] = value
+        return row
+
+    @staticmethod
+    def _from_row(row: Dict) -> Dict:
+        task = {"id": row["id"]}
+        for field, column in FIELD_COLUMNS.items():
+            value = row.get(column)
+            if field in JSON_FIELDS and isinstance(value, (str, bytes)):
+                value = json.loads(value)
+            elif field == "createdAt" and isinstance(value, datetime):
+                value = value.isoformat()
+            task[field] = value
+        task["categories"] = task["categories"] or []
+        task["categoryCounts"] = task["categoryCounts"] or {}
+        task["dataCount"] = task["dataCount"] or 0
+        task["priority"] = task["priority"] or 0
+        return task
+
+    async def create(self, fields: Dict) -> Dict:
+        """保存新任务，返回带 id 的任务"""
+        if not self.persistent:
+            task = {"id": self.next_id, "checkpoint": None, **fields}
+            self.memory[task["id"]] = task
+            self.next_id += 1
+            return dict(task)
+        row = self._to_row(fields)
+        task_id = await db_manager.execute(
+            f"INSERT INTO crawl_tasks ({', '.join(row)}) VALUES ({', '.join(['%s'] * len(row))})",
+            tuple(row.values()),
+        )
+        return await self.get(task_id)
+
+    async def get(self, task_id: int) -> Optional[Dict]:
+        if not self.persistent:
+            task = self.memory.get(task_id)
+            return dict(task) if task else None
+        row = await db_manager.fetchone("SELECT * FROM crawl_tasks WHERE id = %s", (task_id,))
+        return self._from_row(row) if row else None
+
+    async def list(self) -> List[Dict]:
+        if not self.persistent:
+            return [dict(task) for task in self.memory.values()]
+        rows = await db_manager.fetchall("SELECT * FROM crawl_tasks ORDER BY id")
+        return [self._from_row(row) for row in rows]
+
+    async def update(self, task_id: int, **fields):
+        """更新任务字段（API 字段名）"""
+        if not self.persistent:
+            if task_id in self.memory:
+                self.memory[task_id].update(fields)
+            return
+        row = self._to_row(fields)
+        try:
+            await db_manager.execute(
+                f"UPDATE crawl_tasks SET {', '.join(f'{column} = %s' for column in row)} "
+                "WHERE id = %s",
+                (*row.values(), task_id),
+            )
+        except Exception as e:
+            logger.error(f"更新任务 {task_id} 失败: {e}")
+
+    async def delete(self, task_id: int):
+        if not self.persistent:
+            self.memory.pop(task_id, None)
+            return
+        await db_manager.execute("DELETE FROM crawl_tasks WHERE id = %s", (task_id,))
+
+    async def interrupted(self) -> List[Dict]:
+        """上次进程退出时仍在排队或运行的任务"""
+        return [task for task in await self.list() if task["status"] in ACTIVE_STATUSES]
+
+    async def load_checkpoint(self, task_id: int) -> TaskCheckpoint:
+        """读取任务的检查点，没有未完成的运行时返回新的检查点"""
+        task = await self.get(task_id)
+        return TaskCheckpoint(task_id, task.get("checkpoint") if task else None)
+
+    async def count_by_status(self) -> Dict[str, int]:
+        if not self.persistent:
+            counts: Dict[str, int] = {}
+            for task in self.memory.values():
+                counts[task["status"]] = counts.get(task["status"], 0) + 1
+            return counts
+        rows = await db_manager.fetchall(
+            "SELECT status, COUNT(*) AS total FROM crawl_tasks GROUP BY status"
+        )
+        return {row["status"]: row["total"] for row in rows}
+
+
+task_store = TaskStore()
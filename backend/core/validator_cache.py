@@ -0,0 +1,104 @@
+import hashlib
+import json
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+from core.database import db_manager
+from core.logger_utils import logger
+
+
+# 流水线拉取列表期间收到的校验器，分类完整处理后才保存，否则下次 304 会跳过没处理完的文章
+pending_validators: ContextVar[Optional[List[tuple]]] = ContextVar(
+    "pending_validators", default=None
+)
+
+
+class NotModified(Exception):
+    """条件请求返回 304：列表自上次请求以来没有变化"""
+
+    def __init__(self, url: str):
+        super().__init__(f"{url} 未变化")
+        self.url = url
+
+
+def request_key(method: str, url: str, params: Optional[Dict] = None) -> str:
+    """按请求方法、地址和参数生成的定长键"""
+    identity = f"{method.upper()} {url} {json.dumps(params or {}, sort_keys=True, ensure_ascii=False)}"
+    return hashlib.blake2b(identity.encode("utf-8"), digest_size=20).hexdigest()
+
+
+class ValidatorCache:
+    """
+    列表接口的 HTTP 校验器（ETag、Last-Modified），按请求方法、地址和参数保存。
+
+    条件请求带上 If-None-Match / If-Modified-Since，服务器返回 304 时不再下载和解析列表。
+    校验器保存在 crawl_http_validators 表，重启后沿用；数据库不可用时只保存在内存中。
+    """
+
+    def __init__(self):
+        self.validators: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+        self.loaded = False
+        self.not_modified = 0
+
+    async def _load(self):
+        if self.loaded or db_manager.pool is None:
+            return
+        self.loaded = True
+        try:
+            rows = await db_manager.fetchall(
+                "SELECT request_key, etag, last_modified FROM crawl_http_validators"
+            )
+        except Exception as e:
+            logger.error(f"加载 HTTP 校验器失败: {e}")
+            return
+        for row in rows:
+            self.validators.setdefault(row["request_key"], (row["etag"], row["last_modified"]))
+
+    async def headers_for(self, key: str) -> Dict[str, str]:
+        """条件请求头，没有保存过校验器时为空"""
+        await self._load()
+        etag, last_modified = self.validators.get(key, (None, None))
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        return headers
+
+    async def received(
+        self, key: str, url: str, etag: Optional[str], last_modified: Optional[str]
+    ):
+        """收到响应的校验器：流水线中先暂存，由流水线在分类处理完成后保存"""
+        pending = pending_validators.get()
+        if pending is not None:
+            pending.append((key, url, etag, last_modified))
+            return
+        await self.store(key, url, etag, last_modified)
+
+    async def store(self, key: str, url: str, etag: Optional[str], last_modified: Optional[str]):
+        """保存响应的校验器，与已保存的相同时不写数据库"""
+        validators = (etag, last_modified)
+        if self.validators.get(key) == validators:
+            return
+        if not etag and not last_modified and key not in self.validators:
+            return
+        self.validators[key] = validators
+        if db_manager.pool is None:
+            return
+        try:
+            await db_manager.execute(
+                """
+                INSERT INTO crawl_http_validators (request_key, url, etag, last_modified)
+                VALUES (%s, %s, %s, %s)
+                ON DUPLICATE KEY UPDATE etag = VALUES(etag), last_modified = VALUES(last_modified)
+                """,
+                (key, url, etag, last_modified),
+            )
+        except Exception as e:
+            logger.error(f"保存 {url} 的 HTTP 校验器失败: {e}")
+
+    def snapshot(self) -> Dict:
+        return {"validators": len(self.validators), "notModified": self.not_modified}
+
+
+validator_cache = ValidatorCache()
@@ -1,107 +1,77 @@
 
 
+import argparse
 import asyncio
 import logging
 import os
-import time
+import signal
 from datetime import datetime
 from dotenv import load_dotenv
 
 # 导入数据库管理器
-from database import db_manager
-from logger_utils import logger
+from core.article_writer import article_writer
+from core.backfill import backfill_runner, supports_backfill
+from core.database import db_manager
+from core.frontier import frontier
+from core.http_client import http_client
+from core.logger_utils import logger
+from core.negative_cache import negative_cache
+from core.parse_executor import parse_executor
+from core.rate_limiter import rate_limiter
+from core.scheduler import scheduler
+from core.seen_filter import seen_filter
+from core.supervisor import Supervisor, WriterChannel, build_assignment
 
 # 导入所有爬虫
-from ithome import ITHome
-from pengpai import PengPai
-from wangyi import WangYi
-from souhu import SouHu
-from tengxunxinwen import TenXuNews
-from tengxuntiyu import TenXun
-from xinlang import XinLangGuoJi
-from zhongguoribao import ChineseDayNews
+from spiders.ithome import ITHome
+from spiders.pengpai import PengPai
+from spiders.wangyi import WangYi
+from spiders.souhu import SouHu
+from spiders.tengxunxinwen import TenXuNews
+from spiders.tengxuntiyu import TenXun
+from spiders.xinlang import XinLangGuoJi
+from spiders.zhongguoribao import ChineseDayNews
 
 # 加载.env文件
 load_dotenv()
 
 # 配置日志已在logger_utils中完成
 
-# 爬虫列表及其间隔时间
+# 爬虫列表及其各分类的初始重爬间隔
 spiders = {
     "ithome": {
         # 爬虫类
         "spider": ITHome(),
         # 运行间隔时间，单位为秒，这里设置为5分钟，即180秒
         "interval": int(os.getenv("ITHOME_INTERVAL", 360)),
-        # 上次运行时间，初始化为0，表示还没有运行过
-        "last_run": 0,
-        # 类别的间隔时间，单位为秒，这里设置为0，表示无间隔
-        "class_sleep_time": 0,
-        # 文章详情的间隔时间，单位为秒，这里设置为0，表示无间隔
-        "info_sleep_time": 0,
     },
     "pengpai": {
         "spider": PengPai(),
         "interval": int(os.getenv("PENGPAI_INTERVAL", 360)),
-        "last_run": 0,
-        # 类别的间隔时间，单位为秒，这里设置为0，表示无间隔
-        "class_sleep_time": 2,
-        # 文章详情的间隔时间，单位为秒，这里设置为0，表示无间隔
-        "info_sleep_time": 2,
     },
     "wangyi": {
         "spider": WangYi(),
         "interval": int(os.getenv("WANGYI_INTERVAL", 180)),
-        "last_run": 0,
-        # 类别的间隔时间，单位为秒，这里设置为0，表示无间隔
-        "class_sleep_time": 2,
-        # 文章详情的间隔时间，单位为秒，这里设置为0，表示无间隔
-        "info_sleep_time": 2,
     },
     "souhu": {
         "spider": SouHu(),
         "interval": int(os.getenv("SOUHU_INTERVAL", 180)),
-        "last_run": 0,
-        # 类别的间隔时间，单位为秒，这里设置为0，表示无间隔
-        "class_sleep_time": 2,
-        # 文章详情的间隔时间，单位为秒，这里设置为0，表示无间隔
-        "info_sleep_time": 5,
     },
     "tengxunxinwen": {
         "spider": TenXuNews(),
         "interval": int(os.getenv("TENGXUNXINWEN_INTERVAL", 180)),
-        "last_run": 0,
-        # 类别的间隔时间，单位为秒，这里设置为0，表示无间隔
-        "class_sleep_time": 0,
-        # 文章详情的间隔时间，单位为秒，这里设置为0，表示无间隔
-        "info_sleep_time": 0,
     },
     "tengxuntiyu": {
         "spider": TenXun(),
         "interval": int(os.getenv("TENGXUNTIYU_INTERVAL", 180)),
-        "last_run": 0,
-        # 类别的间隔时间，单位为秒，这里设置为0，表示无间隔
-        "class_sleep_time": 0,
-        # 文章详情的间隔时间，单位为秒，这里设置为0，表示无间隔
-        "info_sleep_time": 0,
     },
     "xinlang": {
         "spider": XinLangGuoJi(),
         "interval": int(os.getenv("XINLANG_INTERVAL", 180)),
-        "last_run": 0,
-        # 类别的间隔时间，单位为秒，这里设置为0，表示无间隔
-        "class_sleep_time": 0,
-        # 文章详情的间隔时间，单位为秒，这里设置为0，表示无间隔
-        "info_sleep_time": 0,
     },
     "zhongguoribao": {
         "spider": ChineseDayNews(),
         "interval": int(os.getenv("ZHONGGUORIBAO_INTERVAL", 180)),
-        "last_run": 0,
-        # 类别的间隔时间，单位为秒，这里设置为0，表示无间隔
-        "class_sleep_time": 5,
-        # 文章详情的间隔时间，单位为秒，这里设置为0，表示无间隔
-        "info_sleep_time": 5,
     },
 }
 
@@ -124,69 +94,202 @@ async def init_database():
     logger.success("数据库连接池已创建，数据表已初始化")
 
 
-async def run_spider(name, spider_info):
-    """运行单个爬虫"""
-    try:
-        logger.info(f"开始运行爬虫: {name}")
-        spider = spider_info["spider"]
-        saved_count = await spider.crawl_and_save(
-            limit=DEFAULT_LIMIT,
-            class_sleep_time=spider_info["class_sleep_time"],
-            info_sleep_time=spider_info["info_sleep_time"],
+async def run_spider(job):
+    """运行单个爬虫，由调度器按计划触发"""
+    name = job.payload["name"]
+    if name not in spiders:
+        logger.warning(f"未知的爬虫: {name}，跳过")
+        return
+    logger.info(f"开始运行爬虫: {name}")
+    spider = spiders[name]["spider"]
+    saved_count = await spider.crawl_and_save(limit=DEFAULT_LIMIT)
+    logger.success(f"{name} 爬取完成，保存了 {saved_count} 篇文章")
+
+
+async def schedule_spiders(names=None):
+    """
+    为每个爬虫登记调度任务：默认每 RECRAWL_TICK 秒检查一次，设置 <NAME>_CRON 时按 cron 表达式运行。
+    每次运行只爬取到了重爬时间的分类，<NAME>_INTERVAL 是各分类的初始重爬间隔，之后按产出自适应调整。
+    首次登记的任务立即运行，已登记的任务沿用数据库中保存的下次运行时间。
+    """
+    scheduler.register_handler("spider", run_spider)
+    tick = int(os.getenv("RECRAWL_TICK", 60))
+    jitter = int(os.getenv("SCHEDULER_JITTER", 30))
+    misfire_grace = int(os.getenv("SCHEDULER_MISFIRE_GRACE", 600))
+    for name in names or spiders:
+        spider_info = spiders[name]
+        spider_info["spider"].recrawl_interval = spider_info["interval"]
+        cron = os.getenv(f"{name.upper()}_CRON")
+        await scheduler.add_job(
+            f"spider:{name}",
+            "spider",
+            "cron" if cron else "interval",
+            cron or tick,
+            payload={"name": name},
+            jitter=jitter,
+            misfire_grace=misfire_grace,
+            max_instances=1,
+            run_immediately=True,
+        )
+    # 定期清理过期的失败地址记录
+    scheduler.register_handler("negative_cache", purge_negative_cache)
+    await scheduler.add_job(
+        "negative_cache:purge",
+        "negative_cache",
+        "interval",
+        int(os.getenv("NEGATIVE_CACHE_PURGE_INTERVAL", 3600)),
+        jitter=jitter,
+        max_instances=1,
+    )
+    if frontier.enabled:
+        # 定期清理共享前沿中已完成的文章工作项
+        scheduler.register_handler("frontier", purge_frontier)
+        await scheduler.add_job(
+            "frontier:purge",
+            "frontier",
+            "interval",
+            int(os.getenv("FRONTIER_PURGE_INTERVAL", 3600)),
+            payload={"older_than": int(os.getenv("FRONTIER_RETENTION", 86400))},
+            jitter=jitter,
+            max_instances=1,
         )
-        logger.success(f"{name} 爬取完成，保存了 {saved_count} 篇文章")
-        # 更新最后运行时间
-        spider_info["last_run"] = time.time()
-    except Exception as e:
-        logger.error(f"{name} 爬取失败: {e}")
-
-
-async def spider_worker(name, spider_info):
-    """爬虫工作协程，负责独立运行和管理单个爬虫"""
-    while True:
-        current_time = time.time()
-        # 检查是否需要运行爬虫
-        if current_time - spider_info["last_run"] >= spider_info["interval"]:
-            await run_spider(name, spider_info)
-            # 运行完爬虫后，直接等待设定的间隔时间
-            wait_time = spider_info["interval"]
-            logger.progress(f"{name} 下一次运行将在 {wait_time:.2f} 秒后进行")
-            await asyncio.sleep(wait_time)
-        else:
-            # 计算距离下次运行还需要等待的时间
-            remaining_time = spider_info["interval"] - (
-                current_time - spider_info["last_run"]
-            )
-            wait_time = max(1, remaining_time)  # 至少等待1秒
-            logger.progress(f"{name} 下一次运行将在 {wait_time:.2f} 秒后进行")
-            await asyncio.sleep(wait_time)
 
 
-async def main():
-    """主函数，创建并管理所有爬虫协程任务"""
+async def purge_frontier(job):
+    await frontier.purge(job.payload["older_than"])
+
+
+async def purge_negative_cache(job):
+    await negative_cache.purge()
+
+
+async def start_services():
+    """初始化数据库、HTTP 连接池、限速、过滤器、写入器和解析执行器"""
     # 初始化数据库
     await init_database()
+    # 创建共享 HTTP 连接池，加载按主机的限速配置
+    await http_client.start()
+    rate_limiter.load_config()
+    # 从数据库（或快照）构建已入库文章过滤器
+    await seen_filter.load()
+    # 启动批量文章写入器和页面解析执行器
+    await article_writer.start()
+    parse_executor.start()
+
+
+async def stop_services():
+    """按依赖顺序关闭各组件"""
+    # 停止调度器，取消正在运行的爬虫
+    await scheduler.close()
+    # 写完缓冲区中的文章
+    await article_writer.close()
+    # 保存过滤器快照，下次启动增量加载
+    seen_filter.save_snapshot()
+    # 关闭解析执行器和共享 HTTP 连接池
+    parse_executor.close()
+    await http_client.close()
+    # 关闭数据库连接
+    await db_manager.close_pool()
+    logger.success("数据库连接池已关闭")
 
-    logger.info("开始并发执行爬虫任务")
 
+async def run_worker(worker_id, generation, names, request_queue, response_queue):
+    """工作进程：只调度分配给自己的爬虫，文章批次交给主进程写入"""
+    channel = WriterChannel(worker_id, generation, request_queue, response_queue)
+    channel.start()
+    article_writer.remote = channel
+    # 主进程用 SIGTERM 通知退出，取消主协程后走正常的关闭流程
     try:
-        # 创建所有爬虫的工作协程
-        tasks = []
-        for name, spider_info in spiders.items():
-            task = asyncio.create_task(spider_worker(name, spider_info))
-            tasks.append(task)
+        asyncio.get_running_loop().add_signal_handler(
+            signal.SIGTERM, asyncio.current_task().cancel
+        )
+    except NotImplementedError:
+        pass
 
-        # 等待所有任务完成（实际上不会完成，因为是无限循环）
-        await asyncio.gather(*tasks)
+    await start_services()
+    logger.info(f"工作进程 {worker_id} 开始运行爬虫: {', '.join(names)}")
+    try:
+        await schedule_spiders(names)
+        # 共享的 crawl_jobs 表里有所有爬虫的任务，只运行本进程登记的
+        await scheduler.run_forever(set(scheduler.jobs))
+    except asyncio.CancelledError:
+        logger.info(f"工作进程 {worker_id} 收到退出信号，正在关闭...")
+    finally:
+        await stop_services()
+        channel.close()
 
-    except (KeyboardInterrupt, SystemExit):
+
+def worker_entry(worker_id, generation, names, request_queue, response_queue):
+    """工作进程入口（spawn 启动，需为模块级函数）"""
+    # Ctrl+C 由主进程统一处理
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    asyncio.run(run_worker(worker_id, generation, names, request_queue, response_queue))
+
+
+async def run_supervisor(assignment):
+    """多进程模式：主进程只负责写库和监督工作进程"""
+    await init_database()
+    await article_writer.start()
+    supervisor = Supervisor(worker_entry, assignment)
+    logger.info(f"多进程模式，共 {len(assignment)} 个工作进程")
+    try:
+        await supervisor.run()
+    except (KeyboardInterrupt, SystemExit, asyncio.CancelledError):
         logger.info("收到退出信号，正在关闭程序...")
     finally:
-        # 关闭数据库连接
+        await supervisor.close()
+        await article_writer.close()
         await db_manager.close_pool()
         logger.success("数据库连接池已关闭")
 
 
+async def run_backfill(until, names=None, categories=None, with_live=False):
+    """
+    回填模式：把各爬虫的分类往回翻到目标日期，完成后退出。
+    with_live 时同一进程内同时运行实时爬取，两者共用按主机限速和爬取预算，回填会给实时爬取让路。
+    """
+    names = names or [name for name in spiders if supports_backfill(spiders[name]["spider"])]
+    await start_services()
+    live_task = None
+    logger.info(f"开始回填到 {until:%Y-%m-%d}: {', '.join(names)}")
+    try:
+        if with_live:
+            await schedule_spiders()
+            live_task = asyncio.create_task(scheduler.run_forever())
+        for name in names:
+            await backfill_runner.run(spiders[name]["spider"], until, categories)
+    except (KeyboardInterrupt, SystemExit, asyncio.CancelledError):
+        logger.info("收到退出信号，回填进度已保存，正在关闭程序...")
+    finally:
+        if live_task:
+            live_task.cancel()
+        await stop_services()
+
+
+async def main():
+    """主函数，创建并管理所有爬虫协程任务"""
+    # CRAWLER_WORKERS 大于 1 或设置了 CRAWLER_ASSIGNMENT 时按多进程运行
+    workers = int(os.getenv("CRAWLER_WORKERS", 1))
+    raw_assignment = os.getenv("CRAWLER_ASSIGNMENT")
+    if workers > 1 or raw_assignment:
+        await run_supervisor(build_assignment(list(spiders), workers, raw_assignment))
+        return
+
+    await start_services()
+
+    logger.info("开始并发执行爬虫任务")
+
+    try:
+        # 登记所有爬虫的调度任务，由调度器按计划触发（不会结束）
+        await schedule_spiders()
+        await scheduler.run_forever()
+
+    except (KeyboardInterrupt, SystemExit):
+        logger.info("收到退出信号，正在关闭程序...")
+    finally:
+        await stop_services()
+
+
 if __name__ == "__main__":
     # 打印启动信息
     logger.header("文章爬虫系统启动")
@@ -195,5 +298,26 @@ if __name__ == "__main__":
     logger.info(f"爬虫列表: {', '.join(spiders.keys())}")
     logger.separator()
 
+    parser = argparse.ArgumentParser(description="文章爬虫系统")
+    commands = parser.add_subparsers(dest="command")
+    backfill_parser = commands.add_parser("backfill", help="回填历史文章")
+    backfill_parser.add_argument("--until", required=True, help="目标日期，如 2026-01-01")
+    backfill_parser.add_argument("--spiders", help="爬虫名称，逗号分隔，默认所有支持回填的爬虫")
+    backfill_parser.add_argument("--categories", help="分类名称，逗号分隔，默认全部分类")
+    backfill_parser.add_argument(
+        "--with-live", action="store_true", help="同时运行实时爬取，共用限速和爬取预算"
+    )
+    args = parser.parse_args()
+
     # 运行主函数
-    asyncio.run(main())
+    if args.command == "backfill":
+        asyncio.run(
+            run_backfill(
+                datetime.strptime(args.until, "%Y-%m-%d"),
+                args.spiders.split(",") if args.spiders else None,
+                args.categories.split(",") if args.categories else None,
+                args.with_live,
+            )
+        )
+    else:
+        asyncio.run(main())
@@ -8,14 +8,35 @@ from lxml import etree
 import sys
 sys.path.insert(0, '.')
 from core.base import BaseSpider
+from core.list_walker import list_walker
 from core.logger_utils import logger
+from core.parse_executor import parse_executor
+from core.selector_registry import selector_registry
 
-pengpai_failed_urls = set()
+
+def parse_pengpai_detail(content, item):
+    """
+    解析澎湃新闻详情页（在解析执行器中运行），正文为空时 article_info 为空字符串
+    """
+    rules = selector_registry.load("pengpai")["detail"]
+    content_html = etree.HTML(content)
+    img_list = rules["img_list"].extract(content_html)
+    article_info = rules["text"].extract(content_html)
+    return {
+        "title": item["title"],
+        "article_url": item["article_url"],
+        "cover_url": item["cover_url"],
+        "date_str": item["date_str"],
+        "article_info": article_info,
+        "img_list": img_list,
+        "category": item["category"],
+    }
 
 
 class PengPai(BaseSpider):
     source_name = "澎湃新闻"
     category = "新闻"
+    list_host = "api.thepaper.cn"
 
     category_list = [
         {"name": "中国政库", "code": "25462", "classify": "1"},
@@ -120,100 +141,109 @@ class PengPai(BaseSpider):
 
     async def get_news_list(self, category: dict):
         """
-        获取澎湃新闻列表
+        获取澎湃新闻列表，翻页直到上次见过的最新文章
         """
         try:
-            timestamp_milliseconds = int(time.time() * 1000)
-            json_data = {
-                "nodeId": category["code"],
-                "excludeContIds": [],
-                "pageSize": 20,
-                "startTime": timestamp_milliseconds,
-                "pageNum": 1,
-            }
-
-            response = await self.request(
-                method="POST",
-                url="https://api.thepaper.cn/contentapi/nodeCont/getByNodeIdPortal",
-                headers=self.headers,
-                data=json.dumps(json_data),
+            # 同一次遍历的各页使用相同的 startTime，翻页期间的新文章不会打乱页码
+            start_time = int(time.time() * 1000)
+            return await list_walker.walk(
+                self,
+                category["name"],
+                lambda page: self.get_news_page(category, page, start_time, volatile_start=True),
+                id_field="contId",
             )
-
-            response_data = json.loads(response)
-            try:
-                news_list = response_data["data"]["list"]
-            except:
-                news_list = []
-            result = []
-            for item in news_list:
-                if item.get("link"):
-                    continue
-                result.append(
-                    {
-                        "title": item["name"],
-                        "article_url": f"https://www.thepaper.cn/newsDetail_forward_{quote(item['contId'])}",
-                        "cover_url": item.get("pic", ""),
-                        "date_str": time.strftime(
-                            "%Y-%m-%d %H:%M:%S",
-                            time.localtime(item["pubTimeLong"] / 1000),
-                        ),
-                        "contId": item["contId"],
-                        "category": category["name"],
-                    }
-                )
-
-            return result
-
         except Exception as e:
             logger.error(f"获取澎湃新闻列表失败: {e}")
 
             return []
 
+    async def get_news_page(
+        self, category: dict, page: int, start_time: int, volatile_start: bool = False
+    ):
+        """
+        获取澎湃新闻列表的一页，返回 (文章列表, 下一页页码)
+
+        :param volatile_start: startTime 为当前时间，录制响应时不计入请求键，回放时各次遍历的同一页可以命中
+        """
+        json_data = {
+            "nodeId": category["code"],
+            "excludeContIds": [],
+            "pageSize": 20,
+            "startTime": start_time,
+            "pageNum": page,
+        }
+
+        response = await self.request(
+            method="POST",
+            url="https://api.thepaper.cn/contentapi/nodeCont/getByNodeIdPortal",
+            headers=self.headers,
+            data=json.dumps(json_data),
+            store_body=(
+                {k: v for k, v in json_data.items() if k != "startTime"}
+                if volatile_start
+                else None
+            ),
+        )
+
+        response_data = json.loads(response)
+        try:
+            news_list = response_data["data"]["list"]
+        except:
+            news_list = []
+        result = []
+        for item in news_list:
+            if item.get("link"):
+                continue
+            result.append(
+                {
+                    "title": item["name"],
+                    "article_url": f"https://www.thepaper.cn/newsDetail_forward_{quote(item['contId'])}",
+                    "cover_url": item.get("pic", ""),
+                    "date_str": time.strftime(
+                        "%Y-%m-%d %H:%M:%S",
+                        time.localtime(item["pubTimeLong"] / 1000),
+                    ),
+                    "contId": item["contId"],
+                    "category": category["name"],
+                }
+            )
+
+        has_next = (response_data.get("data") or {}).get("hasNext", bool(news_list))
+        return result, page + 1 if has_next else None
+
+    def backfill_start_cursor(self, category):
+        return int(time.time() * 1000)
+
+    async def get_backfill_page(self, category: dict, cursor: int):
+        """回填：以上一页最早文章的发布时间作为 startTime 往回取"""
+        result, _ = await self.get_news_page(category, 1, cursor)
+        if not result:
+            return result, None
+        oldest = min(
+            int(time.mktime(time.strptime(item["date_str"], "%Y-%m-%d %H:%M:%S")) * 1000)
+            for item in result
+        )
+        # 整页发布时间相同的极端情况下也要保证游标前进
+        return result, min(oldest, cursor - 1000)
+
     async def get_news_info(self, item, category=None):
         """
         获取澎湃新闻详情
         """
-        if item["article_url"] in pengpai_failed_urls:
-            logger.warning(f"跳过已失败的url: {item['article_url']}")
-            return None
         try:
             content = await self.request(url=item["article_url"])
-            content_html = etree.HTML(content)
-
-            img_list = content_html.xpath(
-                '//*[@id="__next"]/main/div[4]/div[1]/div[1]/div/div[2]/img/@data-src'
-            )
-
-            txt = content_html.xpath(
-                '//*[@id="__next"]/main/div[4]/div[1]/div[1]/div/div[2]/p'
-            )
-            article_info = ""
-            for item_ in txt:
-                t = item_.xpath(".//text()")
-                for i in t:
-                    article_info += i
-                    article_info += "\n"
+            data = await parse_executor.run(parse_pengpai_detail, content, item)
+            article_info = data["article_info"]
             if not article_info:
                 logger.error(
                     f"获取澎湃新闻详情失败: article_info 为空 article_url: {item['article_url']}"
                 )
-                pengpai_failed_urls.add(item["article_url"])
                 return None
             if len(article_info) < 50:
                 return None
-            data = {
-                "title": item["title"],
-                "article_url": item["article_url"],
-                "cover_url": item["cover_url"],
-                "date_str": item["date_str"],
-                "article_info": article_info,
-                "img_list": img_list,
-                "category": item["category"],
-            }
             return data
 
         except Exception as e:
-            pengpai_failed_urls.add(item["article_url"])
             logger.error(f"获取澎湃新闻详情失败: {e}")
             return None
 
@@ -221,8 +251,6 @@ class PengPai(BaseSpider):
         self,
         code=None,
         limit=None,
-        class_sleep_time=0,
-        info_sleep_time=0,
         addition_msg="",
     ) -> int:
         categories_to_crawl = self.category_list
@@ -232,17 +260,11 @@ class PengPai(BaseSpider):
             if not categories_to_crawl:
                 categories_to_crawl = self.category_list
         
-        for category in categories_to_crawl:
-            await super().crawl_and_save(
-                category,
-                limit,
-                class_sleep_time,
-                info_sleep_time,
-                f"类别：{category['name']}",
-            )
-            if class_sleep_time:
-                await asyncio.sleep(class_sleep_time)
-        return True
+        # 所有分类进入同一条流水线，前一个分类抓详情时后一个分类已在拉列表
+        return await self.crawl_units(
+            [(category, f"类别：{category['name']}") for category in categories_to_crawl],
+            limit,
+        )
 
 
 if __name__ == "__main__":
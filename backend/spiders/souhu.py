@@ -8,15 +8,110 @@ import json
 import sys
 sys.path.insert(0, '.')
 from core.base import BaseSpider
+from core.list_walker import list_walker
 from core.logger_utils import logger
-
-
-# Create your tests here.
+from core.parse_executor import parse_executor
+from core.selector_registry import selector_registry
+
+IMGS_LIST_RE = re.compile(r"imgsList:\s*(\[[^\]]+\])", re.DOTALL)
+
+
+def parse_souhu_detail(content, news):
+    """
+    解析搜狐新闻详情页（在解析执行器中运行）
+    """
+    rules = selector_registry.load("souhu")["detail"]
+    article_url = news["article_url"]
+    content_html = etree.HTML(content)
+    article_element = rules["article"].extract(content_html)
+    if article_element is None:
+        return parse_souhu_qiche(content_html, news)
+
+    if not news["date_str"]:
+        date_str = rules["news_time"].extract(content_html)
+        if date_str is None:
+            raise ValueError("未找到发布时间")
+    else:
+        date_str = news["date_str"]
+
+    # 移除 id="backsohucom" 的整个元素
+    for backsohu_element in rules["backsohu"].extract(article_element):
+        backsohu_element.getparent().remove(backsohu_element)
+
+    # 提取文本列表，过滤掉"责任编辑"内容
+    text_list = rules["paragraphs"].extract(article_element)
+
+    match = IMGS_LIST_RE.search(content)
+    if match:
+        try:
+            imgs_list_str = match.group(1)
+            img_list = ast.literal_eval(imgs_list_str)
+            img_list = [
+                (
+                    f"https:{item['url']}"
+                    if "https:" not in item["url"]
+                    else item["url"]
+                )
+                for item in img_list
+            ]
+        except Exception as e:
+            img_list = []
+    else:
+        img_list = []
+
+    article_info = "".join(f"{text}\n" for text in text_list)
+    if not article_info:
+        return None
+    return {
+        "title": news["title"],
+        "article_url": article_url,
+        "cover_url": news["cover_url"],
+        "date_str": date_str,
+        "article_info": article_info,
+        "img_list": img_list,
+        "category": news["category"],
+    }
+
+
+def parse_souhu_qiche(content_html, news):
+    """
+    获取搜狐汽车的结构不同，需要写新类型
+    """
+    rules = selector_registry.load("souhu")["qiche"]
+    try:
+        article_info = "".join(
+            f"{p.text.strip()}\n" for p in rules["paragraphs"].extract(content_html) if p.text
+        )
+
+        # 提取所有<img>标签的src属性
+        img_list = [
+            "https:" + (img.get("data-src") or img.get("src"))
+            for img in rules["images"].extract(content_html)
+            if img.get("src")
+        ]
+        date_str = rules["date_str"].extract(content_html)
+        if date_str is None:
+            raise ValueError("未找到发布时间")
+    except Exception as e:
+        logger.error(
+            f"获取搜狐汽车新闻详情失败: {e}，文章链接: {news['article_url']}"
+        )
+        return None
+    return {
+        "title": news["title"],
+        "article_url": news["article_url"],
+        "cover_url": news["cover_url"],
+        "date_str": date_str,
+        "article_info": article_info,
+        "img_list": img_list,
+        "category": news["category"],
+    }
 
 
 class SouHu(BaseSpider):
     source_name = "搜狐新闻"
     category = "新闻"
+    list_host = "odin.sohu.com"
     category_list = [
         {"name": "时政", "code": "438647_15", "classify": "16"},
         {"name": "国际", "code": "1649_13", "classify": "7"},
@@ -101,7 +196,8 @@ class SouHu(BaseSpider):
         {"name": "汪星人", "code": "305_13", "classify": "10"},
     ]
 
-    def parse_relative_time(self, relative_time: str) -> str:
+    @staticmethod
+    def parse_relative_time(relative_time: str) -> str:
         """
         将类似"xx秒前", "xx分钟前", "xx小时前", "昨天xx:xx", "前天xx:xx", "x天前" 的时间字符串
         转换为标准时间格式 "%Y-%m-%d %H:%M:%S"
@@ -141,78 +237,89 @@ class SouHu(BaseSpider):
 
     async def get_news_list(self, category: dict):
         """
-        获取搜狐新闻列表
+        获取搜狐新闻列表，翻页直到上次见过的最新文章
         """
         try:
-            productId, productType = category["code"].split("_")
-            json_data = {
-                "mainContent": {
-                    "productType": "13",
-                    "productId": "1524",
-                    "secureScore": "50",
-                    "categoryId": "47",
-                },
-                "resourceList": [
-                    {
-                        "tplCompKey": "TPLFeedMul_2_9_feedData",
-                        "isServerRender": False,
-                        "isSingleAd": False,
-                        "configSource": "mp",
-                        "content": {
-                            "productId": productId,
-                            "productType": productType,
-                            "size": 20,
-                            "pro": "0,1",
-                            "feedType": "XTOPIC_LATEST",  # 默认 XTOPIC_SYNTHETICAL  最新 XTOPIC_LATEST
-                            "view": "feedMode",
-                            "innerTag": "channel",
-                            "spm": "smpc.channel_114.block3_77_O0F7zf_1_fd",
-                            "page": 1,
-                            "requestId": "1732260842796Adk66ZV_1524",
-                        },
+            return await list_walker.walk(
+                self, category["name"], lambda page: self.get_news_page(category, page)
+            )
+        except Exception as e:
+            logger.error(f"获取搜狐新闻列表失败: {e}")
+            return []
+
+    async def get_news_page(self, category: dict, page: int):
+        """
+        获取搜狐新闻列表的一页，返回 (文章列表, 下一页页码)
+        """
+        productId, productType = category["code"].split("_")
+        json_data = {
+            "mainContent": {
+                "productType": "13",
+                "productId": "1524",
+                "secureScore": "50",
+                "categoryId": "47",
+            },
+            "resourceList": [
+                {
+                    "tplCompKey": "TPLFeedMul_2_9_feedData",
+                    "isServerRender": False,
+                    "isSingleAd": False,
+                    "configSource": "mp",
+                    "content": {
+                        "productId": productId,
+                        "productType": productType,
+                        "size": 20,
+                        "pro": "0,1",
+                        "feedType": "XTOPIC_LATEST",  # 默认 XTOPIC_SYNTHETICAL  最新 XTOPIC_LATEST
+                        "view": "feedMode",
+                        "innerTag": "channel",
+                        "spm": "smpc.channel_114.block3_77_O0F7zf_1_fd",
+                        "page": page,
+                        "requestId": "1732260842796Adk66ZV_1524",
                     },
-                ],
-            }
+                },
+            ],
+        }
 
-            response = await self.request(
-                method="POST",
-                url="https://odin.sohu.com/odin/api/blockdata",
-                json=json_data,
-            )
+        response = await self.request(
+            method="POST",
+            url="https://odin.sohu.com/odin/api/blockdata",
+            json=json_data,
+        )
 
-            response_data = json.loads(response)
-            data_list = response_data["data"]["TPLFeedMul_2_9_feedData"]["list"]
+        response_data = json.loads(response)
+        data_list = response_data["data"]["TPLFeedMul_2_9_feedData"]["list"]
 
-            result = []
-            for item in data_list:
-                if item["icon"] in ["images", "video"]:
-                    continue
+        result = []
+        for item in data_list:
+            if item["icon"] in ["images", "video"]:
+                continue
 
-                date_str = (
-                    item["extraInfoList"][1]["text"] if item["extraInfoList"] else ""
-                )
-                cover = item["cover"][0] if item["cover"] else ""
-
-                result.append(
-                    {
-                        "title": item["title"],
-                        "article_url": f"https://www.sohu.com{item['url']}",
-                        "cover_url": (
-                            f"https:{cover}"
-                            if cover and "https:" not in cover
-                            else cover
-                        ),
-                        "date_str": self.parse_relative_time(date_str),
-                        "category": category["name"],
-                    }
-                )
+            date_str = (
+                item["extraInfoList"][1]["text"] if item["extraInfoList"] else ""
+            )
+            cover = item["cover"][0] if item["cover"] else ""
+
+            result.append(
+                {
+                    "title": item["title"],
+                    "article_url": f"https://www.sohu.com{item['url']}",
+                    "cover_url": (
+                        f"https:{cover}"
+                        if cover and "https:" not in cover
+                        else cover
+                    ),
+                    "date_str": self.parse_relative_time(date_str),
+                    "category": category["name"],
+                }
+            )
 
-            result = sorted(result, key=lambda x: x["date_str"], reverse=True)
-            return result
+        result = sorted(result, key=lambda x: x["date_str"], reverse=True)
+        return result, page + 1 if data_list else None
 
-        except Exception as e:
-            logger.error(f"获取搜狐新闻列表失败: {e}")
-            return []
+    async def get_backfill_page(self, category: dict, cursor: int):
+        """回填：按页码往后翻更早的文章"""
+        return await self.get_news_page(category, cursor)
 
     async def get_news_info(self, news, category=None):
         """
@@ -222,108 +329,12 @@ class SouHu(BaseSpider):
             article_url = news["article_url"]
 
             content = await self.request(url=article_url)
-            content_html = etree.HTML(content)
-            try:
-                article_element = content_html.xpath('//article[@id="mp-editor"]')[0]
-            except:
-                return await self.get_qiche_info(news, category, content_html)
-
-            if not news["date_str"]:
-                date_str = content_html.xpath('//span[@id="news-time"]/text()')[
-                    0
-                ].strip()
-            else:
-                date_str = news["date_str"]
-
-            # 移除 id="backsohucom" 的整个元素
-            for backsohu_element in article_element.xpath('.//a[@id="backsohucom"]'):
-                backsohu_element.getparent().remove(backsohu_element)
-
-            # 提取文本列表，过滤掉"责任编辑"内容
-            text_list = [
-                p.xpath("string(.)").strip()
-                for p in article_element.xpath('.//p[not(contains(., "责任编辑"))]')
-                if p.xpath("string(.)").strip()
-            ]
-
-            match = re.search(r"imgsList:\s*(\[[^\]]+\])", content, re.DOTALL)
-            if match:
-                try:
-                    imgs_list_str = match.group(1)
-                    img_list = ast.literal_eval(imgs_list_str)
-                    img_list = [
-                        (
-                            f"https:{item['url']}"
-                            if "https:" not in item["url"]
-                            else item["url"]
-                        )
-                        for item in img_list
-                    ]
-                except Exception as e:
-                    img_list = []
-            else:
-                img_list = []
-
-            article_info = ""
-            for item in text_list:
-                article_info += item
-                article_info += "\n"
-
-            if not article_info:
-                return None
-            return {
-                "title": news["title"],
-                "article_url": article_url,
-                "cover_url": news["cover_url"],
-                "date_str": date_str,
-                "article_info": article_info,
-                "img_list": img_list,
-                "category": news["category"],
-            }
+            return await parse_executor.run(parse_souhu_detail, content, news)
 
         except Exception as e:
             logger.error(f"获取搜狐新闻详情失败: {e}，文章链接: {news['article_url']}")
             return None
 
-    async def get_qiche_info(self, news, category=None, content_html=None):
-        """
-        获取搜狐汽车的结构不同，需要写新类型
-        """
-        try:
-            base_xpath = '//*[@id="app"]/section[2]/section[2]/div[2]'
-
-            article_info = ""
-            p_elements = content_html.xpath(f"{base_xpath}//p")
-            for p in p_elements:
-                if p.text:
-                    article_info += p.text.strip()
-                    article_info += "\n"
-
-            # 提取所有<img>标签的src属性
-            img_elements = content_html.xpath(f"{base_xpath}//img")
-            img_list = [
-                "https:" + (img.get("data-src") or img.get("src"))
-                for img in img_elements
-                if img.get("src")
-            ]
-            date_str = content_html.xpath(
-                '//*[@id="app"]/section[2]/section[2]/div[1]/span[1]/text()'
-            )[0]
-        except Exception as e:
-            logger.error(
-                f"获取搜狐汽车新闻详情失败: {e}，文章链接: {news['article_url']}"
-            )
-            return None
-        return {
-            "title": news["title"],
-            "article_url": news["article_url"],
-            "cover_url": news["cover_url"],
-            "date_str": date_str,
-            "article_info": article_info,
-            "img_list": img_list,
-            "category": news["category"],
-        }
-
     # async def get_yuanchuang_info(self, news, category=None, content_html=None):
     #     """
     #     获取搜狐原创的结构不同，需要写新类型
@@ -368,8 +379,6 @@ class SouHu(BaseSpider):
         self,
         code=None,
         limit=None,
-        class_sleep_time=0,
-        info_sleep_time=0,
         addition_msg="",
     ) -> int:
         categories_to_crawl = self.category_list
@@ -379,17 +388,11 @@ class SouHu(BaseSpider):
             if not categories_to_crawl:
                 categories_to_crawl = self.category_list
         
-        for category in categories_to_crawl:
-            await super().crawl_and_save(
-                category,
-                limit,
-                class_sleep_time,
-                info_sleep_time,
-                f"类别：{category['name']}",
-            )
-            if class_sleep_time:
-                await asyncio.sleep(class_sleep_time)
-        return True
+        # 所有分类进入同一条流水线，前一个分类抓详情时后一个分类已在拉列表
+        return await self.crawl_units(
+            [(category, f"类别：{category['name']}") for category in categories_to_crawl],
+            limit,
+        )
 
 
 if __name__ == "__main__":
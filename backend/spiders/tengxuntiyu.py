@@ -6,6 +6,57 @@ import sys
 sys.path.insert(0, '.')
 from core.base import BaseSpider
 from core.logger_utils import logger
+from core.parse_executor import parse_executor
+
+
+def parse_tengxuntiyu_detail(response, new_data):
+    """
+    解析腾讯体育新闻详情接口（在解析执行器中运行）
+    """
+    article_id = new_data["article_url"]
+    cover_url = new_data["cover_url"]
+    title = new_data["title"]
+    date_str = new_data["date_str"]
+
+    content = json.loads(response)
+
+    try:
+        contents = content["data"]["topic"]["content"]
+    except:
+        if "msg" in content and content["msg"] == "参数不合法":
+            logger.skip("转发内容无法抓取")
+            return None
+        # 使用正则表达式提取 JSON 部分
+        match = re.search(r"\(({.*})\)", response)
+        json_string = match.group(1)
+        # 解析 JSON
+        json_data = json.loads(json_string)
+        # 输出解析后的 JSON 数据
+        contents = json_data["data"]["topic"]["content"]
+
+    text_list = []
+    img_list = []
+    for c in contents:
+        t = c["info"]
+        if "https://sports3.gtimg.com/community" in t:
+            try:
+                img_list.append(t["image"]["cur"]["url"])
+            except:
+                img_list.append(t)
+        else:
+            text_list.append(t)
+    article_info = "".join(f"{t}\n" for t in text_list)
+    if len(article_info) > 0 and "不得转载" not in article_info:
+        return {
+            "title": title,
+            "article_url": f"https://shequweb.sports.qq.com/reply/listCite?tid={article_id}&page=1",
+            "cover_url": cover_url,
+            "date_str": date_str,
+            "article_info": article_info,
+            "img_list": img_list,
+            "category": "体育",
+        }
+    return None
 
 
 class TenXun(BaseSpider):
@@ -71,9 +122,6 @@ class TenXun(BaseSpider):
         """
         try:
             article_id = new_data["article_url"]
-            cover_url = new_data["cover_url"]
-            title = new_data["title"]
-            date_str = new_data["date_str"]
 
             params = {
                 "tid": f"{article_id}",
@@ -83,46 +131,9 @@ class TenXun(BaseSpider):
             response = await self.request(
                 url="https://shequweb.sports.qq.com/reply/listCite", params=params
             )
-            content = json.loads(response)
-
-            try:
-                contents = content["data"]["topic"]["content"]
-            except:
-                if "msg" in content and content["msg"] == "参数不合法":
-                    logger.skip("转发内容无法抓取")
-                    return None
-                # 使用正则表达式提取 JSON 部分
-                match = re.search(r"\(({.*})\)", response)
-                json_string = match.group(1)
-                # 解析 JSON
-                json_data = json.loads(json_string)
-                # 输出解析后的 JSON 数据
-                contents = json_data["data"]["topic"]["content"]
-
-            article_info = ""
-            img_list = []
-            for c in contents:
-                t = c["info"]
-                if "https://sports3.gtimg.com/community" in t:
-                    try:
-                        img_list.append(t["image"]["cur"]["url"])
-                    except:
-                        img_list.append(t)
-                else:
-                    article_info += t
-                    article_info += "\n"
-            if len(article_info) > 0 and "不得转载" not in article_info:
-                return {
-                    "title": title,
-                    "article_url": f"https://shequweb.sports.qq.com/reply/listCite?tid={article_id}&page=1",
-                    "cover_url": cover_url,
-                    "date_str": date_str,
-                    "article_info": article_info,
-                    "img_list": img_list,
-                    "category": "体育",
-                }
-
-            return None
+            return await parse_executor.run(
+                parse_tengxuntiyu_detail, response, new_data
+            )
 
         except Exception as e:
             logger.error(f"获取腾讯体育新闻详情失败: {e}")
@@ -132,13 +143,9 @@ class TenXun(BaseSpider):
         self,
         code="https://matchweb.sports.qq.com/feeds/areaInfo",
         limit=None,
-        class_sleep_time=0,
-        info_sleep_time=0,
         addition_msg="",
     ) -> int:
-        return await super().crawl_and_save(
-            code, limit, class_sleep_time, info_sleep_time, addition_msg
-        )
+        return await super().crawl_and_save(code, limit, addition_msg)
 
 
 if __name__ == "__main__":
@@ -11,11 +11,36 @@ import sys
 sys.path.insert(0, '.')
 from core.base import BaseSpider
 from core.logger_utils import logger
+from core.parse_executor import parse_executor
+from core.selector_registry import selector_registry
+
+
+def parse_tengxunxinwen_detail(content, news_data, cover_url):
+    """
+    解析腾讯新闻详情页（在解析执行器中运行）
+    """
+    rules = selector_registry.load("tengxunxinwen")["detail"]
+    content_html = etree.HTML(content)
+    # 每个段落取第一张带 data-src 的图片
+    img_list = rules["img_list"].extract(content_html)
+    # todo 单个P里面含div，需要处理
+    article_info = rules["text"].extract(content_html)
+
+    return {
+        "title": news_data["title"],
+        "article_url": news_data["article_url"],
+        "cover_url": cover_url,
+        "date_str": news_data["date_str"],
+        "article_info": article_info,
+        "img_list": img_list,
+        "category": news_data["category"],
+    }
 
 
 class TenXuNews(BaseSpider):
     source_name = "腾讯新闻"
     category = "新闻"
+    list_host = "i.news.qq.com"
     category_list = [
         {"name": "经济", "code": "news_news_finance", "classify": "2"},
         {"name": "科技", "code": "news_news_tech", "classify": "4"},
@@ -84,7 +109,6 @@ class TenXuNews(BaseSpider):
         获取腾讯新闻详情
         """
         try:
-            title = news_data["title"]
             cover_url = news_data["cover_url"]
             if isinstance(cover_url, list):
                 cover_url = cover_url[0]
@@ -95,36 +119,9 @@ class TenXuNews(BaseSpider):
                 return None
 
             content = await self.request(url=article_url)
-            content_html = etree.HTML(content)
-
-            content_elements = content_html.xpath(
-                '//*[@id="article-content"]/div[2]/div/p'
+            return await parse_executor.run(
+                parse_tengxunxinwen_detail, content, news_data, cover_url
             )
-            img_list = []
-            article_info = ""
-            # todo 单个P里面含div，需要处理
-            for info in content_elements:
-                try:
-                    img = info.xpath(".//img/@data-src")
-                    if len(img) > 0:
-                        img_list.append(img[0])
-                except:
-                    pass
-
-                txt = info.xpath(".//text()")
-                for i in txt:
-                    article_info += i
-                    article_info += "\n"
-
-            return {
-                "title": title,
-                "article_url": article_url,
-                "cover_url": cover_url,
-                "date_str": date_str,
-                "article_info": article_info,
-                "img_list": img_list,
-                "category": news_data["category"],
-            }
 
         except Exception as e:
             logger.error(f"获取腾讯新闻详情失败: {e}")
@@ -134,8 +131,6 @@ class TenXuNews(BaseSpider):
         self,
         code=None,
         limit=None,
-        class_sleep_time=0,
-        info_sleep_time=0,
         addition_msg="",
     ) -> int:
         categories_to_crawl = self.category_list
@@ -145,17 +140,11 @@ class TenXuNews(BaseSpider):
             if not categories_to_crawl:
                 categories_to_crawl = self.category_list
         
-        for category in categories_to_crawl:
-            await super().crawl_and_save(
-                category,
-                limit,
-                class_sleep_time,
-                info_sleep_time,
-                f"类别：{category['name']}",
-            )
-            if class_sleep_time:
-                await asyncio.sleep(class_sleep_time)
-        return True
+        # 所有分类进入同一条流水线，前一个分类抓详情时后一个分类已在拉列表
+        return await self.crawl_units(
+            [(category, f"类别：{category['name']}") for category in categories_to_crawl],
+            limit,
+        )
 
 
 if __name__ == "__main__":
@@ -1,6 +1,7 @@
 
 
 import asyncio
+import aiohttp
 import re
 from datetime import datetime, timedelta
 import json
@@ -8,7 +9,44 @@ from lxml import etree
 import sys
 sys.path.insert(0, '.')
 from core.base import BaseSpider
+from core.list_walker import list_walker
 from core.logger_utils import logger
+from core.parse_executor import parse_executor
+from core.selector_registry import selector_registry
+from core.validator_cache import NotModified
+
+# 列表地址中插入页码的位置：.js 或目录末尾的 / 之前
+PAGE_SUFFIX_RE = re.compile(r"(\.js)?(/?\?)")
+
+
+def parse_wangyi_detail(content, item):
+    """
+    解析网易新闻详情页（在解析执行器中运行）
+    """
+    rules = selector_registry.load("wangyi")["detail"]
+    content_html = etree.HTML(content)
+
+    title = item.get("title", "") or rules["title"].extract(content_html)
+    cover_url = item.get("cover_url", "") or rules["cover_url"].extract(content_html)
+
+    date_str = rules["date_str"].extract(content_html)
+    if not date_str:
+        raise ValueError("未找到发布时间")
+    img_list = rules["img_list"].extract(content_html)
+    article_info = rules["text"].extract(content_html)
+    if len(article_info) > 0 and "不得转载" not in article_info:
+        return {
+            "title": title,
+            "article_url": item["article_url"],
+            "cover_url": cover_url,
+            "date_str": datetime.strptime(date_str, "%Y-%m-%d %H:%M:%S").strftime(
+                "%Y-%m-%d %H:%M:%S"
+            ),
+            "article_info": article_info,
+            "img_list": img_list,
+            "category": item["category"],
+        }
+    return None
 
 
 class WangYi(BaseSpider):
@@ -59,122 +97,78 @@ class WangYi(BaseSpider):
 
     async def get_news_list(self, category: dict):
         """
-        获取网易新闻列表
+        获取网易新闻列表，翻页直到上次见过的最新文章
         """
         try:
-            url = category["code"]
-            params = {
-                "callback": "data_callback",
-            }
-
-            text = await self.request(url=url, params=params)
-            res = text.replace("data_callback(", "")[0:-1]
-            data_str = json.loads(res.rstrip(",\n ]").strip() + "]")
-
-            result = []
-            for item in data_str[:20]:
-                if "video" not in item["docurl"]:
-                    result.append(
-                        {
-                            "title": item["title"],
-                            "article_url": item["docurl"],
-                            "cover_url": item["imgurl"],
-                            "date_str": datetime.strptime(
-                                item["time"], "%m/%d/%Y %H:%M:%S"
-                            ).strftime("%Y-%m-%d %H:%M:%S"),
-                            "category": category["name"],
-                        }
-                    )
-
-            result = sorted(result, key=lambda x: x["date_str"], reverse=True)
-            return result
-
+            # 第一页发条件请求，列表文件未变化时不再翻页
+            return await list_walker.walk(
+                self,
+                category["name"],
+                lambda page: self.get_news_page(category, page, conditional=page == 1),
+            )
+        except NotModified:
+            raise
         except Exception as e:
             logger.error(f"获取网易新闻列表失败: {e}")
             return []
 
+    async def get_news_page(self, category: dict, page: int, conditional=False):
+        """
+        获取网易新闻列表的一页，返回 (文章列表, 下一页页码)；
+        第 n 页的地址在列表名后加 _0n，如 cm_guonei_02/、tech_datalist_02.js
+        """
+        url = category["code"]
+        if page > 1:
+            url = PAGE_SUFFIX_RE.sub(
+                lambda m: f"_{page:02d}{m.group(1) or ''}{m.group(2)}", url, count=1
+            )
+        params = {
+            "callback": "data_callback",
+        }
+
+        try:
+            text = await self.request(url=url, params=params, conditional=conditional)
+        except aiohttp.ClientResponseError as e:
+            # 最后一页之后的地址不存在
+            if page > 1 and e.status == 404:
+                return [], None
+            raise
+        res = text.replace("data_callback(", "")[0:-1]
+        data_str = json.loads(res.rstrip(",\n ]").strip() + "]")
+
+        result = []
+        for item in data_str:
+            if "video" not in item["docurl"]:
+                result.append(
+                    {
+                        "title": item["title"],
+                        "article_url": item["docurl"],
+                        "cover_url": item["imgurl"],
+                        "date_str": datetime.strptime(
+                            item["time"], "%m/%d/%Y %H:%M:%S"
+                        ).strftime("%Y-%m-%d %H:%M:%S"),
+                        "category": category["name"],
+                    }
+                )
+
+        result = sorted(result, key=lambda x: x["date_str"], reverse=True)
+        return result, page + 1 if data_str else None
+
+    async def get_backfill_page(self, category: dict, cursor: int):
+        """回填：按分页地址往后翻更早的文章"""
+        return await self.get_news_page(category, cursor)
+
     async def get_news_info(self, item, category=None):
         """
         获取网易新闻详情
         """
         try:
-            title = item.get("title", "")
             article_url = item["article_url"]
-            cover_url = item.get("cover_url", "")
 
             if "video" not in article_url:
 
                 content = await self.request(url=article_url)
-                content_html = etree.HTML(content)
-
-                if not title:
-                    try:
-                        title = content_html.xpath('//*[@id="contain"]/div[1]/h1/text()')[0].strip()
-                    except:
-                        try:
-                            title = content_html.xpath('//*[@id="container"]/div[1]/h1/text()')[0].strip()
-                        except:
-                            try:
-                                title = content_html.xpath('//h1/text()')[0].strip()
-                            except:
-                                title = "无法获取标题"
-
-                if not cover_url:
-                    try:
-                        cover_url = content_html.xpath('//*[@id="content"]/div[1]//img/@src')[0]
-                    except:
-                        try:
-                            cover_url = content_html.xpath('//meta[@property="og:image"]/@content')[0]
-                        except:
-                            cover_url = ""
-
-                try:
-                    date_str = (
-                        content_html.xpath('//*[@id="contain"]/div[2]/div[2]/text()')[0]
-                        .strip()
-                        .replace("　来源:", "")
-                    )
-                except:
-                    try:
-                        date_str = (
-                            content_html.xpath(
-                                '//*[@id="container"]/div[1]/div[2]/text()[1]'
-                            )[0]
-                            .strip()
-                            .replace("　来源:", "")
-                        )
-                    except:
-                        date_str = (
-                            content_html.xpath(
-                                '//*[@id="contain"]/div[1]/div[2]/text()'
-                            )[0]
-                            .strip()
-                            .replace("　来源:", "")
-                        )
-                date_str = re.search(
-                    r"\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}", date_str
-                ).group()
-                date_str = datetime.strptime(date_str, "%Y-%m-%d %H:%M:%S")
-                img_list = content_html.xpath('//*[@id="content"]/div[2]/p/img/@src')
-                txt = content_html.xpath('//*[@id="content"]/div[2]/p')
-
-                article_info = ""
-                for item_ in txt:
-                    t = item_.xpath(".//text()")
-                    for i in t:
-                        article_info += i
-                        article_info += "\n"
-                if len(article_info) > 0 and "不得转载" not in article_info:
-                    data = {
-                        "title": title,
-                        "article_url": article_url,
-                        "cover_url": cover_url,
-                        "date_str": datetime.strftime(date_str, "%Y-%m-%d %H:%M:%S"),
-                        "article_info": article_info,
-                        "img_list": img_list,
-                        "category": item["category"],
-                    }
-                    return data
+                return await parse_executor.run(parse_wangyi_detail, content, item)
 
             return None
 
@@ -186,8 +180,6 @@ class WangYi(BaseSpider):
         self,
         code=None,
         limit=None,
-        class_sleep_time=0,
-        info_sleep_time=0,
         addition_msg="",
     ) -> int:
         categories_to_crawl = self.category_list
@@ -198,17 +190,11 @@ class WangYi(BaseSpider):
             if not categories_to_crawl:
                 categories_to_crawl = self.category_list
         
-        for category in categories_to_crawl:
-            await super().crawl_and_save(
-                category,
-                limit,
-                class_sleep_time,
-                info_sleep_time,
-                f"类别：{category['name']}",
-            )
-            if class_sleep_time:
-                await asyncio.sleep(class_sleep_time)
-        return True
+        # 所有分类进入同一条流水线，前一个分类抓详情时后一个分类已在拉列表
+        return await self.crawl_units(
+            [(category, f"类别：{category['name']}") for category in categories_to_crawl],
+            limit,
+        )
 
 
 if __name__ == "__main__":
@@ -5,16 +5,57 @@ import sys
 sys.path.insert(0, '.')
 from core.base import BaseSpider
 from core.logger_utils import logger
+from core.parse_executor import parse_executor
+from core.selector_registry import selector_registry
+
+
+def parse_xinlang_list(content):
+    """
+    解析新浪国际新闻列表页（在解析执行器中运行）
+    """
+    rules = selector_registry.load("xinlang")["list"]
+    content_html = etree.HTML(content)
+
+    # 初始化结果列表
+    result = []
+    for item in rules["items"].extract(content_html):
+        # 提取标题、链接和时间
+        title = rules["title"].extract(item)
+        link = rules["link"].extract(item)
+        time = rules["time"].extract(item)
+
+        # 只添加有实际内容的条目
+        if title and link and time:
+            # 将数据添加到列表中
+            result.append(
+                {
+                    "title": title,
+                    "article_url": link,
+                    "date_str": XinLangGuoJi.convert_time_str(time),
+                }
+            )
+
+    return result
 
 
-xinlang_failed_urls = set()  # 用于存储失败的URL，避免重复请求
+def parse_xinlang_detail(content):
+    """
+    解析新浪国际新闻详情页（在解析执行器中运行），返回正文和图片列表
+    """
+    rules = selector_registry.load("xinlang")["detail"]
+    content_html = etree.HTML(content)
+    content_div = rules["content"].extract(content_html)
+    if content_div is None:
+        raise ValueError("未找到正文节点")
+    return rules["text"].extract(content_div), rules["img_list"].extract(content_div)
 
 
 class XinLangGuoJi(BaseSpider):
     source_name = "新浪国际"
     category = "国际新闻"
 
-    def convert_time_str(self, time_str, default_year=None):
+    @staticmethod
+    def convert_time_str(time_str, default_year=None):
         """
         将类似 "12月20日 23:59" 的时间字符串转换为 "%Y-%m-%d %H:%M:%S" 格式。
         """
@@ -59,42 +100,7 @@ class XinLangGuoJi(BaseSpider):
         """
         try:
             content = await self.request(url=code)
-            content_html = etree.HTML(content)
-
-            # 初始化结果列表
-            result = []
-            news_items = content_html.xpath('//div[contains(@class, "news-item")]')
-
-            for item in news_items:
-                # 提取标题和链接
-                title_elements = item.xpath(".//h2/a")
-                if title_elements:
-                    title = title_elements[0].text.strip()
-                    link = title_elements[0].get("href").strip()
-                else:
-                    # 如果没有标题或链接，跳过该条目
-                    continue
-
-                # 提取时间
-                time_elements = item.xpath('.//div[contains(@class, "time")]/text()')
-                if time_elements:
-                    time = time_elements[0].strip()
-                else:
-                    # 如果没有时间，跳过该条目
-                    continue
-
-                # 只添加有实际内容的条目
-                if title and link and time:
-                    # 将数据添加到列表中
-                    result.append(
-                        {
-                            "title": title,
-                            "article_url": link,
-                            "date_str": self.convert_time_str(time),
-                        }
-                    )
-
-            return result
+            return await parse_executor.run(parse_xinlang_list, content)
 
         except Exception as e:
             logger.error(f"获取新浪国际新闻列表失败: {e}")
@@ -104,34 +110,18 @@ class XinLangGuoJi(BaseSpider):
         """
         获取新浪国际新闻详情
         """
-        if news["article_url"] in xinlang_failed_urls:
-            logger.warning(f"跳过已失败的url: {news['article_url']}")
-            return None
         try:
             article_url = news["article_url"]
 
             content = await self.request(url=article_url)
-            content_html = etree.HTML(content)
-
-            content_div = content_html.xpath('//*[@id="article"]')[0]
-
-            # 提取 p 标签的文本列表
-            text_list = content_div.xpath('.//p[not(@class="show_author")]/text()')
-
-            # 提取 img 标签的 src 列表
-            img_list = content_div.xpath('.//div[@class="img_wrapper"]//img/@src')
-            img_list = ["https:" + i for i in img_list]
-
-            article_info = ""
-            for item in text_list:
-                article_info += item
-                article_info += "\n"
+            article_info, img_list = await parse_executor.run(
+                parse_xinlang_detail, content
+            )
 
             if not article_info:
                 logger.error(
                     f"获取新浪国际新闻详情失败: 文章内容为空, 文章链接: {news['article_url']}"
                 )
-                xinlang_failed_urls.add(article_url)
                 return None
             if len(article_info) < 50:
                 return None
@@ -147,7 +137,6 @@ class XinLangGuoJi(BaseSpider):
             }
 
         except Exception as e:
-            xinlang_failed_urls.add(news["article_url"])
             logger.error(
                 f"获取新浪国际新闻详情失败: {e}, 文章链接: {news['article_url']}"
             )
@@ -157,13 +146,9 @@ class XinLangGuoJi(BaseSpider):
         self,
         code="https://news.sina.com.cn/world/",
         limit=None,
-        class_sleep_time=0,
-        info_sleep_time=0,
         addition_msg="",
     ) -> int:
-        return await super().crawl_and_save(
-            code, limit, class_sleep_time, info_sleep_time, addition_msg
-        )
+        return await super().crawl_and_save(code, limit, addition_msg)
 
 
 if __name__ == "__main__":
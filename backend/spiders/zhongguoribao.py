@@ -1,12 +1,84 @@
 import asyncio
+import aiohttp
 from datetime import datetime
 from lxml import etree
 import sys
 sys.path.insert(0, '.')
 from core.base import BaseSpider
 from core.logger_utils import logger
+from core.parse_executor import parse_executor
+from core.selector_registry import selector_registry
+from core.validator_cache import NotModified
+
+
+def parse_zhongguoribao_list(content, category):
+    """
+    解析中国日报新闻列表页（在解析执行器中运行）
+    """
+    rules = selector_registry.load("zhongguoribao")["list"]
+    content_html = etree.HTML(content)
+
+    # 初始化结果列表
+    result = []
+    for element in rules["items"].extract(content_html):
+        title = rules["title"].extract(element)
+        article_url = rules["article_url"].extract(element)
+        cover_url = rules["cover_url"].extract(element)
+        date_str = rules["date_str"].extract(element)
+
+        # 创建字典并添加到结果列表
+        if title and article_url and date_str:
+            result.append(
+                {
+                    "title": title,
+                    "article_url": article_url,
+                    "cover_url": cover_url,
+                    "date_str": datetime.strptime(
+                        date_str, "%Y-%m-%d %H:%M"
+                    ).strftime("%Y-%m-%d %H:%M:%S"),
+                    "category": category["name"],
+                }
+            )
+
+    result = sorted(result, key=lambda x: x["date_str"], reverse=True)
+    return result
+
+
+def parse_zhongguoribao_detail(content, news):
+    """
+    解析中国日报新闻详情页（在解析执行器中运行）
+    """
+    rules = selector_registry.load("zhongguoribao")["detail"]
+    article_url = news["article_url"]
+    content_html = etree.HTML(content)
+    content_div = rules["content"].extract(content_html)
+    if content_div is None:
+        raise ValueError("未找到正文节点")
+
+    img_list = rules["img_list"].extract(content_div)
+    article_info = rules["text"].extract(content_div)
+    if not article_info:
+        return None
+    if len(article_info) < 50:
+        return None
+
+    try:
+        date_str = datetime.strptime(
+            news["date_str"], "%Y-%m-%d %H:%M"
+        ).strftime("%Y-%m-%d %H:%M:%S")
+    except:
+        date_str = news["date_str"]
+
+    return {
+        "title": news["title"],
+        "article_url": article_url,
+        "cover_url": news["cover_url"],
+        "date_str": date_str,
+        "article_info": article_info,
+        "img_list": img_list,
+        "category": news["category"],
+    }
 
-chinese_day_failed_urls = set()
 
 class ChineseDayNews(BaseSpider):
     source_name = "中国日报"
@@ -126,102 +198,43 @@ class ChineseDayNews(BaseSpider):
         try:
             url = category["code"]
 
-            content = await self.request(url=url)
-            content_html = etree.HTML(content)
-
-            # 初始化结果列表
-            result = []
-            div_elements = content_html.xpath(
-                "//html/body/div[3]/div[1]/div/div[.//h3 and .//p/b]"
+            content = await self.request(url=url, conditional=True)
+            return await parse_executor.run(
+                parse_zhongguoribao_list, content, category
             )
 
-            # 遍历每个元素，提取数据
-            for element in div_elements:
-                # 提取标题文字
-                title = element.xpath(".//h3/a/text()")
-                title = title[0].strip() if title else None
-
-                # 提取文章 URL
-                article_url = element.xpath(".//h3/a/@href")
-                article_url = "https:" + article_url[0].strip() if article_url else None
-
-                # 提取封面图片 URL
-                cover_url = element.xpath('.//div[contains(@class, "mr10")]/a/img/@src')
-                cover_url = "https:" + cover_url[0].strip() if cover_url else None
-
-                # 提取时间字符串
-                date_str = element.xpath(".//p/b/text()")
-                date_str = date_str[0].strip() if date_str else None
-
-                # 创建字典并添加到结果列表
-                if title and article_url and date_str:
-                    result.append(
-                        {
-                            "title": title,
-                            "article_url": article_url,
-                            "cover_url": cover_url,
-                            "date_str": datetime.strptime(
-                                date_str, "%Y-%m-%d %H:%M"
-                            ).strftime("%Y-%m-%d %H:%M:%S"),
-                            "category": category["name"],
-                        }
-                    )
-
-            result = sorted(result, key=lambda x: x["date_str"], reverse=True)
-            return result
-
+        except NotModified:
+            raise
         except Exception as e:
             logger.error(f"获取中国日报新闻列表失败: {e}, 文章：{category['code']}")
             return []
 
+    async def get_backfill_page(self, category: dict, cursor: int):
+        """回填：第 n 页的地址为 分类地址/page_n.html"""
+        url = category["code"] if cursor == 1 else f"{category['code'].rstrip('/')}/page_{cursor}.html"
+        try:
+            content = await self.request(url=url)
+        except aiohttp.ClientResponseError as e:
+            # 超过最后一页
+            if e.status == 404:
+                return [], None
+            raise
+        result = await parse_executor.run(parse_zhongguoribao_list, content, category)
+        return result, cursor + 1 if result else None
+
     async def get_news_info(self, news, category=None):
         """
         获取中国日报新闻详情
         """
         article_url = news["article_url"]
-        if article_url in chinese_day_failed_urls:
-            logger.warning(f"跳过已失败的url: {article_url}")
-            return None
         try:
 
             content = await self.request(url=article_url)
-            content_html = etree.HTML(content)
-
-            content_div = content_html.xpath('//div[@id="Content"]')[0]
-
-            # 提取 p 标签的文本列表
-            text_list = content_div.xpath(".//p/text()")
-            # 提取 img 标签的 src 列表
-            img_list = content_div.xpath(".//img/@src")
-            img_list = ["https:" + i for i in img_list]
-            article_info = ""
-            for item in text_list:
-                article_info += item
-                article_info += "\n"
-            if not article_info:
-                return None
-            if len(article_info) < 50:
-                return None
-
-            try:
-                date_str = datetime.strptime(
-                    news["date_str"], "%Y-%m-%d %H:%M"
-                ).strftime("%Y-%m-%d %H:%M:%S")
-            except:
-                date_str = news["date_str"]
-
-            return {
-                "title": news["title"],
-                "article_url": article_url,
-                "cover_url": news["cover_url"],
-                "date_str": date_str,
-                "article_info": article_info,
-                "img_list": img_list,
-                "category": news["category"],
-            }
+            return await parse_executor.run(
+                parse_zhongguoribao_detail, content, news
+            )
 
         except Exception as e:
-            chinese_day_failed_urls.add(article_url)
             logger.error(f"获取中国日报新闻详情失败: {e}，文章：{article_url}")
             return None
 
@@ -229,8 +242,6 @@ class ChineseDayNews(BaseSpider):
         self,
         code=None,
         limit=None,
-        class_sleep_time=0,
-        info_sleep_time=0,
         addition_msg="",
     ) -> int:
         categories_to_crawl = self.category_list
@@ -240,17 +251,11 @@ class ChineseDayNews(BaseSpider):
             if not categories_to_crawl:
                 categories_to_crawl = self.category_list
         
-        for category in categories_to_crawl:
-            await super().crawl_and_save(
-                category,
-                limit,
-                class_sleep_time,
-                info_sleep_time,
-                f"类别：{category['name']}",
-            )
-            if class_sleep_time:
-                await asyncio.sleep(class_sleep_time)
-        return True
+        # 所有分类进入同一条流水线，前一个分类抓详情时后一个分类已在拉列表
+        return await self.crawl_units(
+            [(category, f"类别：{category['name']}") for category in categories_to_crawl],
+            limit,
+        )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,92 @@
+import asyncio
+
+import pytest
+
+from core import article_writer as writer_module
+from core.article_writer import ARTICLE_COLUMNS, DUPLICATE_ENTRY, ArticleWriter
+
+URL = ARTICLE_COLUMNS.index("article_url")
+
+
+class FakeDatabase:
+    """按 article_url 唯一的内存表，重复的行与 MySQL 一样让整条语句失败"""
+
+    def __init__(self, existing=()):
+        self.urls = set(existing)
+        self.statements = 0
+
+    def _insert(self, rows):
+        urls = [row[URL] for row in rows]
+        if any(url in self.urls for url in urls) or len(set(urls)) < len(urls):
+            raise Exception(DUPLICATE_ENTRY, "Duplicate entry")
+        self.urls.update(urls)
+        return len(rows)
+
+    async def execute(self, sql, params):
+        self.statements += 1
+        width = len(ARTICLE_COLUMNS)
+        return self._insert([params[i:i + width] for i in range(0, len(params), width)])
+
+    @property
+    def pool(self):
+        return self
+
+    def acquire(self):
+        return FakeContext(FakeCursor(self))
+
+
+class FakeCursor:
+    def __init__(self, database):
+        self.database = database
+
+    def cursor(self):
+        return FakeContext(self)
+
+    async def execute(self, sql, row):
+        self.database.statements += 1
+        return self.database._insert([row])
+
+
+class FakeContext:
+    def __init__(self, value):
+        self.value = value
+
+    async def __aenter__(self):
+        return self.value
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+@pytest.fixture
+def database(monkeypatch):
+    fake = FakeDatabase(existing={"https://example.com/old"})
+    monkeypatch.setattr(writer_module, "db_manager", fake)
+    return fake
+
+
+def row(url):
+    values = [None] * len(ARTICLE_COLUMNS)
+    values[URL] = url
+    return tuple(values)
+
+
+def write(urls):
+    async def scenario():
+        writer = ArticleWriter(batch_size=len(urls), flush_interval=10)
+        results = await asyncio.gather(*(writer.submit(row(url)) for url in urls))
+        await writer.close()
+        return results
+
+    return asyncio.run(scenario())
+
+
+def test_new_rows_written_in_one_statement(database):
+    assert write(["https://example.com/a", "https://example.com/b"]) == [True, True]
+    assert database.statements == 1
+
+
+def test_duplicate_falls_back_to_per_row_outcomes(database):
+    urls = ["https://example.com/a", "https://example.com/old", "https://example.com/b"]
+    assert write(urls) == [True, False, True]
+    assert database.statements == 1 + len(urls)
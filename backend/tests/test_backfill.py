@@ -0,0 +1,75 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from core.backfill import BackfillRunner
+
+
+class PagedSpider:
+    """第 n 页的文章发布于 2026-01-(11-n)，fail_pages 中的页第一次请求失败"""
+
+    source_name = "测试"
+    category = "新闻"
+
+    def __init__(self, fail_pages=()):
+        self.fail_pages = set(fail_pages)
+        self.requested = []
+        self.saved = []
+
+    def backfill_start_cursor(self, category):
+        return 1
+
+    async def get_backfill_page(self, category, cursor):
+        self.requested.append(cursor)
+        if cursor in self.fail_pages:
+            self.fail_pages.discard(cursor)
+            raise RuntimeError("列表请求失败")
+        items = [
+            {"article_url": f"p{cursor}-{i}", "date_str": f"2026-01-{11 - cursor:02d} 0{i}:00:00"}
+            for i in range(2)
+        ]
+        return items, cursor + 1 if cursor < 9 else None
+
+    async def filter_existing(self, items):
+        return items
+
+    async def fetch_news_info(self, item):
+        return item
+
+    async def save_article(self, news_info):
+        self.saved.append(news_info["article_url"])
+        return True
+
+
+@pytest.fixture
+def runner(monkeypatch):
+    monkeypatch.setenv("BACKFILL_PAGE_DELAY", "0")
+    return BackfillRunner()
+
+
+def test_stops_at_target_date_and_keeps_cursor(runner):
+    spider = PagedSpider()
+    saved = asyncio.run(runner.run(spider, datetime(2026, 1, 8)))
+    progress = runner.progress[("测试", "新闻")]
+    assert spider.requested == [1, 2, 3, 4]
+    # 第 4 页（1 月 7 日）跨过了目标日期，不保存，留作更早回填的游标
+    assert saved == 6
+    assert progress.status == "done"
+    assert progress.cursor == 4
+
+
+def test_resumes_from_failed_page(runner):
+    spider = PagedSpider(fail_pages={3})
+    asyncio.run(runner.run(spider, datetime(2026, 1, 8)))
+    assert runner.progress[("测试", "新闻")].status == "failed"
+    asyncio.run(runner.run(spider, datetime(2026, 1, 8)))
+    assert spider.requested == [1, 2, 3, 3, 4]
+    assert len(spider.saved) == 6
+
+
+def test_earlier_target_continues_from_reached_page(runner):
+    spider = PagedSpider()
+    asyncio.run(runner.run(spider, datetime(2026, 1, 8)))
+    asyncio.run(runner.run(spider, datetime(2026, 1, 6)))
+    assert spider.requested == [1, 2, 3, 4, 4, 5, 6]
@@ -0,0 +1,23 @@
+from core.charset import CharsetDecoder
+
+
+def test_meta_charset_used_when_header_missing():
+    decoder = CharsetDecoder()
+    content = '<meta charset="gbk"><p>新闻</p>'.encode("gbk")
+    assert "新闻" in decoder.decode(content)
+
+
+def test_declared_charset_wins_and_host_remembers_encoding():
+    decoder = CharsetDecoder()
+    assert decoder.decode("新闻".encode("gb18030"), "gb2312", "example.com") == "新闻"
+    assert decoder.host_encodings["example.com"] == "gb18030"
+    # 没有声明编码、UTF-8 解码失败时使用该主机上次的编码
+    assert decoder.decode("财经".encode("gb18030"), None, "example.com") == "财经"
+
+
+def test_settings_read_on_first_use(monkeypatch):
+    decoder = CharsetDecoder()
+    monkeypatch.setenv("CHARSET_SNIFF_BYTES", "8")
+    content = b"<html>  " + b'<meta charset="gbk">'
+    assert decoder.sniff_meta(content) is None
+    assert decoder.sniff_bytes == 8
@@ -0,0 +1,65 @@
+import asyncio
+
+import pytest
+
+from core.concurrency import AIMDLimiter
+
+
+def limiter(**overrides):
+    options = dict(name="example.com", initial_limit=8, min_limit=1, max_limit=10,
+                   latency_target=1.0, cooldown=60)
+    options.update(overrides)
+    return AIMDLimiter(**options)
+
+
+def test_overload_halves_limit_once_per_cooldown():
+    async def scenario():
+        aimd = limiter()
+        for _ in range(3):
+            await aimd.acquire()
+        for _ in range(3):
+            await aimd.release("overload", 0.1)
+        return aimd.current_limit
+
+    assert asyncio.run(scenario()) == 4
+
+
+def test_fast_success_increases_slow_success_does_not():
+    async def scenario():
+        aimd = limiter(initial_limit=2)
+        for _ in range(2):
+            await aimd.acquire()
+            await aimd.release("success", 0.1)
+        fast = aimd.limit
+        await aimd.acquire()
+        await aimd.release("success", 5.0)
+        return fast, aimd.limit
+
+    fast, after_slow = asyncio.run(scenario())
+    assert fast > 2.5
+    assert after_slow == fast
+
+
+def test_timeout_inside_slot_counts_as_overload():
+    async def scenario():
+        aimd = limiter()
+        with pytest.raises(asyncio.TimeoutError):
+            async with aimd.slot():
+                raise asyncio.TimeoutError
+        return aimd.current_limit, aimd.in_flight
+
+    assert asyncio.run(scenario()) == (4, 0)
+
+
+def test_acquire_waits_at_limit():
+    async def scenario():
+        aimd = limiter(initial_limit=1)
+        await aimd.acquire()
+        waiter = asyncio.create_task(aimd.acquire())
+        await asyncio.sleep(0.01)
+        blocked = not waiter.done()
+        await aimd.release("error", 0.1)
+        await asyncio.wait_for(waiter, 1)
+        return blocked
+
+    assert asyncio.run(scenario())
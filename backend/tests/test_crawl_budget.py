@@ -0,0 +1,50 @@
+import asyncio
+
+from core.crawl_budget import CrawlBudget
+
+
+async def blocked(coro):
+    task = asyncio.create_task(coro)
+    await asyncio.sleep(0.01)
+    done = task.done()
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    return not done
+
+
+def test_per_source_limit():
+    async def scenario():
+        budget = CrawlBudget(global_limit=10, per_source=2, per_host=10, reserved=0)
+        for i in range(2):
+            await budget.acquire("网易", f"h{i}")
+        waits = await blocked(budget.acquire("网易", "h3"))
+        # 其他来源不受影响
+        await asyncio.wait_for(budget.acquire("搜狐", "h4"), 1)
+        return waits, budget.active("网易")
+
+    assert asyncio.run(scenario()) == (True, 2)
+
+
+def test_reserved_slots_only_for_priority_units():
+    async def scenario():
+        budget = CrawlBudget(global_limit=3, per_source=10, per_host=10, reserved=1)
+        for _ in range(2):
+            await budget.acquire("网易", "h")
+        bulk_waits = await blocked(budget.acquire("网易", "h"))
+        await asyncio.wait_for(budget.acquire("网易", "h", priority=True), 1)
+        return bulk_waits, budget.snapshot()["global"]["active"]
+
+    bulk_waits, active = asyncio.run(scenario())
+    assert bulk_waits
+    assert active == 3
+
+
+def test_release_is_idempotent():
+    async def scenario():
+        budget = CrawlBudget(global_limit=2, per_source=1, per_host=1, reserved=0)
+        lease = await budget.acquire("网易", "h")
+        lease.release()
+        lease.release()
+        return budget.active("网易"), budget.snapshot()["global"]["active"]
+
+    assert asyncio.run(scenario()) == (0, 0)
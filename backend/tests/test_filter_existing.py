@@ -0,0 +1,42 @@
+import asyncio
+
+import pytest
+
+from core import base
+from core.base import BaseSpider
+from core.seen_filter import SeenFilter
+
+
+@pytest.fixture
+def queries(monkeypatch):
+    issued = []
+    stored = [{"title": "旧闻", "article_url": "https://example.com/old"}]
+
+    async def fetchall(sql, params=None):
+        issued.append((sql, params))
+        return [row for row in stored if row["article_url"] in params or row["title"] in params]
+
+    monkeypatch.setattr(base.db_manager, "fetchall", fetchall)
+    monkeypatch.setattr(base, "seen_filter", SeenFilter())
+    return issued
+
+
+def news(url, title):
+    return {"article_url": url, "title": title}
+
+
+def test_whole_list_checked_with_one_query(queries):
+    items = [
+        news("https://example.com/old", "旧闻"),
+        news("https://example.com/new", "新闻"),
+        news("https://example.com/other", "旧闻"),
+    ]
+    result = asyncio.run(BaseSpider().filter_existing(items))
+    assert [item["article_url"] for item in result] == ["https://example.com/new"]
+    assert len(queries) == 1
+    assert " UNION " in queries[0][0]
+
+
+def test_empty_list_skips_query(queries):
+    assert asyncio.run(BaseSpider().filter_existing([])) == []
+    assert queries == []
@@ -0,0 +1,58 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from core import freshness
+from core.freshness import FreshnessTracker, percentile, summarize
+
+NOW = datetime(2026, 1, 1, 12)
+
+
+@pytest.fixture
+def tracker(monkeypatch):
+    monkeypatch.setenv("FRESHNESS_TARGETS", '{"国际": {"p95": 300}, "澎湃/时事": {"p50": 60}}')
+    monkeypatch.setenv("FRESHNESS_MAX_LAG", "3600")
+    return FreshnessTracker()
+
+
+def test_percentile_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 95) == 95
+    assert summarize([]) == {"count": 0}
+
+
+def test_old_articles_not_sampled(tracker):
+    tracker.record("澎湃", "国际", NOW - timedelta(seconds=100), NOW)
+    tracker.record("澎湃", "国际", NOW - timedelta(days=3), NOW)
+    assert tracker.snapshot()["overall"]["count"] == 1
+
+
+def test_interval_cap_halves_when_target_missed(tracker):
+    assert tracker.interval_cap("澎湃", "体育") is None
+    assert tracker.interval_cap("澎湃", "国际") == 300
+    for lag in (100, 200, 900):
+        tracker.record("澎湃", "国际", NOW - timedelta(seconds=lag), NOW)
+    assert tracker.interval_cap("澎湃", "国际") == 150
+    # “来源/分类”的目标优先
+    assert tracker.target_for("澎湃", "时事") == (50, 60.0)
+
+
+def test_refresh_rebuilds_samples_from_database(monkeypatch, tracker):
+    rows = [
+        {"source": "澎湃", "category": "国际", "date_str": NOW - timedelta(seconds=lag),
+         "created_at": NOW}
+        for lag in (900, 100, 200)
+    ]
+    rows.append({"source": "澎湃", "category": "国际", "date_str": None, "created_at": NOW})
+
+    async def fetchall(sql, params=None):
+        return rows
+
+    monkeypatch.setattr(freshness.db_manager, "pool", object())
+    monkeypatch.setattr(freshness.db_manager, "fetchall", fetchall)
+    asyncio.run(tracker.refresh())
+    snapshot = tracker.snapshot()["byCategory"]["澎湃/国际"]
+    assert snapshot["count"] == 3
+    assert snapshot["targetMet"] is False
@@ -0,0 +1,89 @@
+import asyncio
+
+from core.frontier import MemoryFrontier, WorkItem, item_key
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def make_items(*urls):
+    return [WorkItem(item_key("detail", "测试", url), "detail", "测试", {"url": url}) for url in urls]
+
+
+def test_claim_is_exclusive_until_lease_expires():
+    frontier = MemoryFrontier()
+    items = make_items("a", "b")
+    assert run(frontier.claim(items, "node-1", 300, 5)) == [item.key for item in items]
+    # 另一个节点拿不到未过期的租约
+    assert run(frontier.claim(items, "node-2", 300, 5)) == []
+    assert run(frontier.lease_expired("detail", "测试", "node-2", 10, 300, 5)) == []
+
+
+def test_expired_lease_is_taken_over():
+    frontier = MemoryFrontier()
+    items = make_items("a")
+    # 负的可见性超时表示租约立即过期，模拟节点崩溃
+    run(frontier.claim(items, "node-1", -1, 5))
+    taken = run(frontier.lease_expired("detail", "测试", "node-2", 10, 300, 5))
+    assert [item.key for item in taken] == [items[0].key]
+    assert taken[0].attempts == 2
+    assert frontier.items[items[0].key]["owner"] == "node-2"
+    # 原节点租约已被接手，完成操作不生效
+    run(frontier.complete(items[0].key, "node-1"))
+    assert frontier.items[items[0].key]["status"] == "leased"
+
+
+def test_release_makes_item_available_again():
+    frontier = MemoryFrontier()
+    items = make_items("a")
+    run(frontier.claim(items, "node-1", 300, 5))
+    run(frontier.release(items[0].key, "node-1", 0, 5))
+    assert run(frontier.claim(items, "node-2", 300, 5)) == [items[0].key]
+
+
+def test_release_with_delay_hides_item():
+    frontier = MemoryFrontier()
+    items = make_items("a")
+    run(frontier.claim(items, "node-1", 300, 5))
+    run(frontier.release(items[0].key, "node-1", 60, 5))
+    assert run(frontier.claim(items, "node-2", 300, 5)) == []
+
+
+def test_completed_item_is_not_claimed_again():
+    frontier = MemoryFrontier()
+    items = make_items("a")
+    run(frontier.claim(items, "node-1", 300, 5))
+    run(frontier.complete(items[0].key, "node-1"))
+    assert run(frontier.claim(items, "node-2", 300, 5)) == []
+
+
+def test_complete_with_revisit_resets_attempts():
+    frontier = MemoryFrontier()
+    items = make_items("a")
+    run(frontier.claim(items, "node-1", 300, 5))
+    run(frontier.complete(items[0].key, "node-1", revisit_after=0))
+    entry = frontier.items[items[0].key]
+    assert entry["status"] == "pending" and entry["attempts"] == 0
+    assert run(frontier.claim(items, "node-2", 300, 5)) == [items[0].key]
+
+
+def test_exhausted_item_is_dead_and_purged():
+    frontier = MemoryFrontier()
+    items = make_items("a")
+    for _ in range(2):
+        assert run(frontier.claim(items, "node-1", 300, 2)) == [items[0].key]
+        run(frontier.release(items[0].key, "node-1", 0, 2))
+    assert frontier.items[items[0].key]["status"] == "dead"
+    assert run(frontier.claim(items, "node-1", 300, 2)) == []
+    run(frontier.purge(-1, 2))
+    assert frontier.items == {}
+
+
+def test_purge_removes_items_whose_last_lease_expired():
+    frontier = MemoryFrontier()
+    items = make_items("a", "b")
+    run(frontier.claim(items[:1], "node-1", -1, 1))
+    run(frontier.claim(items[1:], "node-1", 300, 5))
+    run(frontier.purge(-1, 1))
+    assert list(frontier.items) == [items[1].key]
@@ -0,0 +1,21 @@
+import asyncio
+
+from core.http_client import HttpClientManager
+
+
+def test_session_is_shared_until_closed():
+    async def scenario():
+        client = HttpClientManager(limit=10, limit_per_host=2)
+        first = await client.get_session()
+        second = await client.get_session()
+        limit_per_host = first.connector.limit_per_host
+        await client.close()
+        reopened = await client.get_session()
+        await client.close()
+        return first is second, limit_per_host, first.closed, reopened is not first
+
+    shared, limit_per_host, closed, reopened = asyncio.run(scenario())
+    assert shared
+    assert limit_per_host == 2
+    assert closed
+    assert reopened
@@ -0,0 +1,86 @@
+import asyncio
+from datetime import datetime
+
+from core.list_walker import ListWalker, Watermark, pending_watermarks
+
+
+def item(url, date_str, **fields):
+    return {"article_url": url, "date_str": date_str, **fields}
+
+
+def test_reached_by_date():
+    watermark = Watermark("测试", "新闻", latest_at=datetime(2026, 1, 1, 12))
+    assert not ListWalker._reached(watermark, [item("a", "2026-01-01 13:00:00")], None)
+    assert ListWalker._reached(watermark, [item("a", "2026-01-01 12:00:00")], None)
+
+
+def test_reached_by_id():
+    watermark = Watermark("测试", "新闻", latest_at=datetime(2026, 1, 1), latest_id="42")
+    assert ListWalker._reached(watermark, [item("a", "2026-02-01 00:00:00", contId=42)], "contId")
+    assert not ListWalker._reached(watermark, [item("a", "bad date", contId=7)], "contId")
+
+
+def test_reached_without_watermark():
+    watermark = Watermark("测试", "新闻")
+    assert not ListWalker._reached(watermark, [item("a", "2026-01-01 00:00:00")], None)
+
+
+def test_advance_moves_forward_only():
+    walker = ListWalker()
+    watermark = Watermark("测试", "新闻", latest_at=datetime(2026, 1, 2))
+    asyncio.run(walker._advance(watermark, [item("a", "2026-01-01 00:00:00")], None, 1))
+    assert watermark.latest_at == datetime(2026, 1, 2)
+    items = [item("a", "2026-01-03 00:00:00", contId=1), item("b", "2026-01-04 00:00:00", contId=2)]
+    asyncio.run(walker._advance(watermark, items, "contId", 2))
+    assert watermark.latest_at == datetime(2026, 1, 4)
+    assert watermark.latest_id == "2"
+    assert watermark.pages == 2
+
+
+class FakeSpider:
+    source_name = "测试"
+    checkpoint = None
+
+
+def test_walk_stops_at_watermark(monkeypatch):
+    monkeypatch.setenv("LIST_MAX_PAGES", "5")
+    walker = ListWalker()
+    walker.watermarks[("测试", "新闻")] = Watermark("测试", "新闻", latest_at=datetime(2026, 1, 2))
+    pages = {
+        1: [item("a", "2026-01-04 00:00:00"), item("b", "2026-01-03 00:00:00")],
+        2: [item("c", "2026-01-02 12:00:00"), item("d", "2026-01-01 00:00:00")],
+        3: [item("e", "2025-12-31 00:00:00")],
+    }
+    requested = []
+
+    async def fetch_page(page):
+        requested.append(page)
+        return pages[page], page + 1
+
+    result = asyncio.run(walker.walk(FakeSpider(), "新闻", fetch_page))
+    assert requested == [1, 2]
+    assert [i["article_url"] for i in result] == ["a", "b", "c", "d"]
+    assert walker.watermarks[("测试", "新闻")].latest_at == datetime(2026, 1, 4)
+
+
+def test_walk_defers_watermark_inside_pipeline():
+    walker = ListWalker()
+    walker.watermarks[("测试", "新闻")] = Watermark("测试", "新闻", latest_at=datetime(2026, 1, 2))
+
+    async def fetch_page(page):
+        return [item("a", "2026-01-04 00:00:00"), item("b", "2026-01-01 00:00:00")], None
+
+    async def run():
+        pending = []
+        token = pending_watermarks.set(pending)
+        try:
+            await walker.walk(FakeSpider(), "新闻", fetch_page)
+        finally:
+            pending_watermarks.reset(token)
+        return pending
+
+    pending = asyncio.run(run())
+    watermark = walker.watermarks[("测试", "新闻")]
+    assert watermark.latest_at == datetime(2026, 1, 2)
+    asyncio.run(walker.commit(*pending[0]))
+    assert watermark.latest_at == datetime(2026, 1, 4)
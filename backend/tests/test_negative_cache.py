@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+
+import core.negative_cache as negative_cache_module
+from core.negative_cache import NegativeCache, failure_kind
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(negative_cache_module, "time", clock)
+    return clock
+
+
+def test_entry_expires_after_kind_ttl(clock, monkeypatch):
+    monkeypatch.setenv("NEGATIVE_CACHE_NETWORK_TTL", "60")
+    cache = NegativeCache()
+
+    async def scenario():
+        await cache.add("https://a.com/1", "network")
+        clock.now += 59
+        hit = await cache.get("https://a.com/1")
+        clock.now += 2
+        return hit, await cache.get("https://a.com/1")
+
+    assert asyncio.run(scenario()) == ("network", None)
+    assert cache.hits == 1
+    assert not cache.entries
+
+
+def test_zero_ttl_is_not_recorded(clock, monkeypatch):
+    monkeypatch.setenv("NEGATIVE_CACHE_EMPTY_TTL", "0")
+    cache = NegativeCache()
+
+    async def scenario():
+        await cache.add("https://a.com/1", "empty")
+        return await cache.get("https://a.com/1")
+
+    assert asyncio.run(scenario()) is None
+
+
+def test_least_recently_used_evicted(clock, monkeypatch):
+    monkeypatch.setenv("NEGATIVE_CACHE_SIZE", "2")
+    cache = NegativeCache()
+
+    async def scenario():
+        await cache.add("https://a.com/1", "error")
+        await cache.add("https://a.com/2", "error")
+        await cache.get("https://a.com/1")
+        await cache.add("https://a.com/3", "error")
+        return [await cache.get(f"https://a.com/{n}") for n in (1, 2, 3)]
+
+    assert asyncio.run(scenario()) == ["error", None, "error"]
+
+
+def test_failure_kind():
+    assert failure_kind(None) == "empty"
+    assert failure_kind(asyncio.TimeoutError()) == "network"
+    assert failure_kind(ValueError("解析失败")) == "error"
@@ -0,0 +1,40 @@
+import asyncio
+import os
+import threading
+
+from core.parse_executor import ParseExecutor
+
+
+def describe(text, suffix=""):
+    return text.upper() + suffix, threading.get_ident(), os.getpid()
+
+
+def run(executor, *args, **kwargs):
+    async def scenario():
+        try:
+            return await executor.run(describe, *args, **kwargs), threading.get_ident()
+        finally:
+            executor.close()
+
+    return asyncio.run(scenario())
+
+
+def test_thread_mode_runs_off_event_loop_thread():
+    (result, thread, _), loop_thread = run(ParseExecutor(mode="thread", workers=1), "a", suffix="!")
+    assert result == "A!"
+    assert thread != loop_thread
+
+
+def test_process_mode_runs_in_worker_process():
+    (result, _, pid), _ = run(ParseExecutor(mode="process", workers=1), "b")
+    assert result == "B"
+    assert pid != os.getpid()
+
+
+def test_unknown_mode_falls_back_to_threads():
+    executor = ParseExecutor(mode="fiber", workers=1)
+    executor.start()
+    try:
+        assert executor.mode == "thread"
+    finally:
+        executor.close()
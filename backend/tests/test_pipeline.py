@@ -0,0 +1,176 @@
+import asyncio
+
+import pytest
+
+from core import pipeline as pipeline_module
+from core.crawl_budget import CrawlBudget
+from core.list_fingerprint import ListFingerprints
+from core.list_walker import ListWalker, Watermark
+from core.negative_cache import RecentlyFailed
+from core.pipeline import CrawlPipeline
+
+
+class FakeSpider:
+    source_name = "测试"
+    recrawl_interval = None
+    lease_lists = True
+    checkpoint = None
+
+    def __init__(self, lists, fail_save=False):
+        self.lists = lists
+        self.fail_save = fail_save
+        self.saved = []
+
+    def category_key(self, code):
+        return code
+
+    def category_host(self, code):
+        return "example.com"
+
+    async def get_news_list(self, code):
+        return self.lists[code]
+
+    async def filter_existing(self, news_list):
+        return news_list
+
+    async def fetch_news_info(self, item):
+        return {"title": item["article_url"]}
+
+    async def save_article(self, news_info):
+        if self.fail_save:
+            raise RuntimeError("写入失败")
+        self.saved.append(news_info["title"])
+        return True
+
+
+def news(*urls):
+    return [{"article_url": url, "date_str": "2026-01-01 00:00:00"} for url in urls]
+
+
+@pytest.fixture(autouse=True)
+def budget(monkeypatch):
+    budget = CrawlBudget(global_limit=4, per_source=2, per_host=2, reserved=0)
+    monkeypatch.setattr(pipeline_module, "crawl_budget", budget)
+    monkeypatch.setattr(pipeline_module, "list_fingerprints", ListFingerprints())
+    return budget
+
+
+def test_run_saves_every_article():
+    spider = FakeSpider({"a": news("a1", "a2"), "b": news("b1")})
+    pipeline = CrawlPipeline(spider, detail_workers=2, persist_workers=2)
+    saved = asyncio.run(pipeline.run([("a", ""), ("b", "")]))
+    assert saved == 3
+    assert sorted(spider.saved) == ["a1", "a2", "b1"]
+
+
+def test_stage_error_cancels_other_stages_and_releases_budget(monkeypatch, budget):
+    codes = "abcdef"
+    spider = FakeSpider({code: news(f"{code}1") for code in codes})
+    pipeline = CrawlPipeline(spider, detail_workers=2, persist_workers=2)
+
+    async def broken_persist():
+        raise RuntimeError("入库阶段异常")
+
+    monkeypatch.setattr(pipeline, "_persist", broken_persist)
+
+    async def run():
+        with pytest.raises(RuntimeError, match="入库阶段异常"):
+            await asyncio.wait_for(pipeline.run([(code, "") for code in codes]), 5)
+        # 等待预算的分类协程已被取消，不会在清理之后再占用预算
+        for _ in range(10):
+            await asyncio.sleep(0)
+        return budget.active("测试")
+
+    assert asyncio.run(run()) == 0
+
+
+class WalkingSpider(FakeSpider):
+    """通过 list_walker 翻页的爬虫，fail_urls 中的文章详情获取失败"""
+
+    def __init__(self, walker, fail_urls=()):
+        super().__init__({})
+        self.walker = walker
+        self.fail_urls = set(fail_urls)
+
+    async def get_news_list(self, code):
+        async def fetch_page(page):
+            return news("n1", "n2"), None
+
+        return await self.walker.walk(self, code, fetch_page)
+
+    async def fetch_news_info(self, item):
+        if item["article_url"] in self.fail_urls:
+            return None
+        return await super().fetch_news_info(item)
+
+
+def walk_once(monkeypatch, fail_urls):
+    walker = ListWalker()
+    walker.watermarks[("测试", "新闻")] = Watermark("测试", "新闻")
+    monkeypatch.setattr(pipeline_module, "list_walker", walker)
+    spider = WalkingSpider(walker, fail_urls)
+    asyncio.run(CrawlPipeline(spider, detail_workers=1, persist_workers=1).run([("新闻", "")]))
+    return walker.watermarks[("测试", "新闻")].latest_at
+
+
+def test_watermark_saved_after_clean_run(monkeypatch):
+    assert walk_once(monkeypatch, []) is not None
+
+
+def test_watermark_kept_when_detail_fails(monkeypatch):
+    assert walk_once(monkeypatch, ["n2"]) is None
+
+
+class CachedFailureSpider(FakeSpider):
+    async def fetch_news_info(self, item):
+        if item["article_url"] == "dead":
+            raise RecentlyFailed(item["article_url"], "error")
+        return await super().fetch_news_info(item)
+
+
+def test_negative_cache_skip_still_saves_fingerprint():
+    spider = CachedFailureSpider({"a": news("a1", "dead")})
+    pipeline = CrawlPipeline(spider, detail_workers=1, persist_workers=1)
+    asyncio.run(pipeline.run([("a", "")]))
+    unit = pipeline.units[0]
+    assert spider.saved == ["a1"]
+    assert not unit.incomplete
+    assert pipeline_module.list_fingerprints.fingerprints[("测试", "a")] == unit.fingerprint
+
+
+class CountingSpider(FakeSpider):
+    def __init__(self, lists, fail_urls=()):
+        super().__init__(lists)
+        self.fail_urls = set(fail_urls)
+        self.filtered = 0
+
+    async def filter_existing(self, news_list):
+        self.filtered += 1
+        return news_list
+
+    async def fetch_news_info(self, item):
+        if item["article_url"] in self.fail_urls:
+            self.fail_urls.discard(item["article_url"])
+            raise ValueError("解析失败")
+        return await super().fetch_news_info(item)
+
+
+def test_unchanged_list_skips_dedup_and_details():
+    spider = CountingSpider({"a": news("a1", "a2")})
+    asyncio.run(CrawlPipeline(spider, detail_workers=1, persist_workers=1).run([("a", "")]))
+    asyncio.run(CrawlPipeline(spider, detail_workers=1, persist_workers=1).run([("a", "")]))
+    assert spider.filtered == 1
+    assert spider.saved == ["a1", "a2"]
+
+    spider.lists["a"] = news("a3", "a1", "a2")
+    asyncio.run(CrawlPipeline(spider, detail_workers=1, persist_workers=1).run([("a", "")]))
+    assert spider.filtered == 2
+
+
+def test_fingerprint_not_saved_when_detail_fails():
+    spider = CountingSpider({"a": news("a1", "a2")}, fail_urls={"a2"})
+    asyncio.run(CrawlPipeline(spider, detail_workers=1, persist_workers=1).run([("a", "")]))
+    assert ("测试", "a") not in pipeline_module.list_fingerprints.fingerprints
+    asyncio.run(CrawlPipeline(spider, detail_workers=1, persist_workers=1).run([("a", "")]))
+    assert spider.filtered == 2
+    assert "a2" in spider.saved
@@ -0,0 +1,32 @@
+import pytest
+
+from core.rate_limiter import HostRateLimiter
+
+
+def test_ignores_non_positive_host_rates(monkeypatch):
+    monkeypatch.setenv("RATE_LIMIT_HOSTS", '{"a.example.com": [0, 5], "b.example.com": [2, 3]}')
+    limiter = HostRateLimiter(default_rate=4, default_burst=4)
+    limiter.load_config()
+    assert limiter.limit_for("a.example.com") == (4.0, 4)
+    assert limiter.limit_for("b.example.com") == (2.0, 3)
+
+
+def test_rejects_non_positive_default_rate(monkeypatch):
+    monkeypatch.setenv("RATE_LIMIT_RPS", "-1")
+    limiter = HostRateLimiter()
+    limiter.load_config()
+    assert limiter.default_rate > 0
+
+
+def test_configure_rejects_zero_rate():
+    limiter = HostRateLimiter(default_rate=4, default_burst=4)
+    with pytest.raises(ValueError):
+        limiter.configure("example.com", 0, 5)
+
+
+def test_subdomains_share_the_site_bucket():
+    limiter = HostRateLimiter(default_rate=4, default_burst=4)
+    limiter.load_config()
+    assert limiter.bucket_for("news.sohu.com") is limiter.bucket_for("m.sohu.com")
+    assert limiter.bucket_for("a.example.org") is not limiter.bucket_for("b.example.org")
+    assert set(limiter.snapshot()) == {"sohu.com", "a.example.org", "b.example.org"}
@@ -0,0 +1,88 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from core import pipeline as pipeline_module
+from core.crawl_budget import CrawlBudget
+from core.list_fingerprint import ListFingerprints
+from core.pipeline import CrawlPipeline
+from core.recrawl import RecrawlPlanner
+
+
+@pytest.fixture
+def planner(monkeypatch):
+    monkeypatch.setenv("RECRAWL_MIN_INTERVAL", "60")
+    monkeypatch.setenv("RECRAWL_MAX_INTERVAL", "3600")
+    monkeypatch.setenv("RECRAWL_TARGET_NEW", "3")
+    return RecrawlPlanner()
+
+
+def visit(planner, new, skipped, elapsed, cap=None):
+    async def scenario():
+        stats = await planner.get("测试", "新闻", 600)
+        if stats.last_visit_at is None:
+            stats.last_visit_at = datetime.now() - timedelta(seconds=elapsed)
+        else:
+            stats.last_visit_at -= timedelta(seconds=elapsed)
+        return await planner.record("测试", "新闻", new, skipped, 600, cap)
+
+    return asyncio.run(scenario()).interval
+
+
+def test_quiet_category_backs_off_gradually(planner):
+    assert visit(planner, 0, 20, 600) == 900
+    assert visit(planner, 0, 20, 900) == 1350
+
+
+def test_busy_category_speeds_up(planner):
+    # 10 分钟 30 篇新文章：每 60 秒约 3 篇
+    assert visit(planner, 30, 0, 600) == 60
+
+
+def test_growth_limited_to_double(monkeypatch, planner):
+    monkeypatch.setenv("RECRAWL_SMOOTHING", "1")
+    visit(planner, 30, 0, 600)
+    assert visit(planner, 1, 19, 6000) == 120
+
+
+def test_interval_cap_applies(planner):
+    assert visit(planner, 0, 20, 600, cap=300) == 300
+
+
+def test_due_after_interval(planner):
+    async def scenario():
+        await planner.record("测试", "新闻", 0, 20, 600)
+        return await planner.is_due("测试", "新闻")
+
+    assert not asyncio.run(scenario())
+
+
+class EmptyListSpider:
+    source_name = "测试"
+    recrawl_interval = 600
+    lease_lists = True
+    checkpoint = None
+
+    def category_key(self, code):
+        return code
+
+    def category_host(self, code):
+        return "example.com"
+
+    async def get_news_list(self, code):
+        # 爬虫获取列表出错时返回空列表
+        return []
+
+    async def filter_existing(self, news_list):
+        return news_list
+
+
+def test_empty_list_not_recorded_as_visit(monkeypatch, planner):
+    monkeypatch.setattr(pipeline_module, "recrawl_planner", planner)
+    monkeypatch.setattr(pipeline_module, "crawl_budget", CrawlBudget(4, 2, 2, 0))
+    monkeypatch.setattr(pipeline_module, "list_fingerprints", ListFingerprints())
+    asyncio.run(CrawlPipeline(EmptyListSpider(), 1, 1).run([("新闻", "")]))
+    stats = planner.stats[("测试", "新闻")]
+    assert stats.visits == 0
+    assert stats.next_due_at is None
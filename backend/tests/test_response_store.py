@@ -0,0 +1,60 @@
+import asyncio
+import os
+
+from core.response_store import ResponseStore
+
+
+def make_store(monkeypatch, tmp_path, mode):
+    monkeypatch.setenv("RESPONSE_STORE_MODE", mode)
+    monkeypatch.setenv("RESPONSE_STORE_DIR", str(tmp_path))
+    return ResponseStore()
+
+
+def test_record_then_replay_round_trip(monkeypatch, tmp_path):
+    store = make_store(monkeypatch, tmp_path, "read-through")
+    key = store.request_key("POST", "https://a.com/list", json_body={"page": 1})
+    content = "<html>新闻</html>".encode("gbk")
+
+    async def scenario():
+        missing = await store.load(key)
+        await store.save(key, content, {"url": "https://a.com/list", "charset": "gbk"})
+        return missing, await store.load(key)
+
+    missing, (body, meta) = asyncio.run(scenario())
+    assert missing is None
+    assert body == content
+    assert meta["charset"] == "gbk"
+    assert meta["size"] == len(content)
+    assert store.snapshot() == {"mode": "read-through", "hits": 1, "misses": 1, "recorded": 1}
+
+
+def test_identical_bodies_stored_once(monkeypatch, tmp_path):
+    store = make_store(monkeypatch, tmp_path, "record")
+    first = store.request_key("GET", "https://a.com/1")
+    second = store.request_key("GET", "https://a.com/2")
+
+    async def scenario():
+        await store.save(first, b"same", {"url": "https://a.com/1"})
+        await store.save(second, b"same", {"url": "https://a.com/2"})
+        return await store.load(second)
+
+    body, _ = asyncio.run(scenario())
+    assert body == b"same"
+    objects = [name for _, _, names in os.walk(tmp_path / "objects") for name in names]
+    assert len(objects) == 1
+
+
+def test_request_key_ignores_param_order():
+    assert ResponseStore.request_key("get", "https://a.com", {"a": 1, "b": 2}) == (
+        ResponseStore.request_key("GET", "https://a.com", {"b": 2, "a": 1})
+    )
+    assert ResponseStore.request_key("POST", "https://a.com", data={"page": 1}) != (
+        ResponseStore.request_key("POST", "https://a.com", data={"page": 2})
+    )
+
+
+def test_mode_flags(monkeypatch, tmp_path):
+    replay = make_store(monkeypatch, tmp_path, "replay")
+    assert replay.reads and not replay.writes and replay.replay_only
+    unknown = make_store(monkeypatch, tmp_path, "bogus")
+    assert not unknown.reads and not unknown.writes
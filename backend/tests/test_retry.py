@@ -0,0 +1,99 @@
+import asyncio
+
+import aiohttp
+import pytest
+
+from core import retry
+from core.retry import CircuitBreaker, CircuitOpenError, RetryManager
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(retry.time, "monotonic", fake)
+    return fake
+
+
+def test_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker("example.com", 3, 30, 600)
+    for _ in range(2):
+        breaker.record_failure()
+        breaker.before_request()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+
+
+def test_success_resets_failure_count(clock):
+    breaker = CircuitBreaker("example.com", 2, 30, 600)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+
+
+def test_half_open_allows_single_probe(clock):
+    breaker = CircuitBreaker("example.com", 1, 30, 600)
+    breaker.record_failure()
+    clock.now += 31
+    breaker.before_request()
+    assert breaker.state == "half_open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.reset_timeout == 30
+    breaker.before_request()
+
+
+def test_failed_probe_reopens_with_doubled_timeout(clock):
+    breaker = CircuitBreaker("example.com", 1, 30, 50)
+    breaker.record_failure()
+    clock.now += 31
+    breaker.before_request()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert breaker.reset_timeout == 50
+    clock.now += 40
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+
+
+def test_retry_manager_retries_transient_errors(monkeypatch):
+    monkeypatch.setenv("RETRY_BASE_DELAY", "0")
+    manager = RetryManager()
+    calls = []
+
+    async def send():
+        calls.append(1)
+        if len(calls) < 3:
+            raise asyncio.TimeoutError()
+        return "ok"
+
+    assert asyncio.run(manager.call("http://example.com/a", send)) == "ok"
+    assert len(calls) == 3
+    assert manager.breaker("example.com").state == "closed"
+
+
+def test_retry_manager_does_not_retry_permanent_errors(monkeypatch):
+    monkeypatch.setenv("RETRY_BASE_DELAY", "0")
+    manager = RetryManager()
+    calls = []
+
+    async def send():
+        calls.append(1)
+        raise aiohttp.ClientResponseError(None, (), status=404)
+
+    with pytest.raises(aiohttp.ClientResponseError):
+        asyncio.run(manager.call("http://example.com/a", send))
+    assert len(calls) == 1
+    assert manager.breaker("example.com").failures == 0
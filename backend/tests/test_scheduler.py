@@ -0,0 +1,100 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from core.scheduler import CronTrigger, IntervalTrigger, Job, JobScheduler
+
+
+def test_cron_next_fire():
+    trigger = CronTrigger("30 8 * * 1-5")
+    # 2026-01-02 是周五，下一次是周一 08:30
+    assert trigger.next_fire(datetime(2026, 1, 2, 9, 0)) == datetime(2026, 1, 5, 8, 30)
+    assert CronTrigger("*/15 * * * *").next_fire(datetime(2026, 1, 1, 0, 7)) == datetime(
+        2026, 1, 1, 0, 15
+    )
+
+
+def test_jitter_delays_within_bound():
+    scheduler = JobScheduler()
+    job = Job("j", "spider", IntervalTrigger(60), jitter=10)
+    start = datetime(2026, 1, 1)
+    for _ in range(20):
+        delay = (scheduler._next_run(job, start) - start).total_seconds()
+        assert 60 <= delay <= 70
+
+
+def test_misfire_beyond_grace_is_skipped():
+    scheduler = JobScheduler()
+    launched = []
+    scheduler._launch = launched.append
+    now = datetime(2026, 1, 1, 12)
+    job = Job("j", "spider", IntervalTrigger(60), misfire_grace=30,
+              next_run_at=now - timedelta(minutes=10))
+    asyncio.run(scheduler._fire(job, now))
+    assert launched == []
+    assert job.last_status == "misfired"
+    assert job.next_run_at == now + timedelta(seconds=60)
+
+
+def test_row_without_next_run_is_scheduled():
+    row = {
+        "id": "j", "kind": "spider", "trigger_type": "interval", "trigger_value": "60",
+        "payload": None, "jitter": 0, "misfire_grace": None, "max_instances": 1,
+        "next_run_at": None, "last_run_at": None, "last_status": None,
+    }
+    job = JobScheduler()._job_from_row(row)
+    assert job.next_run_at is not None
+
+
+def test_job_without_next_fire_does_not_stop_loop():
+    scheduler = JobScheduler()
+    runs = []
+
+    async def handler(job):
+        runs.append(job.id)
+
+    scheduler.register_handler("spider", handler)
+    past = datetime.now() - timedelta(seconds=1)
+    # 2 月 31 日永远不会触发
+    scheduler.jobs["never"] = Job("never", "spider", CronTrigger("0 0 31 2 *"), next_run_at=past)
+    scheduler.jobs["idle"] = Job("idle", "spider", IntervalTrigger(60))
+    scheduler.jobs["ok"] = Job("ok", "spider", IntervalTrigger(60), next_run_at=past)
+
+    async def run():
+        await scheduler.start()
+        await asyncio.sleep(0.2)
+        await scheduler.close()
+
+    asyncio.run(run())
+    assert runs == ["ok"]
+    assert "never" not in scheduler.jobs
+
+
+def test_start_loads_only_allowed_jobs(monkeypatch):
+    from core import scheduler as scheduler_module
+
+    def row(job_id):
+        return {
+            "id": job_id, "kind": "spider", "trigger_type": "interval", "trigger_value": "60",
+            "payload": None, "jitter": 0, "misfire_grace": None, "max_instances": 1,
+            "next_run_at": datetime.now() + timedelta(hours=1), "last_run_at": None,
+            "last_status": None,
+        }
+
+    async def fetchall(sql, params=None):
+        return [row("spider:souhu"), row("spider:wangyi")]
+
+    monkeypatch.setattr(scheduler_module.db_manager, "pool", object())
+    monkeypatch.setattr(scheduler_module.db_manager, "fetchall", fetchall)
+    scheduler = JobScheduler()
+
+    async def handler(job):
+        pass
+
+    scheduler.register_handler("spider", handler)
+
+    async def run():
+        await scheduler.start({"spider:souhu"})
+        await scheduler.close()
+
+    asyncio.run(run())
+    assert list(scheduler.jobs) == ["spider:souhu"]
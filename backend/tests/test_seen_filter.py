@@ -0,0 +1,67 @@
+import asyncio
+
+from core import base
+from core.base import BaseSpider
+from core.seen_filter import BloomFilter, SeenFilter
+
+
+def loaded_filter(*urls):
+    seen = SeenFilter()
+    seen.bloom = BloomFilter(1000, 0.001)
+    seen.loaded = True
+    seen.last_refresh = float("inf")
+    for url in urls:
+        seen.add(url, None)
+    return seen
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(1000, 0.01)
+    keys = [f"u:https://example.com/{i}" for i in range(1000)]
+    for key in keys:
+        bloom.add(key)
+    assert all(key in bloom for key in keys)
+
+
+def test_unseen_articles_skip_database(monkeypatch):
+    queries = []
+
+    async def fetchall(sql, params=None):
+        queries.append(params)
+        return []
+
+    monkeypatch.setattr(base.db_manager, "fetchall", fetchall)
+    monkeypatch.setattr(base, "seen_filter", loaded_filter("https://example.com/old"))
+    items = [{"article_url": "https://example.com/new", "title": "新闻"}]
+    assert asyncio.run(BaseSpider().filter_existing(items)) == items
+    assert queries == []
+
+
+def test_false_positive_confirmed_by_database(monkeypatch):
+    queries = []
+
+    async def fetchall(sql, params=None):
+        queries.append(params)
+        return []
+
+    # 过滤器认为可能存在，数据库中实际没有：文章仍要爬取
+    monkeypatch.setattr(base.db_manager, "fetchall", fetchall)
+    monkeypatch.setattr(base, "seen_filter", loaded_filter("https://example.com/a"))
+    items = [{"article_url": "https://example.com/a", "title": "新闻"}]
+    assert asyncio.run(BaseSpider().filter_existing(items)) == items
+    assert len(queries) == 1
+
+
+def test_refresh_rescans_rows_committed_out_of_order(monkeypatch):
+    table = [{"id": i, "title": f"t{i}", "article_url": f"u{i}"} for i in (1, 2, 4)]
+
+    async def fetchall(sql, params):
+        after, limit = params
+        return [row for row in sorted(table, key=lambda r: r["id"]) if row["id"] > after][:limit]
+
+    monkeypatch.setattr("core.seen_filter.db_manager.fetchall", fetchall)
+    seen = loaded_filter()
+    assert asyncio.run(seen.refresh()) == 3
+    table.append({"id": 3, "title": "t3", "article_url": "u3"})
+    assert asyncio.run(seen.refresh()) == 1
+    assert seen.might_contain({"article_url": "u3"})
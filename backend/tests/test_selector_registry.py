@@ -0,0 +1,60 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from lxml import html
+
+from core.parse_executor import ParseExecutor
+from core.selector_registry import FieldRule, SelectorRegistry, selector_registry
+
+PAGE = "<div><h2>标题</h2></div>"
+
+
+def extract_title(page):
+    rule = selector_registry.rule("ithome", "detail", "content")
+    return rule.extract(html.fromstring(page))
+
+
+def test_counters_are_exact_across_threads():
+    rule = FieldRule("title", {"xpath": ["//h1/text()", "//h2/text()"]})
+    node = html.fromstring(PAGE)
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(lambda _: rule.extract(node), range(2000)))
+    assert rule.counters()[:2] == (2000, [0, 2000])
+
+
+def test_process_mode_counts_in_parent():
+    rule = selector_registry.rule("ithome", "detail", "content")
+    before = rule.counters()[0]
+    executor = ParseExecutor(mode="process", workers=1)
+
+    async def run():
+        for _ in range(3):
+            await executor.run(extract_title, PAGE)
+
+    try:
+        asyncio.run(run())
+    finally:
+        executor.close()
+    assert rule.counters()[0] == before + 3
+
+
+def test_fallback_expressions_and_modes():
+    node = html.fromstring("<div><p> 第一段 </p><p>第二段</p><img src='/a.jpg'></div>")
+    first = FieldRule("title", {"xpath": ["//h1/text()", "//p/text()"]})
+    lines = FieldRule("text", {"xpath": "//p/text()", "mode": "lines"})
+    image = FieldRule("img", {"xpath": "//img/@src", "prefix": "https://example.com"})
+    missing = FieldRule("author", {"xpath": "//span/text()", "default": ""})
+    assert first.extract(node) == "第一段"
+    assert first.counters()[1] == [0, 1]
+    assert lines.extract(node) == " 第一段 \n第二段\n"
+    assert image.extract(node) == "https://example.com/a.jpg"
+    assert missing.extract(node) == ""
+
+
+def test_registry_loads_rules_from_json(tmp_path):
+    (tmp_path / "demo.json").write_text(
+        '{"detail": {"title": {"xpath": "//h2/text()"}}}', encoding="utf-8"
+    )
+    registry = SelectorRegistry(rules_dir=str(tmp_path))
+    assert registry.extract("demo", "detail", "title", html.fromstring(PAGE)) == "标题"
+    assert registry.stats()[0]["calls"] == 1
@@ -0,0 +1,54 @@
+import asyncio
+import queue
+
+import pytest
+
+from core.supervisor import WriterChannel, build_assignment
+
+
+def test_round_robin_assignment():
+    assert build_assignment(["a", "b", "c"], 2) == [["a", "c"], ["b"]]
+    assert build_assignment(["a"], 4) == [["a"]]
+
+
+def test_explicit_assignment_fills_rest():
+    assert build_assignment(["a", "b", "c", "d"], 1, "a;b") == [["a", "c"], ["b", "d"]]
+    with pytest.raises(ValueError):
+        build_assignment(["a"], 1, "x")
+
+
+def channel(timeout):
+    requests, responses = queue.Queue(), queue.Queue()
+    writer = WriterChannel(0, 1, requests, responses)
+    writer.timeout = timeout
+    return writer, requests, responses
+
+
+def test_write_batch_receives_outcomes():
+    async def scenario():
+        writer, requests, responses = channel(5)
+        writer.start()
+        pending = asyncio.create_task(writer.write_batch([("row",)]))
+        worker_id, generation, batch_id, rows = await asyncio.get_running_loop().run_in_executor(
+            None, requests.get
+        )
+        responses.put((batch_id, [True]))
+        result = await pending
+        writer.close()
+        return result, rows
+
+    assert asyncio.run(scenario()) == ([True], [("row",)])
+
+
+def test_write_batch_times_out_without_reply():
+    async def scenario():
+        writer, _, _ = channel(0.05)
+        writer.start()
+        try:
+            with pytest.raises(TimeoutError):
+                await writer.write_batch([("row",)])
+            return writer.pending
+        finally:
+            writer.close()
+
+    assert asyncio.run(scenario()) == {}
@@ -0,0 +1,118 @@
+import asyncio
+
+import pytest
+
+from core.task_executor import TaskExecutor, TaskTimeout
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_runs_by_priority_within_concurrency_limit():
+    async def scenario():
+        executor = TaskExecutor(max_concurrency=1, default_timeout=0)
+        order = []
+        gate = asyncio.Event()
+
+        def job(name):
+            async def work():
+                if name == "first":
+                    await gate.wait()
+                order.append(name)
+            return work
+
+        handles = [
+            executor.submit("first", job("first")),
+            executor.submit("low", job("low"), priority=0),
+            executor.submit("high", job("high"), priority=5),
+        ]
+        assert executor.queue_depth == 2
+        gate.set()
+        await asyncio.gather(*(handle.future for handle in handles))
+        return order, executor.counters["completed"]
+
+    order, completed = run(scenario())
+    assert order == ["first", "high", "low"]
+    assert completed == 3
+
+
+def test_submit_same_key_returns_existing_handle():
+    async def scenario():
+        executor = TaskExecutor(max_concurrency=1, default_timeout=0)
+        first = executor.submit("task", lambda: asyncio.sleep(0))
+        second = executor.submit("task", lambda: asyncio.sleep(0))
+        await first.future
+        return first is second
+
+    assert run(scenario())
+
+
+def test_cancel_queued_task():
+    async def scenario():
+        executor = TaskExecutor(max_concurrency=1, default_timeout=0)
+        started = []
+        running = executor.submit("running", lambda: asyncio.sleep(0.05))
+        queued = executor.submit("queued", lambda: started.append("queued") or asyncio.sleep(0))
+        assert executor.cancel("queued")
+        await running.future
+        await asyncio.sleep(0)
+        return started, queued.state, executor.counters["cancelled"]
+
+    started, state, cancelled = run(scenario())
+    assert started == []
+    assert state == "cancelled"
+    assert cancelled == 1
+
+
+def test_cancel_running_task():
+    async def scenario():
+        executor = TaskExecutor(max_concurrency=1, default_timeout=0)
+        handle = executor.submit("running", lambda: asyncio.sleep(10))
+        await asyncio.sleep(0)
+        assert executor.cancel("running")
+        with pytest.raises(asyncio.CancelledError):
+            await handle.future
+        await asyncio.gather(handle.task, return_exceptions=True)
+        return handle.state, executor.running
+
+    state, running = run(scenario())
+    assert state == "cancelled"
+    assert running == {}
+
+
+def test_timeout_stops_task_and_frees_slot():
+    async def scenario():
+        executor = TaskExecutor(max_concurrency=1, default_timeout=0)
+        slow = executor.submit("slow", lambda: asyncio.sleep(10), timeout=0.05)
+        fast = executor.submit("fast", lambda: asyncio.sleep(0, result="done"))
+        with pytest.raises(TaskTimeout):
+            await slow.future
+        result = await fast.future
+        await asyncio.gather(slow.task, return_exceptions=True)
+        return slow.state, result, executor.counters["timeout"]
+
+    state, result, timeouts = run(scenario())
+    assert state == "timeout"
+    assert result == "done"
+    assert timeouts == 1
+
+
+def test_timeout_inside_task_counts_as_failure():
+    async def raises_timeout():
+        raise asyncio.TimeoutError("数据库超时")
+
+    async def scenario():
+        executor = TaskExecutor(max_concurrency=1, default_timeout=0)
+        limited = executor.submit("limited", raises_timeout, timeout=10)
+        unlimited = executor.submit("unlimited", raises_timeout)
+        for handle in (limited, unlimited):
+            with pytest.raises(asyncio.TimeoutError) as info:
+                await handle.future
+            assert not isinstance(info.value, TaskTimeout)
+        await asyncio.gather(limited.task, unlimited.task, return_exceptions=True)
+        return limited.state, unlimited.state, executor.counters
+
+    limited, unlimited, counters = run(scenario())
+    assert limited == unlimited == "failed"
+    assert counters["timeout"] == 0
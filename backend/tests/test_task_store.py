@@ -0,0 +1,43 @@
+import asyncio
+
+import pytest
+
+from core import task_store as task_store_module
+from core.task_store import TaskStore
+
+
+@pytest.fixture
+def store(monkeypatch):
+    store = TaskStore()
+    monkeypatch.setattr(task_store_module, "task_store", store)
+    return store
+
+
+def test_checkpoint_survives_interrupted_run(store):
+    async def scenario():
+        task = await store.create({"name": "搜狐", "status": "running"})
+        checkpoint = await store.load_checkpoint(task["id"])
+        checkpoint.set_cursor("时政", 3)
+        await checkpoint.category_done("时政", 12)
+        interrupted = await store.interrupted()
+        return task["id"], interrupted, await store.load_checkpoint(task["id"])
+
+    task_id, interrupted, resumed = asyncio.run(scenario())
+    assert [task["id"] for task in interrupted] == [task_id]
+    assert resumed.resumed
+    assert resumed.categories_done == ["时政"]
+    assert resumed.saved == 12
+    # 完成的分类不再保留列表游标
+    assert resumed.get_cursor("时政") is None
+
+
+def test_row_conversion_round_trip():
+    fields = {"name": "网易", "categories": ["科技"], "categoryCounts": {"科技": 5},
+              "checkpoint": None, "createdAt": "2026-01-01T08:00:00"}
+    row = TaskStore._to_row(fields)
+    assert row["categories"] == '["科技"]'
+    task = TaskStore._from_row({"id": 1, **row})
+    assert task["categories"] == ["科技"]
+    assert task["categoryCounts"] == {"科技": 5}
+    assert task["createdAt"] == "2026-01-01T08:00:00"
+    assert task["dataCount"] == 0
@@ -0,0 +1,56 @@
+import asyncio
+
+from core.validator_cache import ValidatorCache, pending_validators, request_key
+
+
+def test_request_key_ignores_param_order():
+    assert request_key("get", "https://a.com/list", {"a": 1, "b": 2}) == request_key(
+        "GET", "https://a.com/list", {"b": 2, "a": 1}
+    )
+    assert request_key("GET", "https://a.com/list", {"page": 1}) != request_key(
+        "GET", "https://a.com/list", {"page": 2}
+    )
+
+
+def test_conditional_headers_from_stored_validators():
+    cache = ValidatorCache()
+    key = request_key("GET", "https://a.com/list")
+
+    async def scenario():
+        before = await cache.headers_for(key)
+        await cache.received(key, "https://a.com/list", '"v1"', "Mon, 01 Jan 2026 00:00:00 GMT")
+        return before, await cache.headers_for(key)
+
+    before, after = asyncio.run(scenario())
+    assert before == {}
+    assert after == {
+        "If-None-Match": '"v1"',
+        "If-Modified-Since": "Mon, 01 Jan 2026 00:00:00 GMT",
+    }
+
+
+def test_received_deferred_while_pending():
+    cache = ValidatorCache()
+    key = request_key("GET", "https://a.com/list")
+
+    async def scenario():
+        pending = []
+        token = pending_validators.set(pending)
+        try:
+            await cache.received(key, "https://a.com/list", '"v1"', None)
+        finally:
+            pending_validators.reset(token)
+        deferred = await cache.headers_for(key)
+        for validators in pending:
+            await cache.store(*validators)
+        return deferred, await cache.headers_for(key)
+
+    deferred, stored = asyncio.run(scenario())
+    assert deferred == {}
+    assert stored == {"If-None-Match": '"v1"'}
+
+
+def test_response_without_validators_not_stored():
+    cache = ValidatorCache()
+    asyncio.run(cache.store("k", "https://a.com/list", None, None))
+    assert cache.validators == {}